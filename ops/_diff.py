@@ -0,0 +1,178 @@
+#  Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+import ops.constants
+import ops.utils
+
+import ovs.vlog
+vlog = ovs.vlog.Vlog('dc')
+
+PLAN_CREATE = 'create'
+PLAN_UPDATE = 'update'
+PLAN_DELETE = 'delete'
+
+
+class ConfigDiff(object):
+    """Structural difference between two declarative configurations
+
+    Attributes:
+        plan (dict): Rows created, updated and deleted per table, i.e.
+            {table: {'create': [index], 'update': {index: [column]},
+            'delete': [index]}}. Indexes of children rows are prefixed
+            by the index of their parent row.
+        changed (dict): Indexes of the top level rows that have to be
+            written, per top level table.
+    """
+    def __init__(self):
+        self.plan = {}
+        self.changed = {}
+
+    def _get_table_plan(self, table):
+        if table not in self.plan:
+            self.plan[table] = {PLAN_CREATE: [], PLAN_UPDATE: {},
+                                PLAN_DELETE: []}
+        return self.plan[table]
+
+    def add_create(self, table, index):
+        self._get_table_plan(table)[PLAN_CREATE].append(index)
+
+    def add_update(self, table, index, columns):
+        self._get_table_plan(table)[PLAN_UPDATE][index] = sorted(columns)
+
+    def add_delete(self, table, index):
+        self._get_table_plan(table)[PLAN_DELETE].append(index)
+
+    def to_json(self):
+        plan = {}
+        for table, table_plan in self.plan.iteritems():
+            plan[table] = {PLAN_CREATE: sorted(table_plan[PLAN_CREATE]),
+                           PLAN_UPDATE: table_plan[PLAN_UPDATE],
+                           PLAN_DELETE: sorted(table_plan[PLAN_DELETE])}
+        return plan
+
+
+def _is_empty(value):
+    return value is None or value == {} or value == [] or value == ''
+
+
+def _child_index(parent_index, index):
+    if parent_index is None:
+        return str(index)
+    return '%s/%s' % (parent_index, index)
+
+
+def _add_rows(diff, action, rows, table, extschema, parent_index=None):
+    # add rows, with all their children, as created or deleted
+    table_schema = extschema.ovs_tables[table]
+    for index, row_data in rows.iteritems():
+        index = _child_index(parent_index, index)
+        action(table, index)
+
+        for column in table_schema.children:
+            if column in row_data and row_data[column]:
+                child_table = ops.utils.get_child_table(column, table_schema)
+                _add_rows(diff, action, row_data[column], child_table,
+                          extschema, index)
+
+
+def diff_row(diff, current, new, table, index, extschema):
+    """
+    Adds the changes between the current and new data of a row, and
+    of its children, to diff. Returns whether anything changed.
+    """
+    table_schema = extschema.ovs_tables[table]
+    changed = False
+
+    # columns, absent and empty values are the same
+    columns = []
+    for column in set(current.keys()) | set(new.keys()):
+        if column in table_schema.children:
+            continue
+
+        current_value = current.get(column)
+        new_value = new.get(column)
+        if _is_empty(current_value) and _is_empty(new_value):
+            continue
+        if current_value != new_value:
+            columns.append(column)
+
+    if columns:
+        diff.add_update(table, index, columns)
+        changed = True
+
+    # children missing from the new data are deleted
+    for column in table_schema.children:
+        child_table = ops.utils.get_child_table(column, table_schema)
+        current_children = current.get(column) or {}
+        new_children = new.get(column) or {}
+
+        for child_index, child_data in current_children.iteritems():
+            if child_index not in new_children:
+                _add_rows(diff, diff.add_delete, {child_index: child_data},
+                          child_table, extschema, index)
+                changed = True
+
+        for child_index, child_data in new_children.iteritems():
+            if child_index not in current_children:
+                _add_rows(diff, diff.add_create, {child_index: child_data},
+                          child_table, extschema, index)
+                changed = True
+            elif diff_row(diff, current_children[child_index], child_data,
+                          child_table, _child_index(index, child_index),
+                          extschema):
+                changed = True
+
+    return changed
+
+
+def diff_config(current, new, extschema):
+    """
+    Computes the difference between the current configuration, as
+    returned by dc.read, and a new one about to be written. Top level
+    rows missing from the new configuration are only deleted when
+    their table is missing too, the same way _write.setup_table does.
+    """
+    diff = ConfigDiff()
+    system_table = ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE
+
+    for table, table_schema in extschema.ovs_tables.iteritems():
+        if table_schema.parent is not None:
+            continue
+
+        current_rows = current.get(table) or {}
+        if table == system_table:
+            current_rows = {system_table: current_rows}
+
+        if table not in new:
+            _add_rows(diff, diff.add_delete, current_rows, table, extschema)
+            continue
+
+        new_rows = new[table]
+        if table == system_table:
+            new_rows = {system_table: new_rows}
+
+        changed = set()
+        for index, row_data in new_rows.iteritems():
+            if index not in current_rows:
+                _add_rows(diff, diff.add_create, {index: row_data}, table,
+                          extschema)
+                changed.add(index)
+            elif diff_row(diff, current_rows[index], row_data, table,
+                          str(index), extschema):
+                changed.add(index)
+
+        diff.changed[table] = changed
+
+    vlog.dbg('configuration diff: %s' % diff.plan)
+    return diff
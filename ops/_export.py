@@ -0,0 +1,86 @@
+#  Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+import json
+
+import ops.constants
+import ops.utils
+
+
+def iter_rows_json(rows, table, extschema):
+    """
+    Yields the JSON encoding of the rows of a table, keyed by index,
+    one row at a time
+    """
+    yield '{'
+    separator = ''
+    for index, row_data in rows.iteritems():
+        yield separator + json.dumps(index) + ': '
+        for fragment in iter_row_json(row_data, table, extschema):
+            yield fragment
+        separator = ', '
+    yield '}'
+
+
+def iter_row_json(row_data, table, extschema):
+    """
+    Yields the JSON encoding of a row. The columns of the row are
+    encoded at once, its children are encoded one row at a time.
+    """
+    if table not in extschema.ovs_tables:
+        yield json.dumps(row_data)
+        return
+
+    table_schema = extschema.ovs_tables[table]
+    children = [column for column in table_schema.children
+                if isinstance(row_data.get(column), dict)]
+    if not children:
+        yield json.dumps(row_data)
+        return
+
+    columns = dict((column, value) for column, value in row_data.iteritems()
+                   if column not in children)
+
+    # encoded columns without the closing brace
+    yield json.dumps(columns)[:-1]
+    separator = ', ' if columns else ''
+    for column in children:
+        yield separator + json.dumps(column) + ': '
+        child_table = ops.utils.get_child_table(column, table_schema)
+        for fragment in iter_rows_json(row_data[column], child_table,
+                                       extschema):
+            yield fragment
+        separator = ', '
+    yield '}'
+
+
+def iter_config_json(config, extschema):
+    """
+    Yields the JSON encoding of a configuration, as returned by
+    dc.read, in fragments no bigger than the biggest row's columns
+    """
+    system_table = ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE
+
+    yield '{'
+    separator = ''
+    for table, table_data in config.iteritems():
+        yield separator + json.dumps(table) + ': '
+        if table == system_table:
+            fragments = iter_row_json(table_data, table, extschema)
+        else:
+            fragments = iter_rows_json(table_data, table, extschema)
+        for fragment in fragments:
+            yield fragment
+        separator = ', '
+    yield '}'
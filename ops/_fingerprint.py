@@ -0,0 +1,131 @@
+#  Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+import hashlib
+import json
+
+import ops.constants
+from _diff import _is_empty
+
+DIFF_RUNNING_ONLY = 'running_only'
+DIFF_STARTUP_ONLY = 'startup_only'
+DIFF_CHANGED = 'changed'
+
+
+def _normalize(value):
+    # absent and empty values are the same, as in _diff
+    if not isinstance(value, dict):
+        return value
+
+    normalized = {}
+    for key, item in value.iteritems():
+        item = _normalize(item)
+        if not _is_empty(item):
+            normalized[key] = item
+    return normalized
+
+
+def row_hash(row_data):
+    """
+    Returns the hash of the data of a row, children included
+    """
+    data = json.dumps(_normalize(row_data), sort_keys=True,
+                      separators=(',', ':'))
+    return hashlib.sha1(data).hexdigest()
+
+
+def combine_hashes(hashes):
+    """
+    Returns the hash of a set of named hashes, e.g. of the rows of
+    a table by index
+    """
+    hasher = hashlib.sha1()
+    for name in sorted(hashes):
+        hasher.update(name.encode('utf-8'))
+        hasher.update('\0%s\0' % hashes[name])
+    return hasher.hexdigest()
+
+
+def get_row_hashes(config):
+    """
+    Returns the hashes of the rows of a configuration, as returned by
+    dc.read, by table and index. The System row's index is the name of
+    its table.
+    """
+    system_table = ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE
+    row_hashes = {}
+    for table, table_data in config.iteritems():
+        if table == system_table:
+            table_data = {system_table: table_data}
+
+        hashes = {}
+        for index, row_data in (table_data or {}).iteritems():
+            hashes[unicode(index)] = row_hash(row_data)
+        if hashes:
+            row_hashes[table] = hashes
+
+    return row_hashes
+
+
+class ConfigFingerprint(object):
+    """Hash tree of a configuration
+
+    Rows are hashed with their children, tables from the hashes of
+    their rows and the configuration from the hashes of its tables,
+    so two configurations can be compared table by table and row by
+    row without comparing their data.
+
+    Attributes:
+        rows (dict): Hashes of the rows, by table and index.
+        tables (dict): Hashes of the tables.
+        root (str): Hash of the configuration.
+    """
+    def __init__(self, rows, tables=None):
+        self.rows = rows
+        if tables is None:
+            tables = dict((table, combine_hashes(hashes))
+                          for table, hashes in rows.iteritems())
+        self.tables = tables
+        self.root = combine_hashes(tables)
+
+    def compare(self, other):
+        """
+        Returns the indexes of the rows that differ from other, by
+        table: those only in this configuration, only in the other one
+        and in both with different data. Tables with the same hash are
+        skipped without comparing their rows.
+        """
+        differences = {}
+        if self.root == other.root:
+            return differences
+
+        for table in set(self.tables) | set(other.tables):
+            if self.tables.get(table) == other.tables.get(table):
+                continue
+
+            rows = self.rows.get(table, {})
+            other_rows = other.rows.get(table, {})
+            differences[table] = {
+                DIFF_RUNNING_ONLY: sorted(index for index in rows
+                                          if index not in other_rows),
+                DIFF_STARTUP_ONLY: sorted(index for index in other_rows
+                                          if index not in rows),
+                DIFF_CHANGED: sorted(index for index in rows
+                                     if index in other_rows and
+                                     rows[index] != other_rows[index])}
+
+        return differences
+
+    def to_json(self):
+        return {'fingerprint': self.root, 'tables': self.tables}
@@ -20,7 +20,11 @@ import ovs.vlog
 vlog = ovs.vlog.Vlog('dc')
 
 
-def get_row_data(row, table_name, schema, idl, index=None):
+def get_row_data(row, table_name, schema, idl, index=None, visited=None):
+
+    # keep track of the rows the data is read from
+    if visited is not None:
+        visited.append((table_name, row.uuid))
 
     if index is None:
         index = ops.utils.row_to_index(row, table_name, schema, idl)
@@ -72,14 +76,15 @@ def get_row_data(row, table_name, schema, idl, index=None):
                     kv_index = keys[count]
                     data = get_row_data(
                         item, child_table_name, schema,
-                        idl, kv_index)
+                        idl, kv_index, visited)
                     if data is None:
                         continue
 
                     children_data.update({str(keys[count]): data.values()[0]})
                     count = count + 1
                 else:
-                    data = get_row_data(item, child_table_name, schema, idl)
+                    data = get_row_data(item, child_table_name, schema, idl,
+                                        visited=visited)
                     if data is None:
                         continue
 
@@ -110,7 +115,8 @@ def get_row_data(row, table_name, schema, idl, index=None):
                 # Parent reference is same as 'row' (row was passed to
                 #this function) this is now the child of 'row'
                 if ref.uuid == row.uuid:
-                    data = get_row_data(item, child_name, schema, idl)
+                    data = get_row_data(item, child_name, schema, idl,
+                                        visited=visited)
                     if data is not None:
                         children_data.update(data)
 
@@ -0,0 +1,298 @@
+#  Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+import random
+import uuid
+import weakref
+
+import _read, _fingerprint
+import ops.constants
+
+import ovs.vlog
+vlog = ovs.vlog.Vlog('dc')
+
+
+class ConfigSnapshot(object):
+    """Running configuration kept up to date from IDL row updates
+
+    The data of every top level row, children included, is read once
+    and kept until an update is received for the row or for one of the
+    rows its data was read from. Only those top level rows are read
+    again on the next refresh. Changes to columns that are not part of
+    the configuration, e.g. statistics, are ignored.
+
+    If the IDL can't report row updates, the whole configuration is
+    read on every refresh.
+    """
+    def __init__(self, extschema, idl):
+        self.extschema = extschema
+        # the snapshot is kept for as long as the IDL exists
+        self.idl = weakref.proxy(idl)
+        self.epoch = '%08x' % random.getrandbits(32)
+        self.version = 0
+        self.valid = False
+        self.config = None
+
+        # data of the top level rows, keyed by (table, uuid)
+        self.rows = {}
+        # top level row each row was read for
+        self.owners = {}
+        # rows each top level row was read from
+        self.sources = {}
+        # top level rows to read again
+        self.dirty = set()
+
+        # hashes of the rows by table and index, computed on demand
+        self.row_hashes = {}
+        self.unhashed = set()
+        self.table_hashes = {}
+        self.dirty_tables = set()
+        self.fingerprint = None
+
+        self.columns = {}
+        self.index_columns = {}
+        self.parent_columns = {}
+        self._setup_columns()
+
+        self.tracking = hasattr(idl, 'add_row_observer')
+        if self.tracking:
+            idl.add_row_observer(self)
+
+    def _setup_columns(self):
+        tables = self.extschema.ovs_tables
+
+        # tables whose indexes appear in the data of other rows
+        referenced = set()
+        for table_schema in tables.itervalues():
+            for reference in table_schema.references.itervalues():
+                if reference.relation == ops.constants.OVSDB_SCHEMA_REFERENCE:
+                    referenced.add(reference.ref_table)
+            for column in table_schema.indexes:
+                if column in table_schema.references:
+                    referenced.add(table_schema.references[column].ref_table)
+
+        for table_name, table_schema in tables.iteritems():
+            columns = set(table_schema.config.keys())
+            columns.update(table_schema.references.keys())
+            columns.update(table_schema.dynamic.keys())
+            columns.update(table_schema.indexes)
+            if table_name == 'VLAN':
+                columns.add('internal_usage')
+            self.columns[table_name] = columns
+            self.index_columns.setdefault(table_name, set())
+
+            for name, reference in table_schema.references.iteritems():
+                if reference.relation == ops.constants.OVSDB_SCHEMA_PARENT:
+                    self.parent_columns[table_name] = (name,
+                                                       reference.ref_table)
+
+            if table_name not in referenced:
+                continue
+
+            # indexes made of the index columns or, for children only
+            # indexed by UUID, of the keys in their parent's column
+            if table_schema.indexes == ['uuid']:
+                if table_schema.parent is not None:
+                    self.index_columns.setdefault(
+                        table_schema.parent, set()).add(
+                            table_schema.plural_name)
+            else:
+                self.index_columns[table_name].update(table_schema.indexes)
+
+    def rows_cleared(self):
+        self.valid = False
+
+    def row_changed(self, table_name, row_uuid, old, new):
+        if not self.valid or table_name not in self.columns:
+            return
+
+        # a modification only lists the columns that changed in old
+        if old and new:
+            changed = [column for column in old
+                       if column in self.columns[table_name]]
+            if not changed:
+                return
+
+            for column in changed:
+                if column in self.index_columns[table_name]:
+                    # the index can be part of any row's data
+                    self.valid = False
+                    return
+
+        key = (table_name, row_uuid)
+        if self.extschema.ovs_tables[table_name].parent is None:
+            self.dirty.add(key)
+        elif key in self.owners:
+            self.dirty.add(self.owners[key])
+        elif new and table_name in self.parent_columns:
+            # new back referenced child, find its parent's top level row
+            (column, parent_table) = self.parent_columns[table_name]
+            datum = new.get(column)
+            if isinstance(datum, list) and len(datum) == 2 and \
+                    datum[0] == 'uuid':
+                parent_key = (parent_table, uuid.UUID(datum[1]))
+                if self.extschema.ovs_tables[parent_table].parent is None:
+                    self.dirty.add(parent_key)
+                elif parent_key in self.owners:
+                    self.dirty.add(self.owners[parent_key])
+
+        # forward referenced children are only part of the configuration
+        # once their parent refers to them, which updates the parent
+
+    def _read_row(self, key):
+        for source in self.sources.pop(key, []):
+            if self.owners.get(source) == key:
+                del self.owners[source]
+
+        (table_name, row_uuid) = key
+        self._remove_hashes(key)
+        self.rows.pop(key, None)
+
+        row = self.idl.tables[table_name].rows.get(row_uuid)
+        if row is None:
+            return
+
+        visited = []
+        self.rows[key] = _read.get_row_data(row, table_name, self.extschema,
+                                            self.idl, visited=visited)
+        self.sources[key] = visited
+        for source in visited:
+            self.owners[source] = key
+        self.unhashed.add(key)
+
+    def _read_all(self):
+        self.rows.clear()
+        self.owners.clear()
+        self.sources.clear()
+        self.dirty.clear()
+        self.row_hashes.clear()
+        self.unhashed.clear()
+        self.table_hashes.clear()
+        self.dirty_tables.clear()
+
+        for table_name, table_schema in self.extschema.ovs_tables.iteritems():
+            if table_schema.parent is not None:
+                continue
+
+            for row_uuid in self.idl.tables[table_name].rows.keys():
+                self._read_row((table_name, row_uuid))
+
+        self.valid = self.tracking
+
+    def refresh(self):
+        """
+        Reads the rows changed since the last refresh. Returns True if
+        the configuration may have changed.
+        """
+        if not self.valid:
+            vlog.dbg('reading the whole running configuration')
+            self._read_all()
+        elif self.dirty:
+            vlog.dbg('reading %d changed top level rows' % len(self.dirty))
+            dirty = self.dirty
+            self.dirty = set()
+            try:
+                for key in dirty:
+                    self._read_row(key)
+            except Exception:
+                self.valid = False
+                raise
+        else:
+            return False
+
+        self.version += 1
+        self.config = None
+        self.fingerprint = None
+        return True
+
+    def get_etag(self):
+        """
+        Returns the entity tag of the configuration as of the last
+        refresh, it changes whenever the configuration may have changed
+        """
+        return '"%s-%d"' % (self.epoch, self.version)
+
+    def _get_row_indexes(self, key):
+        (table_name, row_uuid) = key
+        row_data = self.rows.get(key)
+        if row_data is None:
+            return []
+        if table_name == ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE:
+            return [(table_name, row_data.values()[0])]
+        return row_data.items()
+
+    def _remove_hashes(self, key):
+        if key in self.unhashed:
+            self.unhashed.discard(key)
+            return
+
+        table_name = key[0]
+        for index, row_data in self._get_row_indexes(key):
+            self.row_hashes[table_name].pop(unicode(index), None)
+            self.dirty_tables.add(table_name)
+
+    def get_fingerprint(self):
+        """
+        Returns the hash tree of the configuration as of the last
+        refresh. Only the rows read again since the previous call are
+        hashed, and only the tables they belong to are hashed again.
+        """
+        if self.fingerprint is not None:
+            return self.fingerprint
+
+        for key in self.unhashed:
+            table_name = key[0]
+            hashes = self.row_hashes.setdefault(table_name, {})
+            for index, row_data in self._get_row_indexes(key):
+                hashes[unicode(index)] = _fingerprint.row_hash(row_data)
+            self.dirty_tables.add(table_name)
+        self.unhashed.clear()
+
+        for table_name in self.dirty_tables:
+            hashes = self.row_hashes.get(table_name)
+            if hashes:
+                self.table_hashes[table_name] = \
+                    _fingerprint.combine_hashes(hashes)
+            else:
+                self.row_hashes.pop(table_name, None)
+                self.table_hashes.pop(table_name, None)
+        self.dirty_tables.clear()
+
+        # the hashes keep changing, the fingerprint is shared
+        rows = dict((table_name, dict(hashes))
+                    for table_name, hashes in self.row_hashes.iteritems())
+        self.fingerprint = _fingerprint.ConfigFingerprint(
+            rows, dict(self.table_hashes))
+        return self.fingerprint
+
+    def get_config(self):
+        """
+        Returns the running configuration as of the last refresh, in the
+        same format as dc.read. It is shared and must not be modified.
+        """
+        if self.config is not None:
+            return self.config
+
+        config = {}
+        for (table_name, row_uuid), row_data in self.rows.iteritems():
+            if row_data is None:
+                continue
+            config.setdefault(table_name, {}).update(row_data)
+
+        # remove system uuid
+        system_table = ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE
+        config[system_table] = config[system_table].values()[0]
+
+        self.config = config
+        return config
@@ -0,0 +1,174 @@
+#  Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+
+import base64
+import hashlib
+import json
+import zlib
+
+# Stored documents start with a header, i.e.
+# "opscfg:<format>:<codec>:<version>:<sha1>:" followed by the base64
+# encoded document. Legacy documents are the base64 encoded JSON only,
+# which can't contain ':'.
+HEADER_MAGIC = 'opscfg'
+HEADER_SEPARATOR = ':'
+FORMAT_VERSION = 2
+
+# Codecs of the stored documents
+CODEC_ZLIB = 'zlib'
+CODEC_ZLIB_DELTA = 'zlib-delta'
+
+COMPRESSION_LEVEL = 6
+
+# Errors raised by invalid or corrupted documents
+DECODE_ERRORS = (ValueError, TypeError, zlib.error)
+
+
+class StoredConfig(object):
+    """Header and payload of a stored document
+
+    Attributes:
+        codec (str): CODEC_ZLIB for a configuration, CODEC_ZLIB_DELTA
+            for a delta, None for a legacy configuration.
+        version (int): Version of the configuration the document
+            holds or, for a delta, restores.
+        digest (str): SHA-1 of the JSON encoding of the document.
+        data (str): The stored document, header included.
+        offset (int): Position of the base64 payload in data.
+    """
+    def __init__(self, data):
+        self.data = data
+        self.codec = None
+        self.version = 0
+        self.digest = None
+        self.offset = 0
+
+        if not data.startswith(HEADER_MAGIC + HEADER_SEPARATOR):
+            return
+
+        fields = data.split(HEADER_SEPARATOR, 5)
+        if len(fields) != 6 or int(fields[1]) != FORMAT_VERSION:
+            raise ValueError('Unsupported startup configuration format')
+
+        self.codec = fields[2]
+        self.version = int(fields[3])
+        self.digest = fields[4]
+        self.offset = len(data) - len(fields[5])
+
+    def iter_json(self, chunk_size):
+        """
+        Yields the JSON encoding of the document, decoded from
+        chunk_size characters of base64 at a time
+        """
+        # every 4 characters of base64 decode on their own
+        chunk_size = max(chunk_size - chunk_size % 4, 4)
+
+        decompressor = None
+        hasher = None
+        if self.codec is not None:
+            decompressor = zlib.decompressobj()
+            hasher = hashlib.sha1()
+
+        for start in xrange(self.offset, len(self.data), chunk_size):
+            chunk = base64.b64decode(self.data[start:start + chunk_size])
+            if decompressor is not None:
+                chunk = decompressor.decompress(chunk)
+                hasher.update(chunk)
+            yield chunk
+
+        if decompressor is not None:
+            chunk = decompressor.flush()
+            hasher.update(chunk)
+            if hasher.hexdigest() != self.digest:
+                raise ValueError('Corrupted startup configuration')
+            yield chunk
+
+    def verify(self, chunk_size):
+        """
+        Decodes the whole document without keeping it, raising one of
+        DECODE_ERRORS if it is corrupted, so that it can be checked
+        before any of it is sent
+        """
+        for chunk in self.iter_json(chunk_size):
+            pass
+
+    def get_json(self):
+        """
+        Returns the JSON encoding of the document
+        """
+        return ''.join(self.iter_json(len(self.data)))
+
+    def get_document(self):
+        return json.loads(self.get_json())
+
+
+def encode(document, codec, version):
+    """
+    Returns the stored representation of a configuration
+    or of a delta, as a string
+    """
+    data = json.dumps(document)
+    digest = hashlib.sha1(data).hexdigest()
+    payload = base64.b64encode(zlib.compress(data, COMPRESSION_LEVEL))
+    return HEADER_SEPARATOR.join([HEADER_MAGIC, str(FORMAT_VERSION), codec,
+                                  str(version), digest, payload])
+
+
+def make_delta(new, old, path=None):
+    """
+    Returns the changes that turn new into old, as a list of
+    [path, value] to set and [path] to remove. Dictionaries are
+    compared key by key, any other value is replaced as a whole.
+    """
+    if path is None:
+        path = []
+
+    if not isinstance(new, dict) or not isinstance(old, dict):
+        return [[path, old]]
+
+    delta = []
+    for key, value in old.iteritems():
+        if key not in new:
+            delta.append([path + [key], value])
+        elif new[key] != value:
+            delta.extend(make_delta(new[key], value, path + [key]))
+
+    for key in new:
+        if key not in old:
+            delta.append([path + [key]])
+
+    return delta
+
+
+def apply_delta(document, delta):
+    """
+    Applies the changes returned by make_delta to document,
+    which is modified in place. Returns the resulting document.
+    """
+    for change in delta:
+        path = change[0]
+        if not path:
+            document = change[1]
+            continue
+
+        target = document
+        for key in path[:-1]:
+            target = target[key]
+
+        if len(change) == 2:
+            target[path[-1]] = change[1]
+        else:
+            del target[path[-1]]
+
+    return document
@@ -20,6 +20,7 @@ import ops.utils
 import ops.constants
 import urllib
 import ops.validatoradapter
+import opsrest.resolver
 
 import ovs.vlog
 vlog = ovs.vlog.Vlog('dc')
@@ -27,6 +28,11 @@ vlog = ovs.vlog.Vlog('dc')
 global_ref_list = {}
 validator = None
 
+# rows of the database by table and index, and back referenced
+# children by table and parent UUID, only set for an initial apply
+initial_index_map = None
+backward_children_map = None
+
 
 def setup_validators(extschema, idl):
     global validator
@@ -40,9 +46,70 @@ def exec_validators():
         return validator.errors
 
 
+def setup_initial_maps(extschema, idl):
+    """
+    Maps the rows of a database holding hardware rows only, before
+    a configuration is applied to it, so that rows are looked up by
+    index and back referenced children by parent without resolving
+    indexes or scanning tables. Rows inserted meanwhile are found in
+    global_ref_list.
+    """
+    global initial_index_map, backward_children_map
+    initial_index_map = {}
+    backward_children_map = {}
+
+    for table_name, table_schema in extschema.ovs_tables.iteritems():
+        rows = idl.tables[table_name].rows
+
+        # indexes made of references are given by parent UUID
+        # when setting up rows, the map can't tell they are missing
+        if table_schema.index_columns and \
+                not set(table_schema.index_columns) & \
+                set(table_schema.references):
+            indexes = {}
+            for row in rows.itervalues():
+                index = ops.utils.row_to_index(row, table_name, extschema,
+                                               idl)
+                indexes[index] = row
+            initial_index_map[table_name] = indexes
+
+        for name, column in table_schema.references.iteritems():
+            if column.relation == ops.constants.OVSDB_SCHEMA_PARENT:
+                children = {}
+                for row in rows.itervalues():
+                    parent = row.__getattr__(name)
+                    if parent is not None:
+                        children.setdefault(parent.uuid, []).append(row)
+                backward_children_map[table_name] = children
+                break
+
+
+def clear_initial_maps():
+    global initial_index_map, backward_children_map
+    initial_index_map = None
+    backward_children_map = None
+
+
+def _initial_index_to_row(index, table):
+    """
+    Returns whether the initial maps can tell if the row exists,
+    and the row if it does
+    """
+    if table in global_ref_list and index in global_ref_list[table]:
+        return (True, global_ref_list[table][index])
+    if table not in initial_index_map:
+        return (False, None)
+    return (True, initial_index_map[table].get(index))
+
+
 def _index_to_row(index, table, extschema, idl):
-    table_schema = extschema.ovs_tables[table]
-    row = ops.utils.index_to_row(index, extschema, table, idl)
+    if initial_index_map is not None:
+        (known, row) = _initial_index_to_row(index, table)
+        if known:
+            return row
+
+    resolver = opsrest.resolver.get_resolver(extschema, idl)
+    row = resolver.index_to_row(index, table, idl)
     if row is None and table in global_ref_list:
         if index in global_ref_list[table]:
             row = global_ref_list[table][index]
@@ -107,6 +174,11 @@ def _delete_row(row, table, extschema, idl, parent=None, parent_table=None):
 
 
 def get_backward_children(parent_row, parent_table, child_table, extschema, idl):
+    if backward_children_map is not None and \
+            child_table in backward_children_map:
+        return list(backward_children_map[child_table].get(parent_row.uuid,
+                                                           []))
+
     for name, column in extschema.ovs_tables[child_table].references.iteritems():
         if column.relation == ops.constants.OVSDB_SCHEMA_PARENT:
 
@@ -134,10 +206,22 @@ def setup_table(table, data, extschema, idl, txn):
             _delete_row_list(delete_list, table, extschema, idl)
     else:
         # update table
-        vlog.dbg('updating table %s' % table)
-        tabledata = data[table]
-        for rowindex, rowdata in tabledata.iteritems():
+        for rowindex in setup_table_rows(table, data, extschema, idl, txn):
+            pass
+
+
+def setup_table_rows(table, data, extschema, idl, txn, indexes=None):
+    """
+    set up the rows of table given in data, yielding the index
+    of each row after it is set up. If indexes is given, only
+    those rows are set up.
+    """
+    vlog.dbg('updating table %s' % table)
+    tabledata = data[table]
+    for rowindex, rowdata in tabledata.iteritems():
+        if indexes is None or rowindex in indexes:
             setup_row({rowindex:rowdata}, table, extschema, idl, txn)
+        yield rowindex
 
 
 def setup_references(table, data, extschema, idl):
@@ -145,11 +229,23 @@ def setup_references(table, data, extschema, idl):
     if table not in data:
         return
 
+    for rowindex in setup_table_references(table, data, extschema, idl):
+        pass
+
+
+def setup_table_references(table, data, extschema, idl, indexes=None):
+    """
+    set up the references of the rows of table given in data,
+    yielding the index of each row after its references are set up.
+    If indexes is given, only the references of those rows are set up.
+    """
     tabledata = data[table]
 
     for rowindex, rowdata in tabledata.iteritems():
-        vlog.dbg('setup references for table %s' % table)
-        setup_row_references({rowindex:rowdata}, table, extschema, idl)
+        if indexes is None or rowindex in indexes:
+            vlog.dbg('setup references for table %s' % table)
+            setup_row_references({rowindex:rowdata}, table, extschema, idl)
+        yield rowindex
 
 
 def setup_row_references(rowdata, table, extschema, idl):
@@ -174,10 +270,9 @@ def setup_row_references(rowdata, table, extschema, idl):
         if name in table_schema.children or column.relation == ops.constants.OVSDB_SCHEMA_PARENT:
             continue
 
-        if hasattr(row, name):
-            col_val = row.__getattr__(name)
-            if col_val is not None and not mutable:
-                continue
+        col_val = getattr(row, name, None)
+        if col_val is not None and not mutable:
+            continue
 
         vlog.dbg('setup reference for column %s in row %s of table %s' % (name, str(row.uuid), table))
         _min = column.n_min
@@ -224,6 +319,10 @@ def setup_row_references(rowdata, table, extschema, idl):
                         raise Exception('Row with index %s not found' % refindex)
                     references.append(refrow)
 
+        # leave unchanged references alone
+        if col_val == references:
+            continue
+
         row.__setattr__(name, references)
 
     for child in table_schema.children:
@@ -257,7 +356,13 @@ def setup_row(rowdata, table_name, extschema, idl, txn, row=None, parent=None, p
     # get row reference from table
     new = False
     if row is None:
-        row = ops.utils.index_to_row(row_index, extschema,table_name, idl)
+        known = False
+        if initial_index_map is not None:
+            (known, row) = _initial_index_to_row(row_index, table_name)
+
+        if not known:
+            row = opsrest.resolver.get_resolver(extschema, idl).index_to_row(
+                row_index, table_name, idl)
 
     if row is None:
         row = ops.utils.insert_row_check(row_data, table_name, extschema, idl, txn)
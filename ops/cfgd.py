@@ -13,12 +13,30 @@
 #  License for the specific language governing permissions and limitations
 #  under the License.
 
-import json
-import base64
+import hashlib
 
 from ops.settings import settings
 from ovs.db.idl import Idl, SchemaHelper, Transaction
 import ovs.poller
+import ovs.vlog
+
+import _startup, _fingerprint
+
+vlog = ovs.vlog.Vlog('cfgd')
+
+# Bytes of the stored startup configuration decoded at a time
+READ_CHUNK_SIZE = 64 * 1024
+
+# Types of the rows in the config table
+STARTUP_TYPE = 'startup'
+HISTORY_TYPE = 'startup-history'
+
+# Number of previous startup configurations kept
+HISTORY_SIZE = 8
+
+# Hash tree of the last startup configuration fingerprinted
+_fingerprint_cache = {}
+
 
 def connect():
     ovsschema = settings.get('cfg_db_schema')
@@ -39,6 +57,183 @@ def connect():
     return idl
 
 
+def get_startup_row(idl):
+    '''
+    Walk through the rows in the config table (if any)
+    looking for a row with type == startup.
+    '''
+    for ovs_rec in idl.tables['config'].rows.itervalues():
+        row_type = ovs_rec.__getattr__('type')
+        if row_type and row_type == STARTUP_TYPE:
+            return ovs_rec
+
+    return None
+
+
+def get_history_rows(idl):
+    '''
+    Returns the rows with type == startup-history, along with their
+    stored delta, from the most recent to the oldest.
+    '''
+    history = []
+    for ovs_rec in idl.tables['config'].rows.itervalues():
+        row_type = ovs_rec.__getattr__('type')
+        if row_type and row_type == HISTORY_TYPE:
+            config = ovs_rec.__getattr__('config')
+            try:
+                history.append((_startup.StoredConfig(config), ovs_rec))
+            except _startup.DECODE_ERRORS as e:
+                vlog.warn('skipping unreadable startup history row %s: %s'
+                          % (ovs_rec.uuid, e))
+                continue
+
+    history.sort(key=lambda entry: entry[0].version, reverse=True)
+    return history
+
+
+def get_startup_config(idl):
+    '''
+    Returns the content of the "config" field of the row with
+    type == startup as a StoredConfig, None if there is no such row.
+    '''
+    row = get_startup_row(idl)
+    if row is not None:
+        config = row.__getattr__('config')
+        if config:
+            return _startup.StoredConfig(config)
+
+    return None
+
+
+def decode_config(config):
+    '''
+    Returns the configuration stored in a StoredConfig
+    '''
+    return config.get_document()
+
+
+def iter_config(config, chunk_size=READ_CHUNK_SIZE):
+    '''
+    Returns a generator over the JSON encoding of the configuration
+    stored in a StoredConfig, decoded chunk_size bytes of base64 at a
+    time. The configuration is verified first, a corrupted one raises
+    before anything is returned.
+    '''
+    config.verify(chunk_size)
+    return config.iter_json(chunk_size)
+
+
+def get_fingerprint(idl):
+    '''
+    Returns the hash tree of the startup configuration, None if there
+    is none. It's only computed again when the stored configuration's
+    hash changes.
+    '''
+    config = get_startup_config(idl)
+    if config is None:
+        return None
+
+    # legacy configurations don't have a stored hash
+    digest = config.digest
+    if digest is None:
+        digest = hashlib.sha1(config.data).hexdigest()
+
+    if _fingerprint_cache.get('digest') != digest:
+        row_hashes = _fingerprint.get_row_hashes(config.get_document())
+        _fingerprint_cache['fingerprint'] = \
+            _fingerprint.ConfigFingerprint(row_hashes)
+        _fingerprint_cache['digest'] = digest
+
+    return _fingerprint_cache['fingerprint']
+
+
+def get_versions(idl):
+    '''
+    Returns the versions of the startup configuration that can be
+    read, from the current one to the oldest one in the history.
+    '''
+    config = get_startup_config(idl)
+    if config is None:
+        return []
+
+    versions = [config.version]
+    for delta, row in get_history_rows(idl):
+        if delta.version != versions[-1] - 1:
+            break
+        versions.append(delta.version)
+
+    return versions
+
+
+def read_version(idl, version):
+    '''
+    Returns a previous version of the startup configuration, rebuilt
+    from the current one and the deltas of the more recent versions.
+    None if the version is no longer in the history.
+    '''
+    config = get_startup_config(idl)
+    if config is None or version > config.version:
+        return None
+
+    document = config.get_document()
+    current_version = config.version
+    for delta, row in get_history_rows(idl):
+        if current_version == version:
+            break
+        if delta.version != current_version - 1:
+            return None
+        document = _startup.apply_delta(document, delta.get_document())
+        current_version = delta.version
+
+    if current_version != version:
+        return None
+
+    return document
+
+
+def set_startup_config(idl, txn, data):
+    '''
+    Stages the update of the "config" field of the row with
+    type == startup in txn, creating the row if not found.
+
+    The previous configuration is kept in a row with type ==
+    startup-history as the delta restoring it from the new one, up
+    to HISTORY_SIZE of them. Nothing is staged if the configuration
+    doesn't change.
+    '''
+    row = get_startup_row(idl)
+    version = 1
+
+    if row is None:
+        row = txn.insert(idl.tables['config'])
+        row.__setattr__('type', STARTUP_TYPE)
+    elif row.__getattr__('config'):
+        try:
+            config = _startup.StoredConfig(row.__getattr__('config'))
+            current = config.get_document()
+        except _startup.DECODE_ERRORS:
+            # the corrupted configuration can't be kept in the history
+            current = None
+
+        if current is not None:
+            if current == data:
+                return
+
+            history = txn.insert(idl.tables['config'])
+            history.__setattr__('type', HISTORY_TYPE)
+            history.__setattr__('config', _startup.encode(
+                _startup.make_delta(data, current),
+                _startup.CODEC_ZLIB_DELTA, config.version))
+            version = config.version + 1
+
+            for delta, history_row in get_history_rows(idl):
+                if delta.version <= config.version - HISTORY_SIZE:
+                    history_row.delete()
+
+    row.__setattr__('config', _startup.encode(data, _startup.CODEC_ZLIB,
+                                              version))
+
+
 def read():
     '''
     Walk through the rows in the config table (if any)
@@ -47,16 +242,15 @@ def read():
     If found, return content of the "config" field in that row.
 
     'config' is stored in DB as a JSON string
+
+    This blocks until connected to the database, the REST daemon
+    reads through its own connection instead.
     '''
 
     idl = connect()
-    for ovs_rec in idl.tables["config"].rows.itervalues():
-        row_type = ovs_rec.__getattr__('type')
-        if row_type and row_type == 'startup':
-                config = ovs_rec.__getattr__('config')
-                if config:
-                    data = base64.b64decode(config)
-                    return json.loads(data)
+    config = get_startup_config(idl)
+    if config:
+        return decode_config(config)
 
     return None
 
@@ -68,24 +262,13 @@ def write(data):
 
     If found, update content of the "config" field in that row.
     If not found, create new row and set "config" field
+
+    This blocks until the transaction is committed, the REST daemon
+    writes through its own connection instead.
     '''
     idl = connect()
-    row = None
-    for ovs_rec in idl.tables['config'].rows.itervalues():
-        row_type = ovs_rec.__getattr__('type')
-        if row_type and row_type == 'startup':
-            row = ovs_rec
-            break
-
     txn = Transaction(idl)
-
-    if row is None:
-        row = txn.insert(idl.tables['config'])
-        row.__setattr__('type', 'startup')
-        is_new = True
-
-    base64data = base64.b64encode(json.dumps(data))
-    row.__setattr__('config', base64data)
+    set_startup_config(idl, txn, data)
 
     result = txn.commit_block()
     error = txn.get_error()
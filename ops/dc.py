@@ -12,7 +12,9 @@
 #   License for the specific language governing permissions and limitations
 #   under the License.
 
-import _read, _write
+import weakref
+
+import _read, _write, _diff, _snapshot, _export, _fingerprint
 import ops.constants, ops.opsidl
 
 from ovs.db.idl import SchemaHelper, Idl, Transaction
@@ -20,6 +22,14 @@ from ovs.db.idl import SchemaHelper, Idl, Transaction
 import ovs.vlog
 vlog = ovs.vlog.Vlog('dc')
 
+# Stages of write_steps
+WRITE_STAGE_ROWS = 'rows'
+WRITE_STAGE_REFERENCES = 'references'
+WRITE_STAGE_VALIDATION = 'validation'
+WRITE_STAGE_DONE = 'done'
+
+_snapshots = weakref.WeakKeyDictionary()
+
 
 def register(extschema, ovsschema, ovsremote):
     """Register interest in all configuration and index
@@ -108,8 +118,70 @@ def read(extschema, idl):
     vlog.dbg('succcess generating running configuration')
     return config
 
-def write(data, extschema, idl, txn=None, block=False):
-    """Write a new configuration to OpenSwitch OVSDB database
+
+def get_snapshot(extschema, idl):
+    """Get the running configuration snapshot of an IDL
+
+    The snapshot is kept up to date from the row updates received by
+    the IDL, so only the rows that changed since the previous call are
+    read from it.
+
+    Args:
+        extschema (opslib.RestSchema): This is the
+            parsed extended-schema (vswitch.extschema) object.
+        idl (ops.opsidl.OpsIdl): This is the IDL object that
+            represents the OVSDB IDL.
+
+    Returns:
+        _snapshot.ConfigSnapshot: The refreshed snapshot. Its
+            get_config() returns the same data as read(),
+            get_etag() an entity tag derived from its version and
+            get_fingerprint() the configuration's hash tree.
+    """
+    snapshot = _snapshots.get(idl)
+    if snapshot is None or snapshot.extschema is not extschema:
+        if snapshot is not None and snapshot.tracking:
+            idl.remove_row_observer(snapshot)
+        snapshot = _snapshot.ConfigSnapshot(extschema, idl)
+        _snapshots[idl] = snapshot
+
+    snapshot.refresh()
+    return snapshot
+
+
+def fingerprint(config):
+    """Compute the hash tree of a configuration
+
+    Args:
+        config (dict): The configuration, as returned by read().
+
+    Returns:
+        _fingerprint.ConfigFingerprint: The hashes of the rows, of the
+            tables and of the configuration. The running configuration
+            snapshot keeps its own up to date, see get_snapshot.
+    """
+    return _fingerprint.ConfigFingerprint(
+        _fingerprint.get_row_hashes(config))
+
+
+def iter_json(config, extschema):
+    """Encode a configuration as JSON piece by piece
+
+    Args:
+        config (dict): The configuration, as returned by read().
+        extschema (opslib.RestSchema): This is the
+            parsed extended-schema (vswitch.extschema) object.
+
+    Returns:
+        generator: Yields the fragments of the JSON encoding of
+            config, one row at a time, so the encoding doesn't have
+            to be held in memory as a whole.
+    """
+    return _export.iter_config_json(config, extschema)
+
+
+def diff(data, extschema, idl, current=None):
+    """Compare a new configuration with the current one
 
     Args:
         data (dict): The new configuration represented as a Python
@@ -118,57 +190,212 @@ def write(data, extschema, idl, txn=None, block=False):
             parsed extended-schema (vswitch.extschema) object.
         idl (ovs.db.idl.Idl): This is the IDL object that
             represents the OVSDB IDL.
-        txn (ovs.db.idl.Transaction): OVSDB transaction object.
-        block (boolean): if block is True, commit_block() is used
+        current (dict): The configuration to compare with, the
+            running configuration snapshot is used if not given.
 
     Returns:
-        result : The result of transaction commit
+        _diff.ConfigDiff: The rows created, updated and deleted per
+            table by writing the new configuration.
+    """
+    if current is None:
+        current = get_snapshot(extschema, idl).get_config()
+
+    return _diff.diff_config(current, data, extschema)
+
+
+class WriteProgress(object):
+    """Progress of a configuration being staged by write_steps
+
+    Attributes:
+        stage (str): One of the WRITE_STAGE_* constants.
+        table (str): Table being staged.
+        rows (int): Number of top level rows already staged
+            in the current stage.
+        total (int): Number of top level rows in the new
+            configuration.
+        errors (list): Validation errors, set once the
+            configuration is validated.
+    """
+    def __init__(self, total=0):
+        self.stage = WRITE_STAGE_ROWS
+        self.table = None
+        self.rows = 0
+        self.total = total
+        self.errors = None
+
+
+def write_steps(data, extschema, idl, txn, initial=False):
+    """Stage a new configuration in an OVSDB transaction step by step
+
+    This is a generator that sets up a single row of a top level
+    table at a time and yields after each one, so that callers can
+    do other work in between. The transaction is neither committed
+    nor aborted, and nothing can run the IDL while it is being staged.
+
+    Args:
+        data (dict): The new configuration represented as a Python
+            dictionary object.
+        extschema (opslib.RestSchema): This is the
+            parsed extended-schema (vswitch.extschema) object.
+        idl (ovs.db.idl.Idl): This is the IDL object that
+            represents the OVSDB IDL.
+        txn (ovs.db.idl.Transaction): OVSDB transaction object.
+        initial (boolean): if initial is True, the database is
+            expected to hold hardware rows only, e.g. when the startup
+            configuration is applied at boot.
+
+    Yields:
+        WriteProgress: The same progress object on every step. Once
+            the stage is WRITE_STAGE_DONE, its errors attribute holds
+            the validation errors if there were any.
+
+    Only the top level rows that differ from the current
+    configuration, and their children, are written. An initial
+    apply writes every row without comparing, nor deleting, anything.
+    Rows are looked up in maps of the database built beforehand, and
+    validators are run table by table.
     """
-    if txn is None:
-        try:
-            txn = Transaction(idl)
-            block = True
-        except AssertionError as e:
-            vlog.dbg('error in creating transaction: %s' % e)
-            return e
+
+    config_diff = None
+    if not initial:
+        config_diff = diff(data, extschema, idl)
 
     # dc.read returns config db with 'System' table
     # indexed to 'System' keyword. Replace it with
     # current database's System row UUID so that all
     # tables in 'data' are represented the same way
 
-    try:
-        system_uuid = idl.tables[ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE].rows.keys()[0]
-        data[ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE] = {system_uuid:data[ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE]}
+    system_uuid = idl.tables[ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE].rows.keys()[0]
+    data[ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE] = {system_uuid:data[ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE]}
 
-        _write.setup_validators(extschema, idl)
+    _write.setup_validators(extschema, idl)
+    _write.global_ref_list.clear()
+    if initial:
+        _write.setup_initial_maps(extschema, idl)
+    else:
+        _write.clear_initial_maps()
 
+    # the maps are module state, they must not outlive this write
+    # even if the caller stops iterating midway
+    try:
         # iterate over all top-level tables i.e. root
-        for table_name, tableschema in extschema.ovs_tables.iteritems():
-
-            # iterate over non-children tables
-            if extschema.ovs_tables[table_name].parent is not None:
+        root_tables = [table_name for table_name, tableschema
+                       in extschema.ovs_tables.iteritems()
+                       if tableschema.parent is None]
+
+        total = 0
+        for table_name in root_tables:
+            if table_name in data:
+                total += len(data[table_name])
+        progress = WriteProgress(total)
+
+        # set up the non-child tables
+        for table_name in root_tables:
+            progress.table = table_name
+            if table_name not in data:
+                if not initial:
+                    _write.setup_table(table_name, data, extschema, idl, txn)
+                    yield progress
                 continue
 
-            # set up the non-child table
-            _write.setup_table(table_name, data, extschema, idl, txn)
+            changed = _get_changed_rows(config_diff, table_name, data)
+            for rowindex in _write.setup_table_rows(table_name, data,
+                                                    extschema, idl, txn,
+                                                    changed):
+                progress.rows += 1
+                yield progress
 
         # iterate over all tables to fill in references
-        for table_name, tableschema in extschema.ovs_tables.iteritems():
-
-            if extschema.ovs_tables[table_name].parent is not None:
+        progress.stage = WRITE_STAGE_REFERENCES
+        progress.rows = 0
+        for table_name in root_tables:
+            if table_name not in data:
                 continue
 
-            _write.setup_references(table_name, data, extschema, idl)
+            progress.table = table_name
+            changed = _get_changed_rows(config_diff, table_name, data)
+            for rowindex in _write.setup_table_references(table_name, data,
+                                                          extschema, idl,
+                                                          changed):
+                progress.rows += 1
+                yield progress
+
+        progress.stage = WRITE_STAGE_VALIDATION
+        progress.table = None
+        yield progress
+
+        progress.errors = _write.exec_validators()
+    finally:
+        _write.clear_initial_maps()
+
+    progress.stage = WRITE_STAGE_DONE
+    yield progress
+
+
+def _get_changed_rows(config_diff, table_name, data):
+    if config_diff is None:
+        return None
+
+    changed = config_diff.changed[table_name]
+    # the System row is indexed by its UUID in data
+    if table_name == ops.constants.OVSDB_SCHEMA_SYSTEM_TABLE:
+        if table_name in changed:
+            return set(data[table_name].keys())
+        return set()
+    return changed
+
+
+def write(data, extschema, idl, txn=None, block=False, initial=False):
+    """Write a new configuration to OpenSwitch OVSDB database
+
+    Args:
+        data (dict): The new configuration represented as a Python
+            dictionary object.
+        extschema (opslib.RestSchema): This is the
+            parsed extended-schema (vswitch.extschema) object.
+        idl (ovs.db.idl.Idl): This is the IDL object that
+            represents the OVSDB IDL.
+        txn (ovs.db.idl.Transaction): OVSDB transaction object.
+        block (boolean): if block is True, commit_block() is used
+        initial (boolean): if initial is True, the configuration is
+            applied to a database holding hardware rows only, see
+            write_steps.
+
+    Returns:
+        result : The result of transaction commit
+    """
+    if txn is None:
+        try:
+            txn = Transaction(idl)
+            block = True
+        except AssertionError as e:
+            vlog.dbg('error in creating transaction: %s' % e)
+            return e
+
+    try:
+        for progress in write_steps(data, extschema, idl, txn, initial):
+            pass
 
-        validation_errors = _write.exec_validators()
-        if validation_errors:
-            return (txn.ERROR, validation_errors)
+        if progress.errors:
+            return (txn.ERROR, progress.errors)
 
     except Exception as e:
         txn.abort()
         return (txn.ERROR, e)
 
+    return commit(txn, block)
+
+
+def commit(txn, block=False):
+    """Commit a transaction staged by write_steps
+
+    Args:
+        txn (ovs.db.idl.Transaction): OVSDB transaction object.
+        block (boolean): if block is True, commit_block() is used
+
+    Returns:
+        result : The result of transaction commit
+    """
     try:
         if not block:
             # txn maybe be incomplete
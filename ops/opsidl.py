@@ -25,12 +25,28 @@ class OpsIdl(Idl):
 
     """
     def __init__(self, remote, schema):
+        self._row_observers = []
         Idl.__init__(self, remote, schema)
         self._clear_all_index_maps()
 
     def _Idl__clear(self):
         self._clear_all_index_maps()
         Idl._Idl__clear(self)
+        for observer in self._row_observers:
+            observer.rows_cleared()
+
+    def add_row_observer(self, observer):
+        """
+        Registers an object to be told about every row update received
+        from the database. observer.row_changed(table_name, uuid, old,
+        new) is called with the update's old and new column values, and
+        observer.rows_cleared() when all the rows are dropped.
+        """
+        self._row_observers.append(observer)
+
+    def remove_row_observer(self, observer):
+        if observer in self._row_observers:
+            self._row_observers.remove(observer)
 
     def _clear_all_index_maps(self):
         for table in self.tables.itervalues():
@@ -51,6 +67,9 @@ class OpsIdl(Idl):
             row = table.rows.get(uuid)
             self._update_index_map(row, table, ovs.db.idl.ROW_CREATE, new)
 
+        for observer in self._row_observers:
+            observer.row_changed(table.name, uuid, old, new)
+
         return changed
 
     def _update_index_map(self, row, table, operation, new=None):
@@ -294,6 +294,17 @@ def config_child_column(column, table, extschema, categories):
 
     return config
 
+def get_child_table(column, table_schema):
+    """
+    Returns the table of the children rows stored in a column, children
+    are stored in a reference column or in a column named after their
+    table
+    """
+    if column in table_schema.references:
+        return table_schema.references[column].ref_table
+    return column
+
+
 def is_immutable_table(table, extschema):
     default_tables = ['Bridge', 'VRF']
     if extschema.ovs_tables[table].mutable and table not in default_tables:
@@ -74,11 +74,22 @@ class ValidatorAdapter(object):
                 delete_op_data.resource_row.delete()
 
     def _exec_modification_validators(self):
-        for create_op_data in self.resource_ops_dict[ops.constants.REQUEST_TYPE_CREATE]:
-            self._exec_validator_with_op(create_op_data)
-
-        for update_op_data in self.resource_ops_dict[ops.constants.REQUEST_TYPE_UPDATE]:
-            self._exec_validator_with_op(update_op_data)
+        # rows are validated by table, so validators can check a whole
+        # table's rows at once and tables without validators are skipped
+        for op in (ops.constants.REQUEST_TYPE_CREATE,
+                   ops.constants.REQUEST_TYPE_UPDATE):
+            table_rows = {}
+            for op_data in self.resource_ops_dict[op]:
+                table_rows.setdefault(op_data.resource_table, []).append(
+                    (op_data.resource_row, op_data.p_resource_table,
+                     op_data.p_resource_row))
+
+            for table_name, rows in table_rows.iteritems():
+                vlog.dbg("Validating %d operations %s on table %s" %
+                         (len(rows), op, table_name))
+                validator.exec_validators_batch(self.idl, self.extschema,
+                                                table_name, op, rows,
+                                                self.errors)
 
     def exec_validators_with_ops(self):
         vlog.dbg("Executing validators for all ops..")
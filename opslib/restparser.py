@@ -97,6 +97,11 @@ class OVSColumn(object):
     - desc: the column's documentation/description text
     - emptyValue: value assumed for the column, if is_optional=True and empty
     '''
+    __slots__ = ('name', 'category', 'is_optional', 'emptyValue', 'mutable',
+                 'enum', 'keyname', 'type', 'rangeMin', 'rangeMax',
+                 'value_type', 'valueRangeMin', 'valueRangeMax', 'is_dict',
+                 'is_list', 'n_max', 'n_min', 'kvs', 'desc')
+
     def __init__(self, table_name, column_name, ovs_base_type,
                  is_optional=True, mutable=True, category=None,
                  emptyValue=None, valueMap=None, keyname=None,
@@ -216,6 +221,9 @@ class OVSReference(OVSColumn):
     - relation: relationship type between this column and the referenced table
     - is_plural: whether the column is plural
     '''
+    __slots__ = ('kv_type', 'kv_key_type', 'ref_table', 'relation',
+                 'is_plural')
+
     def __init__(self, table_name, column_name, ovs_base_type,
                  is_optional=True, mutable=True, category=None, valueMap=None,
                  keyname=None, col_doc=None, group=None,
@@ -252,9 +260,13 @@ class OVSReference(OVSColumn):
 
 
 class OVSColumnCategory(object):
+    __slots__ = ('dynamic', 'value', 'per_value', 'follows')
+
     def __init__(self, category):
         self.dynamic = False
         self.value = None
+        self.per_value = None
+        self.follows = None
         self.validate(category)
 
         # Process category type
@@ -282,7 +294,10 @@ class OVSColumnCategory(object):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return (self.dynamic == other.dynamic and
+                    self.value == other.value and
+                    self.per_value == other.per_value and
+                    self.follows == other.follows)
         elif isinstance(other, (str, unicode)):
             return self.value == other
         else:
@@ -311,8 +326,28 @@ class OVSColumnCategory(object):
             raise error.Error('Unknown category: %s' % value)
 
 
+# Categories given as a plain string never change, a single instance
+# is shared by all the columns of all the tables
+_static_categories = {}
+
+
+def get_column_category(category):
+    if isinstance(category, dict):
+        return OVSColumnCategory(category)
+
+    if category not in _static_categories:
+        _static_categories[category] = OVSColumnCategory(category)
+    return _static_categories[category]
+
+
 class OVSTable(object):
     '''__init__() functions as the class constructor'''
+    __slots__ = ('name', 'plural_name', 'is_root', 'columns',
+                 'readonly_columns', 'is_many', 'config', 'default_config',
+                 'status', 'stats', 'dynamic', 'parent', 'children',
+                 'references', 'index_columns', 'indexes', 'desc',
+                 'groupsDesc', 'mutable', '__weakref__')
+
     def __init__(self, name, is_root, is_many=True, desc=None,
                  groupsDesc=None):
         self.name = name
@@ -424,9 +459,9 @@ class OVSTable(object):
             # per-value: matches the possible value with the desired category
             # follows: Reference to the column used to determine the column
             #          category
-            category = OVSColumnCategory(parser.get_optional('category',
-                                                             [str, unicode,
-                                                              dict]))
+            category = get_column_category(parser.get_optional('category',
+                                                               [str, unicode,
+                                                                dict]))
             relationship = parser.get_optional('relationship', [str, unicode])
             mutable = parser.get_optional('mutable', [bool], True)
 
@@ -612,6 +647,21 @@ class RESTSchema(object):
         for table in self.ovs_tables.itervalues():
             self.plural_name_map[table.plural_name] = table.name
 
+        # table name to {column name: validator} mapping for
+        # configuration columns, see compile_validators
+        self.validators = {}
+
+    def compile_validators(self, compiler):
+        '''
+        Compiles every configuration column of every table into a
+        validator using compiler(column_name, column)
+        '''
+        for table_name, table in self.ovs_tables.iteritems():
+            validators = {}
+            for column_name, column in table.config.iteritems():
+                validators[column_name] = compiler(column_name, column)
+            self.validators[table_name] = validators
+
     @staticmethod
     def from_json(_json, loadDescription):
         parser = ovs.db.parser.Parser(_json, 'extended OVSDB schema')
@@ -28,7 +28,7 @@ from opsrest.notifications.constants import (
 class NotificationSubscriberValidator(BaseValidator):
     resource = SUBSCRIBER_TABLE_LOWER
 
-    def _is_websocket_subscriber(self, subscriber_row):
+    def _is_connection_subscriber(self, subscriber_row):
         subscriber_type = get_column_data_from_row(subscriber_row,
                                                    SUBSCRIBER_TYPE)
         return subscriber_type == SUBSCRIBER_TYPE_WS
@@ -39,9 +39,10 @@ class NotificationSubscriberValidator(BaseValidator):
         subscriber_name = get_column_data_from_row(subscriber_row,
                                                    SUBSCRIBER_NAME)
 
-        if self._is_websocket_subscriber(subscriber_row):
+        if self._is_connection_subscriber(subscriber_row):
             details = "Subscriber: %s. " % subscriber_name
-            details += "Cannot explicitly delete WebSocket based subscriber"
+            details += "Cannot explicitly delete WebSocket or SSE "
+            details += "based subscriber"
             raise ValidationError(error.METHOD_PROHIBITED, details)
 
     def validate_modification(self, validation_args):
@@ -51,7 +52,8 @@ class NotificationSubscriberValidator(BaseValidator):
             subscriber_name = get_column_data_from_row(subscriber_row,
                                                        SUBSCRIBER_NAME)
 
-            if self._is_websocket_subscriber(subscriber_row):
+            if self._is_connection_subscriber(subscriber_row):
                 details = "Subscriber: %s. " % subscriber_name
-                details += "Cannot explicitly add WebSocket based subscriber"
+                details += "Cannot explicitly add WebSocket or SSE "
+                details += "based subscriber"
                 raise ValidationError(error.METHOD_PROHIBITED, details)
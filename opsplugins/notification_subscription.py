@@ -24,6 +24,7 @@ from opsrest.notifications.constants import (
 )
 from opsrest.constants import REQUEST_TYPE_READ
 from opsrest.parse import parse_url_path
+from opsrest.notifications.policy import split_resource_uri
 
 
 class NotificationSubscriptionValidator(BaseValidator):
@@ -54,9 +55,65 @@ class NotificationSubscriptionValidator(BaseValidator):
             self._verify_valid_resource_uri(subscriber_name, subscription_row,
                                             resource_uri, schema, idl)
 
+    def validate_modifications(self, batch):
+        # resource URIs of every subscriber, counted once for the batch
+        uri_counts = {}
+        for validation_args in batch:
+            if not validation_args.is_new:
+                continue
+
+            subscriber_row = validation_args.p_resource_row
+            subscription_row = validation_args.resource_row
+            subscriber_name = get_column_data_from_row(subscriber_row,
+                                                       SUBSCRIBER_NAME)
+            resource_uri = get_column_data_from_row(subscription_row,
+                                                    SUBSCRIPTION_URI)
+
+            app_log.debug("Verifying if subscription can be added for "
+                          "subscriber %s" % subscriber_name)
+
+            if subscriber_row.uuid not in uri_counts:
+                uri_counts[subscriber_row.uuid] = \
+                    self._count_resource_uris(
+                        subscriber_row, validation_args.resource_schema)
+
+            # the subscriber's subscriptions include the new one
+            resource_path = _get_resource_path(resource_uri)
+            if uri_counts[subscriber_row.uuid].get(resource_path, 0) > 1:
+                app_log.debug("Duplicate resource URI detected")
+                details = "Subscriber: %s. " % subscriber_name
+                details += "URI %s already exists" % resource_uri
+                raise ValidationError(error.DUPLICATE_RESOURCE, details)
+
+            self._verify_valid_resource_uri(subscriber_name, subscription_row,
+                                            resource_uri,
+                                            validation_args.schema,
+                                            validation_args.idl)
+
+    def _count_resource_uris(self, subscriber_row, subscription_schema):
+        subscriber_subscriptions = \
+            get_column_data_from_row(subscriber_row,
+                                     subscription_schema.plural_name)
+
+        uri_counts = {}
+        for sub_row in (subscriber_subscriptions or {}).itervalues():
+            resource_path = _get_resource_path(
+                get_column_data_from_row(sub_row, SUBSCRIPTION_URI))
+            uri_counts[resource_path] = uri_counts.get(resource_path, 0) + 1
+        return uri_counts
+
     def _verify_valid_resource_uri(self, subscriber_name, subscription_row,
                                    resource_uri, schema, idl):
         app_log.debug("Verifying a valid resource URI")
+        try:
+            resource_uri, unused_policy, projection = \
+                split_resource_uri(resource_uri)
+        except ValueError as e:
+            app_log.debug("Invalid subscription arguments detected")
+            details = "Subscriber: %s. " % subscriber_name
+            details += str(e)
+            raise ValidationError(error.VERIFICATION_FAILED, details)
+
         resource_path = parse_url_path(resource_uri, schema, idl,
                                        REQUEST_TYPE_READ)
 
@@ -66,6 +123,27 @@ class NotificationSubscriptionValidator(BaseValidator):
             details += "Invalid URI %s" % resource_uri
             raise ValidationError(error.VERIFICATION_FAILED, details)
 
+        if projection is not None:
+            self._verify_valid_projection(subscriber_name, resource_path,
+                                          projection, schema)
+
+    def _verify_valid_projection(self, subscriber_name, resource, projection,
+                                 schema):
+        app_log.debug("Verifying the projected columns")
+        while resource.next is not None:
+            resource = resource.next
+
+        schema_table = schema.ovs_tables[resource.table]
+        for column in projection.columns:
+            if column not in schema_table.config and \
+                    column not in schema_table.stats and \
+                    column not in schema_table.status and \
+                    column not in schema_table.references:
+                app_log.debug("Invalid projected column detected")
+                details = "Subscriber: %s. " % subscriber_name
+                details += "Invalid column %s" % column
+                raise ValidationError(error.VERIFICATION_FAILED, details)
+
     def _verify_duplicate_subscription(self, subscriber_name, subscriber_row,
                                        subscription_row, subscription_schema,
                                        resource_uri):
@@ -91,8 +169,15 @@ class NotificationSubscriptionValidator(BaseValidator):
             curr_resource_uri = get_column_data_from_row(sub_row,
                                                          SUBSCRIPTION_URI)
 
-            if curr_resource_uri == resource_uri:
+            if _get_resource_path(curr_resource_uri) == \
+                    _get_resource_path(resource_uri):
                 app_log.debug("Duplicate resource URI detected")
                 details = "Subscriber: %s. " % subscriber_name
                 details += "URI %s already exists" % resource_uri
                 raise ValidationError(error.DUPLICATE_RESOURCE, details)
+
+
+def _get_resource_path(resource_uri):
+    # subscriptions to the same resource with other delivery policies
+    # are duplicates too
+    return resource_uri.split('?', 1)[0]
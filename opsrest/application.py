@@ -17,8 +17,11 @@ from tornado.web import Application, StaticFileHandler
 from opsrest.manager import OvsdbConnectionManager
 from opslib import restparser
 from opsrest import constants
+from opsrest import parse
+from opsrest import verify
 from opsvalidator import validator
 from opsrest.notifications.handler import NotificationHandler
+from opsrest.custom.configcontroller import ConfigWriteStatus
 import cookiesecret
 
 
@@ -28,15 +31,29 @@ class OvsdbApiApplication(Application):
         self.settings['cookie_secret'] = cookiesecret.generate_cookie_secret()
         schema = self.settings.get('ext_schema')
         self.restschema = restparser.parseSchema(schema)
+        # Compile the URI routes and column validators once instead of
+        # on every request
+        parse.get_router(self.restschema)
+        self.restschema.compile_validators(verify.compile_column_validator)
         self.manager = OvsdbConnectionManager(self.settings.get('ovs_remote'),
                                               self.settings.get('ovs_schema'),
                                               self.restschema)
+        # Startup configuration is read and written through a
+        # persistent connection to the configuration database
+        self.cfg_manager = \
+            OvsdbConnectionManager(self.settings.get('ovs_remote'),
+                                   self.settings.get('cfg_db_schema'),
+                                   self.restschema)
+        # Progress of the last running configuration update, reported
+        # by the controllers of the requests that follow it
+        self.config_write_status = ConfigWriteStatus()
         self._url_patterns = self._get_url_patterns()
         Application.__init__(self, self._url_patterns, **self.settings)
 
         # We must block the application start until idl connection
         # and replica is ready
         self.manager.start()
+        self.cfg_manager.start(constants.CFG_DB_TABLES)
 
         # Load all custom validators
         validator.init_plugins(constants.OPSPLUGIN_DIR)
@@ -40,6 +40,11 @@ REST_QUERY_PARAM_OFFSET = 'offset'
 REST_QUERY_PARAM_LIMIT = 'limit'
 REST_QUERY_PARAM_DEPTH = "depth"
 REST_QUERY_PARAM_KEYS = 'keys'
+REST_QUERY_PARAM_DRY_RUN = 'dry_run'
+REST_QUERY_PARAM_VERSION = 'version'
+REST_QUERY_PARAM_FINGERPRINT = 'fingerprint'
+REST_QUERY_PARAM_WAIT = 'wait'
+REST_QUERY_PARAM_TIMEOUT = 'timeout'
 
 # Recursive GET argument depth max value
 # Set to 10 to prevent a stack overflow
@@ -82,9 +87,12 @@ HTTP_HEADER_LOCATION = "Location"
 
 HTTP_HEADER_CONDITIONAL_IF_MATCH = 'If-Match'
 HTTP_HEADER_ETAG = 'Etag'
+HTTP_HEADER_LAST_EVENT_ID = 'Last-Event-ID'
 
 # HTTP Content Types
 HTTP_CONTENT_TYPE_JSON = 'application/json; charset=UTF-8'
+HTTP_CONTENT_TYPE_MERGE_PATCH = 'application/merge-patch+json'
+HTTP_CONTENT_TYPE_EVENT_STREAM = 'text/event-stream'
 
 # HTTP Request Types
 REQUEST_TYPE_CREATE = 'POST'
@@ -143,6 +151,32 @@ OPSPLUGIN_DIR = '/usr/share/opsplugins'
 # Declarative Config
 CONFIG_TYPE_RUNNING = "running"
 CONFIG_TYPE_STARTUP = "startup"
+CONFIG_TYPE_DIFF = "diff"
+CONFIG_STATUS_RESOURCE = "status"
+
+# Tables of the configuration database used for the startup config
+CFG_DB_TABLES = ["config"]
+
+# Seconds a running config update stages rows
+# before letting the IOLoop serve other requests
+CONFIG_WRITE_TIME_SLICE = 0.05
+
+# Seconds a running config update lets other requests
+# run while it is staged. The IDL doesn't read the
+# database connection meanwhile, the rest of the update
+# is then staged at once so that the inactivity probe
+# of the database server is answered in time
+CONFIG_WRITE_MAX_INTERLEAVED_TIME = 2
+
+# States of a running config update besides
+# the IDL transaction states it ends with
+CONFIG_WRITE_IDLE = "idle"
+CONFIG_WRITE_STAGING = "staging"
+CONFIG_WRITE_COMMITTING = "committing"
+
+# Bytes of a streamed response written before
+# flushing them to the client
+RESPONSE_STREAM_CHUNK_SIZE = 64 * 1024
 
 # PATCH operation's keys according to RFC 6902
 PATCH_KEY_OP = 'op'
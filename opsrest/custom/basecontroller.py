@@ -53,6 +53,24 @@ class BaseController():
     def get_all(self, current_user=None, selector=None, query_args=None):
         raise MethodNotAllowed
 
+    @gen.coroutine
+    def get_etag(self, item_id=None, current_user=None, selector=None,
+                 query_args=None):
+        """
+        Returns the entity tag of the resource if the controller can tell
+        it without fetching the resource, None otherwise
+        """
+        raise gen.Return(None)
+
+    @gen.coroutine
+    def get_stream(self, item_id=None, current_user=None, selector=None,
+                   query_args=None):
+        """
+        Returns a generator over the fragments of the resource's JSON
+        encoding if the controller streams it, None otherwise
+        """
+        raise gen.Return(None)
+
     @gen.coroutine
     def create_uri(self, item_id):
         return REST_VERSION_PATH + OVSDB_SCHEMA_SYSTEM_URI + "/" +\
@@ -12,18 +12,74 @@
 #  License for the specific language governing permissions and limitations
 #  under the License.
 
+import time
+
 from tornado.log import app_log
 from tornado import gen
 
 # Local imports
 import ops.dc
-import ops.cfgd
 from opsrest.exceptions import DataValidationFailed,\
-    NotModified, InternalError, NotFound, APIException
+    NotModified, InternalError, NotFound, APIException, MethodNotAllowed,\
+    Conflict
 from opsrest.transaction import OvsdbTransactionResult
 from opsrest.custom.basecontroller import BaseController
+from opsrest.utils import cfgdutils
 from opsrest.constants import CONFIG_TYPE_RUNNING,\
-    CONFIG_TYPE_STARTUP, SUCCESS, UNCHANGED, INCOMPLETE, ERROR
+    CONFIG_TYPE_STARTUP, SUCCESS, UNCHANGED, INCOMPLETE, ERROR,\
+    CONFIG_STATUS_RESOURCE, CONFIG_WRITE_TIME_SLICE, CONFIG_WRITE_IDLE,\
+    CONFIG_WRITE_MAX_INTERLEAVED_TIME,\
+    CONFIG_WRITE_STAGING, CONFIG_WRITE_COMMITTING, REST_QUERY_PARAM_DRY_RUN,\
+    REST_QUERY_PARAM_VERSION, REST_QUERY_PARAM_FINGERPRINT, CONFIG_TYPE_DIFF
+
+
+class ConfigWriteStatus(object):
+    """
+    Progress of the last running configuration update, as reported
+    by the full-configuration status resource
+    """
+    def __init__(self):
+        self.state = CONFIG_WRITE_IDLE
+        self.progress = None
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    def start(self):
+        self.state = CONFIG_WRITE_STAGING
+        self.progress = None
+        self.started = time.time()
+        self.finished = None
+        self.error = None
+
+    def update(self, progress):
+        self.progress = progress
+
+    def commit(self):
+        self.state = CONFIG_WRITE_COMMITTING
+
+    def finish(self, status, error=None):
+        self.state = status
+        self.finished = time.time()
+        if error is not None and not isinstance(error, (dict, list)):
+            error = str(error)
+        self.error = error
+
+    def to_json(self):
+        data = {"state": self.state,
+                "started": self.started,
+                "finished": self.finished}
+
+        if self.progress is not None:
+            data["stage"] = self.progress.stage
+            data["table"] = self.progress.table
+            data["rows"] = self.progress.rows
+            data["total_rows"] = self.progress.total
+
+        if self.error is not None:
+            data["error"] = self.error
+
+        return data
 
 
 class ConfigController(BaseController):
@@ -31,19 +87,30 @@ class ConfigController(BaseController):
     def initialize(self):
         self.idl = self.context.manager.idl
         self.schema = self.context.restschema
+        self.cfg_manager = self.context.cfg_manager
+        self.write_status = self.context.config_write_status
         self.txn = None
 
     @gen.coroutine
     def update(self, item_id, data, current_user, query_args):
+        if item_id is not None:
+            raise MethodNotAllowed
+
+        staged = False
+        plan = None
         try:
             request_type = self.get_request_type(query_args)
             self.check_config_type(request_type)
             status = None
             error = None
-            if request_type == CONFIG_TYPE_RUNNING:
+            if self.is_dry_run(query_args):
+                plan = yield self.get_plan(request_type, data)
+            elif request_type == CONFIG_TYPE_RUNNING:
+                # only one configuration can be staged at a time
+                yield self.context.manager.wait_for_staging()
                 self.txn = self.context.manager.get_new_transaction()
-                (status, error) = ops.dc.write(data, self.schema,
-                                               self.idl, self.txn.txn)
+                staged = True
+                (status, error) = yield self.write_running_config(data)
                 app_log.debug('Transaction result: %s', status)
 
                 if status == INCOMPLETE:
@@ -52,39 +119,212 @@ class ConfigController(BaseController):
                     status = self.txn.status
                     if status == ERROR:
                         error = self.txn.get_error()
+
+                self.write_status.finish(status, error)
             else:
-                # FIXME: This is a blocking call.
-                (status, error) = ops.cfgd.write(data)
+                (status, error) = yield cfgdutils.write(self.cfg_manager,
+                                                        data)
 
-            if status != SUCCESS:
+            if plan is None and status != SUCCESS:
                 if status == UNCHANGED:
                     raise NotModified
                 else:
-                    if request_type == CONFIG_TYPE_RUNNING:
-                        self.txn.abort()
                     raise APIException("Error: %s" % error)
 
+        except Conflict:
+            # Another configuration is being applied
+            raise
+
         except Exception as e:
-            if self.txn:
+            # A staged transaction was already ended by
+            # write_running_config, other requests may have opened
+            # theirs since, which aborting again would discard
+            if self.txn and not staged:
                 self.txn.abort()
+            if staged and self.write_status.finished is None:
+                self.write_status.finish(ERROR, e)
             raise APIException("Error: %s" % str(e))
 
+        raise gen.Return(plan)
+
+    @gen.coroutine
+    def get_plan(self, request_type, data):
+        """
+        Returns the rows created, updated and deleted per table
+        by writing the configuration, without writing it
+        """
+        if request_type == CONFIG_TYPE_RUNNING:
+            yield self.context.manager.wait_for_staging()
+            config_diff = ops.dc.diff(data, self.schema, self.idl)
+        else:
+            current = cfgdutils.read(self.cfg_manager)
+            current = current or {}
+            config_diff = ops.dc.diff(data, self.schema, self.idl, current)
+
+        raise gen.Return(config_diff.to_json())
+
+    @gen.coroutine
+    def write_running_config(self, data):
+        """
+        Stages the new running configuration in a single transaction
+        a few rows at a time, letting the IOLoop serve other requests
+        in between, and commits it once it's validated. The transaction
+        is committed or aborted before other requests can open theirs.
+        """
+        manager = self.context.manager
+        manager.begin_staging(self.txn)
+        self.write_status.start()
+        try:
+            progress = None
+            started = time.time()
+            deadline = started + CONFIG_WRITE_TIME_SLICE
+            for progress in ops.dc.write_steps(data, self.schema,
+                                               self.idl, self.txn.txn):
+                self.write_status.update(progress)
+                now = time.time()
+                if now >= deadline and \
+                        now - started < CONFIG_WRITE_MAX_INTERLEAVED_TIME:
+                    yield gen.moment
+                    deadline = time.time() + CONFIG_WRITE_TIME_SLICE
+
+            if progress.errors:
+                self.txn.abort()
+                result = (ERROR, progress.errors)
+            else:
+                self.write_status.commit()
+                result = ops.dc.commit(self.txn.txn)
+
+        except Exception as e:
+            self.txn.abort()
+            result = (ERROR, e)
+
+        finally:
+            manager.end_staging()
+
+        raise gen.Return(result)
+
+    @gen.coroutine
+    def get(self, item_id, current_user=None, selector=None,
+            query_args=None):
+        if item_id != CONFIG_STATUS_RESOURCE:
+            raise NotFound
+
+        raise gen.Return(self.write_status.to_json())
+
     @gen.coroutine
     def get_all(self, current_user, selector, query_args):
         request_type = self.get_request_type(query_args)
-        self.check_config_type(request_type)
+        self.check_config_type(request_type, read=True)
         result = None
-        if request_type == CONFIG_TYPE_RUNNING:
-            result = ops.dc.read(self.schema, self.idl)
+        if request_type == CONFIG_TYPE_DIFF:
+            result = yield self.get_drift()
+        elif self.is_fingerprint(query_args):
+            fingerprint = yield self.get_fingerprint(request_type)
+            if fingerprint is None:
+                raise NotFound
+            result = fingerprint.to_json()
+        elif request_type == CONFIG_TYPE_RUNNING:
+            yield self.context.manager.wait_for_staging()
+            snapshot = ops.dc.get_snapshot(self.schema, self.idl)
+            result = snapshot.get_config()
         else:
-            # FIXME: This is a blocking call
-            result = ops.cfgd.read()
+            version = self.get_version(query_args)
+            result = cfgdutils.read(self.cfg_manager, version)
         if result is None:
             if request_type == CONFIG_TYPE_RUNNING:
                 raise InternalError
             else:
                 raise NotFound
-        return result
+        raise gen.Return(result)
+
+    @gen.coroutine
+    def get_stream(self, item_id=None, current_user=None, selector=None,
+                   query_args=None):
+        """
+        Streams the requested configuration without building its whole
+        JSON encoding, the startup configuration is decompressed as it
+        is sent
+        """
+        if item_id is not None:
+            raise gen.Return(None)
+
+        request_type = self.get_request_type(query_args)
+        self.check_config_type(request_type, read=True)
+        if request_type == CONFIG_TYPE_DIFF or \
+                self.is_fingerprint(query_args):
+            raise gen.Return(None)
+
+        if request_type == CONFIG_TYPE_RUNNING:
+            yield self.context.manager.wait_for_staging()
+            snapshot = ops.dc.get_snapshot(self.schema, self.idl)
+            stream = ops.dc.iter_json(snapshot.get_config(), self.schema)
+        else:
+            # previous versions have to be rebuilt before being sent
+            if self.get_version(query_args) is not None:
+                raise gen.Return(None)
+
+            stream = cfgdutils.read_stream(self.cfg_manager)
+            if stream is None:
+                raise NotFound
+
+        raise gen.Return(stream)
+
+    @gen.coroutine
+    def get_fingerprint(self, request_type):
+        """
+        Returns the hash tree of the running or startup configuration,
+        None if there is no startup configuration
+        """
+        if request_type == CONFIG_TYPE_RUNNING:
+            yield self.context.manager.wait_for_staging()
+            snapshot = ops.dc.get_snapshot(self.schema, self.idl)
+            fingerprint = snapshot.get_fingerprint()
+        else:
+            fingerprint = cfgdutils.get_fingerprint(self.cfg_manager)
+
+        raise gen.Return(fingerprint)
+
+    @gen.coroutine
+    def get_drift(self):
+        """
+        Compares the running configuration with the startup one by
+        their hash trees, returning the rows that differ by table
+        """
+        running = yield self.get_fingerprint(CONFIG_TYPE_RUNNING)
+        startup = yield self.get_fingerprint(CONFIG_TYPE_STARTUP)
+        if startup is None:
+            startup = ops.dc.fingerprint({})
+
+        raise gen.Return({"running": running.root,
+                          "startup": startup.root,
+                          "equal": running.root == startup.root,
+                          "tables": running.compare(startup)})
+
+    @gen.coroutine
+    def get_etag(self, item_id=None, current_user=None, selector=None,
+                 query_args=None):
+        # The fingerprint isn't the configuration the etag identifies
+        if item_id is not None or \
+                self.get_request_type(query_args) != CONFIG_TYPE_RUNNING or \
+                self.is_fingerprint(query_args):
+            raise gen.Return(None)
+
+        yield self.context.manager.wait_for_staging()
+        snapshot = ops.dc.get_snapshot(self.schema, self.idl)
+        raise gen.Return(snapshot.get_etag())
+
+    def is_dry_run(self, query_args):
+        dry_run = query_args.get(REST_QUERY_PARAM_DRY_RUN, ["false"])
+        return dry_run[0].lower() == "true"
+
+    def get_version(self, query_args):
+        if not query_args or REST_QUERY_PARAM_VERSION not in query_args:
+            return None
+
+        try:
+            return int(query_args[REST_QUERY_PARAM_VERSION][0])
+        except ValueError:
+            raise DataValidationFailed("Invalid configuration version")
 
     def get_request_type(self, query_args):
         app_log.debug('Query args: %s', query_args)
@@ -94,12 +334,22 @@ class ConfigController(BaseController):
             typearg = query_args.get("type", CONFIG_TYPE_RUNNING)
             return typearg[0]
 
-    def check_config_type(self, request_type):
+    def is_fingerprint(self, query_args):
+        # a bare ?fingerprint is the same as ?fingerprint=true
+        if not query_args or REST_QUERY_PARAM_FINGERPRINT not in query_args:
+            return False
+
+        fingerprint = query_args[REST_QUERY_PARAM_FINGERPRINT][0]
+        return fingerprint.lower() in ("", "true")
+
+    def check_config_type(self, request_type, read=False):
         app_log.debug('Requested config type: %s', request_type)
-        if request_type not in [CONFIG_TYPE_RUNNING, CONFIG_TYPE_STARTUP]:
+        config_types = [CONFIG_TYPE_RUNNING, CONFIG_TYPE_STARTUP]
+        if read:
+            config_types.append(CONFIG_TYPE_DIFF)
+        if request_type not in config_types:
             error = "Invalid configuration type. Configuration "\
-                    "types allowed: %s, %s" %\
-                    (CONFIG_TYPE_RUNNING, CONFIG_TYPE_STARTUP)
+                    "types allowed: %s" % ", ".join(config_types)
             raise DataValidationFailed(error)
 
     @gen.coroutine
@@ -96,6 +96,11 @@ class ForbiddenMethod(APIException):
     status = httplib.responses[status_code]
 
 
+class Conflict(APIException):
+    status_code = httplib.CONFLICT
+    status = httplib.responses[status_code]
+
+
 class InternalError(APIException):
     status_code = httplib.INTERNAL_SERVER_ERROR
     status = httplib.responses[status_code]
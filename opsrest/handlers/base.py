@@ -132,6 +132,38 @@ class BaseHandler(web.RequestHandler):
             hasher.update(element)
         return '"%s"' % hasher.hexdigest()
 
+    @gen.coroutine
+    def write_stream(self, fragments):
+        """
+        Writes the fragments of a response body as they are generated,
+        flushing them to the client every RESPONSE_STREAM_CHUNK_SIZE
+        bytes. Once part of the body is flushed, errors can only be
+        logged and the response is left incomplete.
+        """
+        chunk = []
+        size = 0
+        flushed = False
+        try:
+            for fragment in fragments:
+                chunk.append(fragment)
+                size += len(fragment)
+                if size >= RESPONSE_STREAM_CHUNK_SIZE:
+                    self.write(''.join(chunk))
+                    chunk = []
+                    size = 0
+                    flushed = True
+                    yield self.flush()
+
+            if chunk:
+                self.write(''.join(chunk))
+
+        except Exception as e:
+            if not flushed:
+                self.clear()
+                raise
+            app_log.error("Error streaming response to %s: %s" %
+                          (self.request.remote_ip, e))
+
     @gen.coroutine
     def process_if_match(self):
         if HTTP_HEADER_CONDITIONAL_IF_MATCH in self.request.headers:
@@ -141,6 +173,7 @@ class BaseHandler(web.RequestHandler):
             selector = self.get_query_argument(REST_QUERY_PARAM_SELECTOR, None)
             query_arguments = self.request.query_arguments
             result = None
+            current_etag = None
 
             from opsrest.handlers.ovsdbapi import OVSDBAPIHandler
             if isinstance(self, OVSDBAPIHandler):
@@ -159,6 +192,11 @@ class BaseHandler(web.RequestHandler):
                     item_id = None
 
                 app_log.debug("Using resource_id=%s" % item_id)
+                current_etag = \
+                    yield self.controller.get_etag(item_id,
+                                                   self.get_current_user(),
+                                                   selector,
+                                                   query_arguments)
                 if item_id:
                     result = yield self.controller.get(item_id,
                                                        self.get_current_user(),
@@ -182,7 +220,8 @@ class BaseHandler(web.RequestHandler):
             etags = self.request.headers.get(HTTP_HEADER_CONDITIONAL_IF_MATCH,
                                              "").split(',')
             app_log.debug("Header Etag: %s" % etags)
-            current_etag = self.compute_etag(json.dumps(result))
+            if current_etag is None:
+                current_etag = self.compute_etag(json.dumps(result))
             app_log.debug("Current etag: %s" % current_etag)
             for e in etags:
                 if e == current_etag or e == '"*"':
@@ -26,7 +26,7 @@ from opsrest.exceptions import APIException, MethodNotAllowed, \
     LengthRequired, ParseError
 from opsrest.constants import\
     HTTP_HEADER_CONTENT_TYPE, HTTP_CONTENT_TYPE_JSON,\
-    REST_QUERY_PARAM_SELECTOR, HTTP_HEADER_CONTENT_LENGTH
+    REST_QUERY_PARAM_SELECTOR, HTTP_HEADER_CONTENT_LENGTH, HTTP_HEADER_ETAG
 
 
 class CustomRESTHandler(BaseHandler):
@@ -67,6 +67,30 @@ class CustomRESTHandler(BaseHandler):
         try:
             selector = self.get_query_argument(REST_QUERY_PARAM_SELECTOR, None)
             query_args = self.request.query_arguments
+
+            # Answer conditional requests without fetching the resource
+            # if the controller knows its entity tag
+            etag = yield self.controller.get_etag(resource_id,
+                                                  self.current_user,
+                                                  selector, query_args)
+            if etag is not None:
+                self.set_header(HTTP_HEADER_ETAG, etag)
+                if self.check_etag_header():
+                    self.set_status(httplib.NOT_MODIFIED)
+                    self.finish()
+                    return
+
+            stream = yield self.controller.get_stream(resource_id,
+                                                      self.current_user,
+                                                      selector, query_args)
+            if stream is not None:
+                self.set_status(httplib.OK)
+                self.set_header(HTTP_HEADER_CONTENT_TYPE,
+                                HTTP_CONTENT_TYPE_JSON)
+                yield self.write_stream(stream)
+                self.finish()
+                return
+
             result = None
             if resource_id:
                 result = yield self.controller.get(resource_id,
@@ -131,10 +155,14 @@ class CustomRESTHandler(BaseHandler):
             except:
                 raise ParseError("Malformed JSON request body")
             query_args = self.request.query_arguments
-            yield self.controller.update(resource_id, data,
-                                         self.current_user,
-                                         query_args)
+            result = yield self.controller.update(resource_id, data,
+                                                  self.current_user,
+                                                  query_args)
             self.set_status(httplib.OK)
+            if result is not None:
+                self.set_header(HTTP_HEADER_CONTENT_TYPE,
+                                HTTP_CONTENT_TYPE_JSON)
+                self.write(json.dumps(result))
         except APIException as e:
             self.on_exception(e)
 
@@ -0,0 +1,192 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+import json
+from tornado import gen
+from tornado.ioloop import PeriodicCallback
+from tornado.locks import Event
+from tornado.log import app_log
+
+from opsrest.handlers.base import BaseHandler
+from opsrest.exceptions import TransactionFailed
+from opsrest.constants import (
+    HTTP_CONTENT_TYPE_EVENT_STREAM,
+    HTTP_HEADER_CONTENT_TYPE,
+    HTTP_HEADER_LAST_EVENT_ID
+)
+from opsrest.notifications.connection import NotificationConnection
+from opsrest.notifications.constants import (
+    SSE_EVENT_ID_SEPARATOR,
+    SSE_KEEPALIVE,
+    SUBSCRIBER_TABLE_LOWER,
+    SUBSCRIBER_TYPE_WS,
+    WS_FORMAT_COMPACT,
+    WS_QUERY_PARAM_FORMAT,
+    WS_RESOURCE_URI,
+    WS_RESUMED
+)
+
+
+class SSENotificationsHandler(NotificationConnection, BaseHandler):
+    """
+    Notifications streamed as Server-Sent Events, for clients that
+    can't use websockets. The stream starts with the subscriber's URI,
+    to which subscriptions are added as for websockets, followed by the
+    notifications, each an event whose id is given back by the client
+    in Last-Event-ID to resume the stream.
+
+    The subscriber is of the websocket type, which the database schema
+    already accepts for subscribers managed by their client connection.
+    """
+    transport = "sse"
+
+    def initialize(self, ref_object):
+        super(SSENotificationsHandler, self).initialize(ref_object)
+        self.manager = self.ref_object.manager
+        self.id = None
+        self.closed = Event()
+        self.keepalive = None
+        self.streaming = False
+
+        self.init_notifications(
+            self.settings.get('ws_max_bytes_in_flight'),
+            self.settings.get('ws_max_queued_updates'),
+            self.settings.get('ws_overflow_policy'),
+            self.settings.get('ws_resume_grace_period'))
+
+        # Clients reconnect on their own, giving the last event id
+        self.resumable = True
+
+    def _get_last_event_id(self):
+        """
+        Returns the subscriber name and the sequence number from the
+        Last-Event-ID header, the sequence number being None if the
+        client received no notification yet
+        """
+        last_event_id = self.request.headers.get(HTTP_HEADER_LAST_EVENT_ID)
+        if not last_event_id or SSE_EVENT_ID_SEPARATOR not in last_event_id:
+            return (None, None)
+
+        (subscriber_name, seqno) = \
+            last_event_id.rsplit(SSE_EVENT_ID_SEPARATOR, 1)
+        try:
+            return (subscriber_name, int(seqno))
+        except ValueError:
+            return (subscriber_name, None)
+
+    def _get_event_id(self, seqno):
+        return "%s%s%s" % (self.id, SSE_EVENT_ID_SEPARATOR,
+                           seqno if seqno is not None else '')
+
+    @gen.coroutine
+    def get(self):
+        try:
+            self.compact = \
+                self.get_query_argument(WS_QUERY_PARAM_FORMAT, None) == \
+                WS_FORMAT_COMPACT
+
+            (subscriber_name, seqno) = self._get_last_event_id()
+
+            self.id = NotificationConnection.generate_subscriber_name(self.idl)
+            self.attach()
+
+            resumed = subscriber_name is not None and \
+                self.take_over(subscriber_name)
+            if not resumed:
+                added = yield self.add_subscriber(SUBSCRIBER_TYPE_WS)
+                if not added:
+                    self._end_stream()
+                    raise TransactionFailed("Unable to create a new "
+                                            "subscriber.")
+
+                if self.closed.is_set():
+                    # Closed while the subscriber was added
+                    yield self.remove_subscriber()
+                    return
+
+            self.set_header(HTTP_HEADER_CONTENT_TYPE,
+                            HTTP_CONTENT_TYPE_EVENT_STREAM)
+            # Proxies must not buffer the stream
+            self.set_header('X-Accel-Buffering', 'no')
+
+            response = {
+                SUBSCRIBER_TABLE_LOWER: {
+                    WS_RESOURCE_URI: self.get_subscriber_uri()
+                }
+            }
+            if subscriber_name is not None:
+                response[SUBSCRIBER_TABLE_LOWER][WS_RESUMED] = resumed
+
+            # Resuming from this event resyncs the subscriptions
+            self.write("id: %s\n" % self._get_event_id(None))
+            self.write("data: %s\n\n" % json.dumps(response))
+            self.flush()
+            self.streaming = True
+
+            interval = self.settings.get('sse_keepalive_interval')
+            if interval:
+                self.keepalive = PeriodicCallback(self._send_keepalive,
+                                                  interval * 1000)
+                self.keepalive.start()
+
+            if resumed:
+                notification_handler = self.ref_object.notification_handler
+                yield notification_handler.resume_subscriber(self.id, seqno,
+                                                             self.idl)
+
+            yield self.closed.wait()
+
+        except Exception as e:
+            if not self.streaming:
+                self.on_exception(e)
+            else:
+                # The error can't be reported in the stream
+                app_log.error("Error streaming notifications to %s: %s" %
+                              (self.id, e))
+
+    def send_notification_data(self, data, seqno):
+        if self.closed.is_set():
+            return None
+
+        if seqno is not None:
+            self.write("id: %s\n" % self._get_event_id(seqno))
+        self.write("data: %s\n\n" % data)
+        return self.flush()
+
+    def _send_keepalive(self):
+        if not self.closed.is_set():
+            self.write(SSE_KEEPALIVE)
+            self.flush()
+
+    def on_finish(self):
+        self._end_stream()
+        super(SSENotificationsHandler, self).on_finish()
+
+    def close_connection(self):
+        self._end_stream()
+
+    def on_connection_close(self):
+        app_log.debug("Notification stream of %s closed by the client" %
+                      self.id)
+        self._end_stream()
+
+    def _end_stream(self):
+        if self.closed.is_set():
+            return
+
+        self.closed.set()
+        if self.keepalive is not None:
+            self.keepalive.stop()
+        if self.id is not None:
+            self.detach()
@@ -13,6 +13,7 @@
 #  under the License.
 
 from tornado import gen
+from tornado.ioloop import IOLoop
 from tornado.log import app_log
 
 import json
@@ -25,6 +26,7 @@ from opsrest.constants import *
 from opsrest.exceptions import APIException, LengthRequired, \
     ParameterNotAllowed, DataValidationFailed
 from opsrest.utils.getutils import get_filters_args
+from opsrest.waiters import get_wait_target
 
 
 from opsrest import get, post, delete, put, patch
@@ -32,6 +34,9 @@ from opsrest import get, post, delete, put, patch
 
 class OVSDBAPIHandler(base.BaseHandler):
 
+    # Waiter of a GET waiting for the resource to change
+    waiter = None
+
     # parse the url and http params.
     @gen.coroutine
     def prepare(self):
@@ -39,6 +44,10 @@ class OVSDBAPIHandler(base.BaseHandler):
             # Call parent's prepare to check authentication
             super(OVSDBAPIHandler, self).prepare()
 
+            # Rows can't be read or modified while a configuration
+            # is being staged, wait until it is committed
+            yield self.ref_object.manager.wait_for_staging()
+
             # Check ovsdb connection before each request
             if not self.ref_object.manager.connected:
                 self.set_status(httplib.SERVICE_UNAVAILABLE)
@@ -102,14 +111,17 @@ class OVSDBAPIHandler(base.BaseHandler):
 
             app_log.debug("Query arguments %s" % self.request.query_arguments)
 
-            result = yield get.get_resource(self.idl, self.resource_path,
-                                            self.schema, self.request.path,
-                                            selector,
-                                            self.request.query_arguments,
-                                            fetch_readonly=True,
-                                            manager=self.ref_object.manager)
+            etag = self.get_query_argument(REST_QUERY_PARAM_WAIT, None)
+            changed = True
+            if etag is None:
+                result = yield self.get_resource(selector)
+            else:
+                (result, changed) = yield self.wait_for_change(selector, etag)
 
-            if result is None:
+            if not changed:
+                self.set_status(httplib.NOT_MODIFIED)
+                self.set_header(HTTP_HEADER_ETAG, self.quote_etag(etag))
+            elif result is None:
                 self.set_status(httplib.NOT_FOUND)
             elif self.successful_query(result):
                 self.set_status(httplib.OK)
@@ -125,6 +137,92 @@ class OVSDBAPIHandler(base.BaseHandler):
 
         self.finish()
 
+    @gen.coroutine
+    def get_resource(self, selector):
+        result = yield get.get_resource(self.idl, self.resource_path,
+                                        self.schema, self.request.path,
+                                        selector,
+                                        self.request.query_arguments,
+                                        fetch_readonly=True,
+                                        manager=self.ref_object.manager)
+        raise gen.Return(result)
+
+    @gen.coroutine
+    def wait_for_change(self, selector, etag):
+        """
+        Long poll: returns the resource and True as soon as its Etag
+        differs from the given one, or the resource and False if it
+        didn't change within the timeout. The request waits on the
+        resource's row, or table for a collection, so changes to the
+        rows it references, e.g. with depth, don't end the wait.
+        """
+        etag = self.quote_etag(etag)
+        deadline = IOLoop.current().time() + self.get_wait_timeout()
+        manager = self.ref_object.manager
+
+        while True:
+            (table, row) = get_wait_target(self.resource_path)
+
+            # Waiting from before the resource is read, so that changes
+            # made meanwhile wake the request
+            self.waiter = manager.waiters.add(table, row)
+            try:
+                result = yield self.get_resource(selector)
+                if result is None or \
+                        (isinstance(result, dict) and ERROR in result) or \
+                        self.compute_etag(json.dumps(result)) != etag:
+                    raise gen.Return((result, True))
+
+                yield self.waiter.wait(deadline)
+
+            except gen.TimeoutError:
+                raise gen.Return((result, False))
+
+            finally:
+                manager.waiters.remove(self.waiter)
+
+            if self.waiter.cancelled:
+                raise gen.Return((None, False))
+
+            # Rows changed by a configuration being staged can't be read
+            yield manager.wait_for_staging()
+
+            # The row waited on may have been deleted
+            self.resource_path = parse_url_path(self.request.path,
+                                                self.schema, self.idl,
+                                                self.request.method)
+            if self.resource_path is None:
+                raise gen.Return((None, True))
+
+    def get_wait_timeout(self):
+        timeout = self.get_query_argument(REST_QUERY_PARAM_TIMEOUT, None)
+        if timeout is None:
+            return self.settings.get('long_poll_default_timeout')
+
+        try:
+            timeout = float(timeout)
+        except ValueError:
+            timeout = -1
+
+        if timeout < 0:
+            raise DataValidationFailed("Invalid %s: %s" %
+                                       (REST_QUERY_PARAM_TIMEOUT,
+                                        self.get_query_argument(
+                                            REST_QUERY_PARAM_TIMEOUT)))
+
+        return min(timeout, self.settings.get('long_poll_max_timeout'))
+
+    def quote_etag(self, etag):
+        # Etags are given back quoted or not
+        if etag.startswith('"') or etag.startswith('W/'):
+            return etag
+        return '"%s"' % etag
+
+    def on_connection_close(self):
+        # The client of a long poll went away
+        if self.waiter is not None:
+            self.waiter.cancel()
+
     @gen.coroutine
     def post(self):
         try:
@@ -223,8 +321,13 @@ class OVSDBAPIHandler(base.BaseHandler):
             if HTTP_HEADER_CONTENT_LENGTH not in self.request.headers:
                 raise LengthRequired
 
-            # get the PATCH body
+            # get the PATCH body, either a JSON Patch or a JSON Merge Patch
             update_data = json.loads(self.request.body)
+            content_type = \
+                self.request.headers.get(HTTP_HEADER_CONTENT_TYPE, '')
+            merge = content_type.split(';')[0].strip().lower() == \
+                HTTP_CONTENT_TYPE_MERGE_PATCH
+
             # create a new ovsdb transaction
             self.txn = self.ref_object.manager.get_new_transaction()
 
@@ -233,7 +336,8 @@ class OVSDBAPIHandler(base.BaseHandler):
             result = yield patch.patch_resource(update_data,
                                                 self.resource_path,
                                                 self.schema, self.txn,
-                                                self.idl, self.request.path)
+                                                self.idl, self.request.path,
+                                                merge)
 
             status = result.status
             if status == INCOMPLETE:
@@ -92,9 +92,11 @@ class WSBaseHandler(websocket.WebSocketHandler):
         # No processing at the moment.
 
     def send_message(self, msg):
-        self.write_message(msg)
+        future = self.write_message(msg)
         app_log.debug("WebSocket event: MESSAGE SENT")
-        app_log.debug("Message: %s" % msg)
+        # Formatted only when logged, messages can be large
+        app_log.debug("Message: %s", msg)
+        return future
 
     @staticmethod
     def get_websocket(id):
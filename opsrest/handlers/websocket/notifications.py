@@ -15,112 +15,107 @@
 import json
 from tornado import gen
 from tornado.log import app_log
-from opsrest.utils import utils
-from opsrest.constants import (
-    ERROR,
-    INCOMPLETE,
-    OVSDB_BASE_URI,
-    SUCCESS
-)
+from tornado.websocket import WebSocketClosedError
+from opsrest.notifications.connection import NotificationConnection
 from opsrest.notifications.constants import (
-    SUBSCRIBER_NAME,
     SUBSCRIBER_OPEN_ERROR,
-    SUBSCRIBER_TABLE,
     SUBSCRIBER_TABLE_LOWER,
-    SUBSCRIBER_TYPE,
     SUBSCRIBER_TYPE_WS,
-    WS_RESOURCE_URI
+    WS_FORMAT_COMPACT,
+    WS_QUERY_PARAM_FORMAT,
+    WS_QUERY_PARAM_RESUMABLE,
+    WS_QUERY_PARAM_RESUME,
+    WS_QUERY_PARAM_SEQNO,
+    WS_RESOURCE_URI,
+    WS_RESUMED
 )
-from opsrest.notifications.utils import lookup_subscriber_by_name
 from opsrest.handlers.websocket.base import WSBaseHandler
 
 
-class WSNotificationsHandler(WSBaseHandler):
+class WSNotificationsHandler(NotificationConnection, WSBaseHandler):
+    transport = "ws"
+
     def initialize(self, ref_object):
         super(WSNotificationsHandler, self).initialize(ref_object)
+        self.init_notifications(
+            self.settings.get('ws_max_bytes_in_flight'),
+            self.settings.get('ws_max_queued_updates'),
+            self.settings.get('ws_overflow_policy'),
+            self.settings.get('ws_resume_grace_period'))
 
-    @staticmethod
-    def send_notification_msg(sub_name, msg):
-        ws = WSBaseHandler.get_websocket(sub_name)
-
-        if not ws:
-            app_log.error("Websocket not found. Couldn't send notification.")
-            return
+    def get_compression_options(self):
+        if not self.settings.get('ws_compression'):
+            return None
 
-        ws.send_message(json.dumps(msg))
+        return {'compression_level': self.settings.get('ws_compression_level'),
+                'mem_level': self.settings.get('ws_compression_mem_level')}
 
-    def _generate_id(self):
+    def generate_id(self):
         """
         Overridden method for generating ID. Ensure subscriber doesn't already
         exist with the same name/ID.
         """
-        while True:
-            new_id = super(WSNotificationsHandler, self).generate_id()
+        return NotificationConnection.generate_subscriber_name(self.idl)
 
-            # Make sure a subscriber with the same name doesn't already exist
-            # in the DB
-            if not lookup_subscriber_by_name(self.idl, new_id):
-                break
+    def send_notification_data(self, data, seqno):
+        try:
+            return self.send_message(data)
+        except WebSocketClosedError:
+            app_log.debug("Websocket %s closed. Notification dropped." %
+                          self.id)
+            return None
 
-        return new_id
+    def close_connection(self):
+        self.close()
+
+    def _get_resume_seqno(self):
+        try:
+            return int(self.get_argument(WS_QUERY_PARAM_SEQNO, None))
+        except (TypeError, ValueError):
+            return None
+
+    def _write_subscriber(self, resumed=None):
+        response = {
+            SUBSCRIBER_TABLE_LOWER: {
+                WS_RESOURCE_URI: self.get_subscriber_uri()
+            }
+        }
+
+        if resumed is not None:
+            response[SUBSCRIBER_TABLE_LOWER][WS_RESUMED] = resumed
+
+        self.write_message(json.dumps(response))
 
     @gen.coroutine
     def _open(self):
-        txn = self.manager.get_new_transaction()
-        subscriber_data = {}
-        subscriber_data[SUBSCRIBER_NAME] = self.id
-        subscriber_data[SUBSCRIBER_TYPE] = SUBSCRIBER_TYPE_WS
-
-        subscriber_row = utils.setup_new_row(SUBSCRIBER_TABLE,
-                                             subscriber_data,
-                                             self.schema, txn, self.idl)
-        status = ERROR
-
-        if subscriber_row:
-            status = txn.commit()
-            if status == INCOMPLETE:
-                self.manager.monitor_transaction(txn)
-                yield txn.event.wait()
-                status = txn.status
-
-        if status == SUCCESS:
-            app_log.debug("Subscriber \"%s\" added." % self.id)
-            subscriber_table = self.schema.ovs_tables[SUBSCRIBER_TABLE]
-            subscriber_uri = OVSDB_BASE_URI + subscriber_table.plural_name
-            subscriber_uri += '/' + self.id
-
-            response = {
-                SUBSCRIBER_TABLE_LOWER: {
-                    WS_RESOURCE_URI: subscriber_uri
-                }
-            }
+        self.compact = self.get_argument(WS_QUERY_PARAM_FORMAT, None) == \
+            WS_FORMAT_COMPACT
+
+        resume_name = self.get_argument(WS_QUERY_PARAM_RESUME, None)
+        self.resumable = resume_name is not None or \
+            self.get_argument(WS_QUERY_PARAM_RESUMABLE, None) == 'true'
+
+        ws_id = self.id
+        self.attach()
+        if resume_name is not None and self.take_over(resume_name):
+            del WSBaseHandler.websockets[ws_id]
+            WSBaseHandler.websockets[self.id] = self
+
+            self._write_subscriber(resumed=True)
+            notification_handler = self.ref_object.notification_handler
+            yield notification_handler.resume_subscriber(
+                self.id, self._get_resume_seqno(), self.idl)
+            return
 
-            self.write_message(json.dumps(response))
+        added = yield self.add_subscriber(SUBSCRIBER_TYPE_WS)
+        if added:
+            resumed = False if resume_name is not None else None
+            self._write_subscriber(resumed)
         else:
-            app_log.error("Failed to add subscriber: %s" % status)
-            txn.abort()
             self._handle_open_fail()
 
-    @gen.coroutine
     def _on_close(self):
-        # Remove the db entry only if it exists.
-        subscriber = lookup_subscriber_by_name(self.idl, self.id)
-        if subscriber:
-            txn = self.manager.get_new_transaction()
-
-            subscriber.delete()
-
-            status = txn.commit()
-            if status == INCOMPLETE:
-                self.manager.monitor_transaction(txn)
-                yield txn.event.wait()
-                status = txn.status
-
-            if status == SUCCESS:
-                app_log.debug("Subscriber %s removed." % self.id)
-            else:
-                app_log.error("Error deleting subscriber: %s" % status)
-                txn.abort()
+        self.detach()
 
     def _handle_open_fail(self):
         error = "Unable to create a new subscriber."
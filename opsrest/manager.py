@@ -14,6 +14,7 @@
 
 import time
 from tornado.ioloop import IOLoop
+from tornado.locks import Event
 from tornado.log import app_log
 
 from ovs.db import error
@@ -21,6 +22,8 @@ from ovs.db.idl import SchemaHelper
 
 from ops.opsidl import OpsIdl
 from opsrest.transaction import OvsdbTransactionList, OvsdbTransaction
+from opsrest.waiters import ResourceWaiters
+from opsrest.exceptions import Conflict
 from opsrest.constants import (
     CHANGES_CB_TYPE,
     ESTABLISHED_CB_TYPE,
@@ -49,6 +52,14 @@ class OvsdbConnectionManager:
         self.register_tables = None
         self.track_all = False
         self.txn_timeout_handle = None
+        self.staging_txn = None
+        self.staging_done = Event()
+        self.staging_done.set()
+
+        # Requests waiting for rows to change, and the number of users
+        # of the change tracking of each table
+        self.waiters = ResourceWaiters(self)
+        self._tracked_tables = {}
 
     def start(self, register_tables=None, track_all=False):
         try:
@@ -80,6 +91,9 @@ class OvsdbConnectionManager:
             if self.track_all:
                 app_log.debug("Tracking all changes")
                 self.idl.track_add_all()
+            else:
+                for table in self._tracked_tables:
+                    self.idl.track_add_all_columns(table)
 
             # We do not reset transactions when the DB connection goes down
             if self.transactions is None:
@@ -151,12 +165,15 @@ class OvsdbConnectionManager:
         self.connected = True
         self.curr_seqno = self.idl.change_seqno
         self.ovs_socket = self.idl._session.rpc.stream.socket
+        self.add_idl_handler()
+
+        self.run_callbacks(ESTABLISHED_CB_TYPE)
+
+    def add_idl_handler(self):
         IOLoop.current().add_handler(self.ovs_socket.fileno(),
                                      self.idl_run,
                                      IOLoop.READ | IOLoop.ERROR)
 
-        self.run_callbacks(ESTABLISHED_CB_TYPE)
-
     def idl_check_and_update(self):
         self.idl.run()
 
@@ -194,8 +211,46 @@ class OvsdbConnectionManager:
             self.start_transaction_timer()
 
     def get_new_transaction(self):
+        if self.staging_txn is not None:
+            raise Conflict("A configuration is being applied, "
+                           "try again later")
         return OvsdbTransaction(self.idl)
 
+    def begin_staging(self, txn):
+        """
+        Stops processing IDL updates while txn is staged across several
+        IOLoop iterations, as the IDL can't run with a transaction open.
+        No other transaction can be created until end_staging is called.
+        The connection isn't read meanwhile, staging must be kept within
+        the inactivity probe interval of the database server.
+        """
+        self.staging_txn = txn
+        self.staging_done.clear()
+        if self.ovs_socket:
+            IOLoop.current().remove_handler(self.ovs_socket)
+
+    def end_staging(self):
+        """
+        Resumes processing IDL updates once the staged transaction was
+        committed or aborted, including those received meanwhile.
+        """
+        self.staging_txn = None
+        self.staging_done.set()
+        if self.ovs_socket:
+            self.add_idl_handler()
+            IOLoop.current().add_callback(self.idl_resume)
+
+    def wait_for_staging(self):
+        """
+        Returns a future resolved once no transaction is being staged.
+        Rows read from the IDL meanwhile would have uncommitted changes.
+        """
+        return self.staging_done.wait()
+
+    def idl_resume(self):
+        if self.idl is not None and self.staging_txn is None:
+            self.idl_check_and_update()
+
     def monitor_transaction(self, txn):
         self.transactions.add_txn(txn)
         self.start_transaction_timer()
@@ -224,10 +279,34 @@ class OvsdbConnectionManager:
             for callback in self._callbacks[cb_type]:
                 callback(self, self.idl)
 
-            # Clear any change tracking info received for next notifications
             if cb_type == CHANGES_CB_TYPE:
+                # Wake the requests waiting for the rows changed
+                self.waiters.wake(self.idl)
+
+                # Clear any change tracking info received for next
+                # notifications
                 self.idl.track_clear_all()
 
+    def track_table(self, table):
+        """
+        Tracks the changes to the rows of a table, until untrack_table
+        is called as many times
+        """
+        count = self._tracked_tables.get(table, 0)
+        if not count and not self.track_all:
+            self.idl.track_add_all_columns(table)
+        self._tracked_tables[table] = count + 1
+
+    def untrack_table(self, table):
+        count = self._tracked_tables.get(table, 0)
+        if count > 1:
+            self._tracked_tables[table] = count - 1
+            return
+
+        self._tracked_tables.pop(table, None)
+        if count and not self.track_all:
+            self.idl.track_remove_all_columns(table)
+
     def register_schema_helper_columns(self, schema_helper, ext_schema):
         app_log.debug("Registering schema helper columns..")
 
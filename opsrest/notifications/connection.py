@@ -0,0 +1,426 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+import time
+import uuid
+from tornado import gen
+from tornado.ioloop import IOLoop
+from tornado.locks import Event
+from tornado.log import app_log
+from opsrest.utils import utils
+from opsrest.constants import (
+    ERROR,
+    INCOMPLETE,
+    OVSDB_BASE_URI,
+    SUCCESS
+)
+from opsrest.notifications import encoding
+from opsrest.notifications.constants import (
+    NOTIF_MSG,
+    NOTIF_RESYNC,
+    NOTIF_SEQNO,
+    NOTIF_SUBSCRIPTION_FIELD,
+    NOTIF_SUBSCRIPTION_IDS,
+    SUBSCRIBER_NAME,
+    SUBSCRIBER_TABLE,
+    SUBSCRIBER_TYPE,
+    WS_OVERFLOW_DISCONNECT,
+    WS_OVERFLOW_MERGE
+)
+from opsrest.notifications.policy import DeliveryPolicy, PendingUpdates
+from opsrest.notifications.utils import lookup_subscriber_by_name
+
+
+class ConnectionStats(object):
+    """
+    Notifications sent, queued, merged and dropped on a connection
+    """
+    def __init__(self):
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.max_bytes_in_flight = 0
+        self.updates_queued = 0
+        self.updates_merged = 0
+        self.updates_dropped = 0
+        self.resyncs = 0
+
+
+class NotificationConnection(object):
+    """
+    Delivery of notifications to the subscriber of a client connection,
+    whatever its transport: the subscriber's lifecycle, queuing while
+    the client is slower than the notifications, the compact format and
+    resumption within a grace period once closed.
+
+    Transports set transport to their name for diagnostics, set id to
+    the subscriber name and implement:
+      - send_notification_data(data, seqno): Sends an encoded message,
+        returns the write future, or None if not supported.
+      - close_connection(): Closes the connection.
+      - get_current_user(): Returns the user of the connection.
+    """
+    transport = None
+
+    # Connections by subscriber name
+    connections = {}
+
+    # Grace period timeouts of the subscribers of closed connections,
+    # and the users they belong to, by subscriber name
+    detached = {}
+
+    def init_notifications(self, max_bytes_in_flight, max_queued_updates,
+                           overflow_policy, grace_period):
+        self.max_bytes_in_flight = max_bytes_in_flight
+        self.max_queued_updates = max_queued_updates
+        self.overflow_policy = overflow_policy
+        self.grace_period = grace_period
+
+        self.bytes_in_flight = 0
+        # Updates waiting for the client to read the previous ones, and
+        # the sequence number of the latest
+        self.pending = None
+        self.pending_seqno = None
+        self.resync = False
+        self.closing = False
+        self.stats = ConnectionStats()
+
+        # Set while the client keeps up with the notifications
+        self.drained = Event()
+        self.drained.set()
+
+        # Whether the subscriber is kept for a while once closed, and
+        # the user who can resume it
+        self.resumable = False
+        self.owner = None
+
+        # Short ids of the subscriptions by subscription URI
+        self.compact = False
+        self.subscription_ids = {}
+        self.next_subscription_id = 1
+
+    @staticmethod
+    def get_connection(sub_name):
+        return NotificationConnection.connections.get(sub_name)
+
+    @staticmethod
+    def generate_subscriber_name(idl):
+        while True:
+            new_name = str(uuid.uuid4())
+
+            # Make sure a subscriber with the same name doesn't already
+            # exist in the DB
+            if new_name not in NotificationConnection.connections and \
+                    not lookup_subscriber_by_name(idl, new_name):
+                break
+
+        return new_name
+
+    @staticmethod
+    def send_notification_msg(sub_name, changes, seqno):
+        connection = NotificationConnection.get_connection(sub_name)
+
+        if not connection:
+            if sub_name in NotificationConnection.detached:
+                app_log.debug("Subscriber %s detached. Notification kept "
+                              "for replay." % sub_name)
+            else:
+                app_log.error("Connection not found. Couldn't send "
+                              "notification.")
+            return
+
+        connection.queue_notification(changes, seqno)
+
+    @staticmethod
+    def send_resync_msg(sub_name):
+        connection = NotificationConnection.get_connection(sub_name)
+        if connection and not connection.closing:
+            connection.stats.resyncs += 1
+            connection._write_notification({NOTIF_MSG: {NOTIF_RESYNC: True}})
+
+    @staticmethod
+    def wait_for_drain(sub_name):
+        """
+        Returns a future done once the client of the subscriber's
+        connection keeps up with the notifications again, right away if
+        it does or if the subscriber isn't connected
+        """
+        connection = NotificationConnection.get_connection(sub_name)
+        if not connection:
+            return gen.moment
+
+        return connection.drained.wait()
+
+    def _update_drained(self):
+        if self.closing or (self.pending is None and not self.resync and
+                            self.bytes_in_flight < self.max_bytes_in_flight):
+            self.drained.set()
+        else:
+            self.drained.clear()
+
+    @staticmethod
+    def register_subscription(sub_name, subscription_uri):
+        """
+        Assigns a short id to a new subscription of a subscriber. In the
+        compact format, the id is notified before any update.
+        """
+        connection = NotificationConnection.get_connection(sub_name)
+        if not connection or subscription_uri in connection.subscription_ids:
+            return
+
+        subscription_id = connection.next_subscription_id
+        connection.next_subscription_id += 1
+        connection.subscription_ids[subscription_uri] = subscription_id
+
+        if connection.compact and not connection.closing:
+            ids = {str(subscription_id): subscription_uri}
+            connection._write_notification(
+                {NOTIF_MSG: {NOTIF_SUBSCRIPTION_IDS: ids}})
+
+    @staticmethod
+    def unregister_subscription(sub_name, subscription_uri):
+        connection = NotificationConnection.get_connection(sub_name)
+        if connection:
+            connection.subscription_ids.pop(subscription_uri, None)
+
+    def _compact_changes(self, changes):
+        # Updates refer to their subscription by its id
+        compact_changes = {}
+        for update_type, updates in changes.iteritems():
+            compact_updates = []
+            for update in updates:
+                subscription_id = \
+                    self.subscription_ids.get(update[NOTIF_SUBSCRIPTION_FIELD])
+                if subscription_id is not None:
+                    update = dict(update)
+                    update[NOTIF_SUBSCRIPTION_FIELD] = subscription_id
+                compact_updates.append(update)
+            compact_changes[update_type] = compact_updates
+        return compact_changes
+
+    def queue_notification(self, changes, seqno):
+        """
+        Sends the changes with their sequence number, or queues them
+        while the client is slower than the notifications. A full queue
+        is handled according to the overflow policy.
+        """
+        if self.closing:
+            return
+
+        if self.compact:
+            changes = self._compact_changes(changes)
+
+        if self.pending is None and not self.resync and \
+                self.bytes_in_flight < self.max_bytes_in_flight:
+            self._write_notification({NOTIF_MSG: changes, NOTIF_SEQNO: seqno})
+            return
+
+        self.pending_seqno = seqno
+        if self.pending is None:
+            merge = self.overflow_policy == WS_OVERFLOW_MERGE
+            self.pending = PendingUpdates(DeliveryPolicy(coalesce=merge))
+
+        for update_type, updates in changes.iteritems():
+            for update in updates:
+                queued = len(self.pending.updates)
+                self.pending.add(update_type, update)
+                self.stats.updates_queued += 1
+                if len(self.pending.updates) <= queued:
+                    self.stats.updates_merged += 1
+
+        if len(self.pending.updates) > self.max_queued_updates:
+            self._handle_overflow()
+
+        self._update_drained()
+
+    def _handle_overflow(self):
+        app_log.debug("Notification queue overflow for %s" % self.id)
+        self.stats.updates_dropped += len(self.pending.updates)
+        self.pending = None
+
+        if self.overflow_policy == WS_OVERFLOW_DISCONNECT:
+            self.closing = True
+            self.close_connection()
+            return
+
+        # Merging can't bound the queue when the resources are all
+        # different, the subscriber has to read them again
+        self.stats.resyncs += 1
+        self.resync = True
+
+    def _write_notification(self, msg):
+        data = encoding.encode(msg)
+        future = self.send_notification_data(data, msg.get(NOTIF_SEQNO))
+
+        size = len(data)
+        self.stats.messages_sent += 1
+        self.stats.bytes_sent += size
+
+        # Write futures are only returned by recent Tornado versions
+        if future is None:
+            return
+
+        self.bytes_in_flight += size
+        self.stats.max_bytes_in_flight = max(self.stats.max_bytes_in_flight,
+                                             self.bytes_in_flight)
+        self._update_drained()
+        future.add_done_callback(lambda f: self._on_notification_sent(size))
+
+    def _on_notification_sent(self, size):
+        self.bytes_in_flight -= size
+        if self.bytes_in_flight >= self.max_bytes_in_flight:
+            return
+
+        if self.resync:
+            self.resync = False
+            self._write_notification({NOTIF_MSG: {NOTIF_RESYNC: True}})
+
+        if self.pending is not None:
+            changes = {}
+            for update_type, update in self.pending.take(time.time()):
+                changes.setdefault(update_type, []).append(update)
+            self.pending = None
+            if changes:
+                self._write_notification({NOTIF_MSG: changes,
+                                          NOTIF_SEQNO: self.pending_seqno})
+
+        self._update_drained()
+
+    def get_stats(self):
+        """
+        Returns the notification statistics of the connection
+        """
+        stats = dict(vars(self.stats))
+        stats['bytes_in_flight'] = self.bytes_in_flight
+        stats['updates_pending'] = \
+            len(self.pending.updates) if self.pending is not None else 0
+        return stats
+
+    def get_subscriber_uri(self):
+        subscriber_table = self.schema.ovs_tables[SUBSCRIBER_TABLE]
+        subscriber_uri = OVSDB_BASE_URI + subscriber_table.plural_name
+        return subscriber_uri + '/' + self.id
+
+    def attach(self):
+        self.owner = self.get_current_user()
+        NotificationConnection.connections[self.id] = self
+
+    def take_over(self, subscriber_name):
+        """
+        Takes over the subscriber of a closed connection if still within
+        the grace period and if it belongs to the same user. Returns
+        whether it was.
+        """
+        if subscriber_name not in NotificationConnection.detached or \
+                not lookup_subscriber_by_name(self.idl, subscriber_name):
+            return False
+
+        (timeout, owner) = NotificationConnection.detached[subscriber_name]
+        if owner != self.get_current_user():
+            app_log.info("Subscriber %s can't be resumed by another user." %
+                         subscriber_name)
+            return False
+
+        del NotificationConnection.detached[subscriber_name]
+        IOLoop.current().remove_timeout(timeout)
+
+        if NotificationConnection.connections.get(self.id) is self:
+            del NotificationConnection.connections[self.id]
+        self.id = subscriber_name
+        self.attach()
+
+        app_log.debug("Subscriber \"%s\" resumed." % self.id)
+        return True
+
+    @gen.coroutine
+    def add_subscriber(self, subscriber_type):
+        """
+        Adds the subscriber of the connection to the DB. Returns whether
+        it was added.
+        """
+        yield self.manager.wait_for_staging()
+        txn = self.manager.get_new_transaction()
+        subscriber_data = {}
+        subscriber_data[SUBSCRIBER_NAME] = self.id
+        subscriber_data[SUBSCRIBER_TYPE] = subscriber_type
+
+        subscriber_row = utils.setup_new_row(SUBSCRIBER_TABLE,
+                                             subscriber_data,
+                                             self.schema, txn, self.idl)
+        status = ERROR
+
+        if subscriber_row:
+            status = txn.commit()
+            if status == INCOMPLETE:
+                self.manager.monitor_transaction(txn)
+                yield txn.event.wait()
+                status = txn.status
+
+        if status == SUCCESS:
+            app_log.debug("Subscriber \"%s\" added." % self.id)
+            raise gen.Return(True)
+
+        app_log.error("Failed to add subscriber: %s" % status)
+        txn.abort()
+        raise gen.Return(False)
+
+    def detach(self):
+        """
+        Stops notifying the closed connection. A resumable subscriber is
+        kept for the grace period, others are removed.
+        """
+        # Nothing waits for a closed connection to drain
+        self.closing = True
+        self._update_drained()
+
+        if NotificationConnection.connections.get(self.id) is self:
+            del NotificationConnection.connections[self.id]
+
+        if self.resumable and self.grace_period and \
+                lookup_subscriber_by_name(self.idl, self.id):
+            # The subscriber is kept for the client to resume it
+            app_log.debug("Subscriber %s detached." % self.id)
+            timeout = \
+                IOLoop.current().add_timeout(time.time() + self.grace_period,
+                                             self._on_grace_period_expired)
+            NotificationConnection.detached[self.id] = (timeout, self.owner)
+            return
+
+        self.remove_subscriber()
+
+    def _on_grace_period_expired(self):
+        NotificationConnection.detached.pop(self.id, None)
+        self.remove_subscriber()
+
+    @gen.coroutine
+    def remove_subscriber(self):
+        yield self.manager.wait_for_staging()
+
+        # Remove the db entry only if it exists.
+        subscriber = lookup_subscriber_by_name(self.idl, self.id)
+        if subscriber:
+            txn = self.manager.get_new_transaction()
+
+            subscriber.delete()
+
+            status = txn.commit()
+            if status == INCOMPLETE:
+                self.manager.monitor_transaction(txn)
+                yield txn.event.wait()
+                status = txn.status
+
+            if status == SUCCESS:
+                app_log.debug("Subscriber %s removed." % self.id)
+            else:
+                app_log.error("Error deleting subscriber: %s" % status)
+                txn.abort()
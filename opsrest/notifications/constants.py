@@ -19,8 +19,28 @@ SUBSCRIPTION_TABLE_LOWER = SUBSCRIPTION_TABLE.lower()
 
 WS_RESOURCE_URI = "resource"
 
+# Format of the notifications, as a query argument of the websocket URI
+WS_QUERY_PARAM_FORMAT = "format"
+WS_FORMAT_COMPACT = "compact"
+
+# Resumption of a closed notification websocket, as query arguments of
+# the websocket URI: whether it can be resumed, when connecting first,
+# then the subscriber id and the sequence number of the last
+# notification received, e.g. ?resume=<id>&seqno=42
+WS_QUERY_PARAM_RESUMABLE = "resumable"
+WS_QUERY_PARAM_RESUME = "resume"
+WS_QUERY_PARAM_SEQNO = "seqno"
+WS_RESUMED = "resumed"
+
+# Server-Sent Events notification streams: event ids are the
+# subscriber name and the sequence number of the notification, e.g.
+# <subscriber>:42, given back in Last-Event-ID to resume the stream
+SSE_EVENT_ID_SEPARATOR = ":"
+SSE_KEEPALIVE = ":\n\n"
+
 # Fields for a notification message
 NOTIF_MSG = "notifications"
+NOTIF_SEQNO = "seqno"
 NOTIF_SUBSCRIPTION_FIELD = "subscription"
 NOTIF_RESOURCE_FIELD = "resource"
 NOTIF_VALUES_FIELD = "values"
@@ -31,8 +51,22 @@ UPDATE_TYPE_ADDED = "added"
 UPDATE_TYPE_MODIFIED = "modified"
 UPDATE_TYPE_DELETED = "deleted"
 
+# Update marking the last notification of the initial values of a
+# subscription, which may be notified in several chunks
+UPDATE_TYPE_SYNC_COMPLETE = "initial_sync_complete"
+
+# Notification sent instead of the updates dropped on a queue overflow,
+# the subscriber must read the subscribed resources again
+NOTIF_RESYNC = "resync"
+
+# Notification of the ids of new subscriptions, by which updates refer
+# to their subscription in the compact format
+NOTIF_SUBSCRIPTION_IDS = "subscription_ids"
+
 # Subscriber attributes
 SUBSCRIBER_TYPE = "type"
+# Subscribers of a client connection, websocket or SSE stream, which
+# the connection adds and deletes
 SUBSCRIBER_TYPE_WS = "ws"
 SUBSCRIBER_NAME = "name"
 
@@ -41,3 +75,19 @@ SUBSCRIBER_OPEN_ERROR = "error"
 # Subscription attributes
 SUBSCRIPTION_NAME = "name"
 SUBSCRIPTION_URI = "resource"
+
+# Delivery policy of a subscription, given as query arguments of its
+# resource URI, e.g. /rest/v1/system/interfaces?min_interval=1000
+POLICY_MIN_INTERVAL = "min_interval"
+POLICY_MAX_BATCH = "max_batch"
+POLICY_COALESCE = "coalesce"
+
+# Columns a subscription is notified of, given as a query argument of
+# its resource URI, e.g. ?columns=link_state,statistics.rx_packets
+PROJECTION_COLUMNS = "columns"
+PROJECTION_KEY_SEPARATOR = "."
+
+# Policies applied when the queue of a notification websocket overflows
+WS_OVERFLOW_MERGE = "merge"
+WS_OVERFLOW_RESYNC = "resync"
+WS_OVERFLOW_DISCONNECT = "disconnect"
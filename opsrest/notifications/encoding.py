@@ -0,0 +1,87 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+import json
+from tornado import gen
+
+
+class JSONFragment(str):
+    """
+    Value already encoded as JSON, included as is in encoded messages
+    """
+    pass
+
+
+def encode(msg):
+    """
+    Encodes a notification message as JSON. JSONFragment values are
+    not encoded again, so only the message around them is.
+    """
+    return ''.join(_iter_encode(msg))
+
+
+def _iter_encode(value):
+    if isinstance(value, JSONFragment):
+        yield value
+    elif isinstance(value, dict):
+        yield '{'
+        separator = ''
+        for key, item in value.iteritems():
+            yield separator + json.dumps(key) + ': '
+            for fragment in _iter_encode(item):
+                yield fragment
+            separator = ', '
+        yield '}'
+    elif isinstance(value, (list, tuple)):
+        yield '['
+        separator = ''
+        for item in value:
+            yield separator
+            for fragment in _iter_encode(item):
+                yield fragment
+            separator = ', '
+        yield ']'
+    else:
+        yield json.dumps(value)
+
+
+class EncodingCache(object):
+    """
+    Encoded values of the rows notified while processing one batch of
+    changes, shared by all the subscriptions notified of a row.
+
+    Values are keyed by (table, row UUID, columns, resource URI), the
+    columns being None for the whole row, the changed columns or a
+    tuple identifying the values.
+    """
+    def __init__(self):
+        self._fragments = {}
+
+    @gen.coroutine
+    def get(self, table, row_uuid, columns, resource_uri, get_values,
+            *args):
+        """
+        Returns the encoded values of the row's columns, retrieved by
+        the get_values coroutine called with args if not cached yet
+        """
+        if columns is not None and \
+                not isinstance(columns, (tuple, frozenset)):
+            columns = frozenset(columns)
+
+        key = (table, row_uuid, columns, resource_uri)
+        if key not in self._fragments:
+            values = yield get_values(*args)
+            self._fragments[key] = JSONFragment(json.dumps(values))
+
+        raise gen.Return(self._fragments[key])
@@ -12,6 +12,8 @@
 #  License for the specific language governing permissions and limitations
 #  under the License.
 
+import time
+
 from tornado.log import app_log
 from opsrest import parse
 from opsrest.get import (
@@ -25,29 +27,48 @@ from opsrest.constants import (
     OVSDB_SCHEMA_BACK_REFERENCE,
     OVSDB_SCHEMA_TOP_LEVEL
 )
-from opsrest.handlers.websocket.notifications import WSNotificationsHandler
 from opsrest.notifications import utils as notifutils
 from opsrest.notifications import constants as consts
 from opsrest.notifications.subscription import (
     CollectionSubscription,
-    RowSubscription
+    RowSubscription,
+    get_encoded_row_values
 )
+from opsrest.notifications.index import SubscriptionIndex
+from opsrest.notifications.encoding import EncodingCache
+from opsrest.notifications.policy import PendingUpdates, split_resource_uri
+from opsrest.notifications.replay import ReplayBuffer
 from opsrest.notifications.exceptions import (
     NotificationException,
     NotificationMismatch,
     SubscriptionInvalidResource
 )
+from opsrest.notifications.connection import NotificationConnection
 from opsrest.notifications.monitor import OvsdbNotificationMonitor
 from opsrest.notifications.utils import lookup_subscriber_by_name
+from opsrest.settings import settings
 from tornado import gen
+from tornado.ioloop import IOLoop
 
 
 class NotificationHandler():
     def __init__(self, schema, manager):
         self._subscriptions_by_table = {}
         self._subscriptions = {}
+        self._subscriptions_by_uri = {}
+        self._index = SubscriptionIndex()
+        self._pending_updates = {}
+        self._flush_handle = None
+        self._flush_deadline = None
         self._schema = schema
 
+        # Sequence number of the last notification, and the updates
+        # notified by table, replayed to subscribers resuming
+        self._seqno = 0
+        self._replay_buffers = {}
+        self._replay_size = settings['notification_replay_size']
+        self._initial_chunk_size = settings['notification_initial_chunk_size']
+
         # Register for callbacks for subscription changes
         self._manager = manager
         self._subscriber_idl = self._manager.idl
@@ -55,7 +76,7 @@ class NotificationHandler():
                              self.subscription_changes_check_callback)
 
         # Enable monitoring for the subscription table
-        self._manager.idl.track_add_all_columns(consts.SUBSCRIPTION_TABLE)
+        self._manager.track_table(consts.SUBSCRIPTION_TABLE)
 
         # Register for callbacks for notifications of subscribed changes
 
@@ -80,6 +101,12 @@ class NotificationHandler():
         app_log.debug("Creating subscription for %s with URI %s" %
                       (subscription_name, resource_uri))
 
+        try:
+            resource_uri, policy, projection = \
+                split_resource_uri(resource_uri)
+        except ValueError as e:
+            raise SubscriptionInvalidResource(str(e))
+
         resource = parse.parse_url_path(resource_uri, self._schema, idl)
 
         if resource is None:
@@ -132,6 +159,8 @@ class NotificationHandler():
                                            subscription_uri, resource_uri,
                                            resource.row)
 
+        subscription.policy = policy
+        subscription.projection = projection
         raise gen.Return(subscription)
 
     def get_collection_row_uuids(self, parent_resource, idl):
@@ -205,6 +234,9 @@ class NotificationHandler():
             notifutils.get_table_changes_from_idl(consts.SUBSCRIPTION_TABLE,
                                                   idl)
 
+        # Subscriptions added together share their initial values
+        cache = EncodingCache()
+
         for sub_uuid, sub_changes in table_changes.iteritems():
             seqno = manager.curr_seqno
 
@@ -234,10 +266,19 @@ class NotificationHandler():
                                                        resource_uri,
                                                        idl)
 
-                    yield self.get_initial_values_and_notify(idl, subscription)
+                    NotificationConnection.register_subscription(
+                        subscription.subscriber_name,
+                        subscription.subscription_uri)
+
+                    # Changes made while the initial values are notified
+                    # are notified as well
                     self.add_subscription(sub_uuid, subscription)
+                    yield self.get_initial_values_and_notify(idl, subscription,
+                                                             cache)
                 except Exception as e:
                     app_log.error("Error while creating subscription: %s" % e)
+                    # Not notified of changes without its initial values
+                    self.remove_subscription(sub_uuid)
 
             elif notifutils.is_resource_deleted(sub_changes, seqno):
                 app_log.debug("Subscription was deleted.")
@@ -246,30 +287,22 @@ class NotificationHandler():
     @gen.coroutine
     def subscribed_changes_callback(self, manager, idl):
         subscriber_notifications = {}
+        cache = EncodingCache()
 
-        for table, subscriptions in self._subscriptions_by_table.iteritems():
-            if not notifutils.is_table_changed(table, idl):
+        for table in self._subscriptions_by_table.keys():
+            table_changes = notifutils.get_table_changes_from_idl(table, idl)
+            if not table_changes:
                 continue
 
             app_log.debug("Detected changes to subscribed table \"%s\"" %
                           table)
 
-            for subscription in subscriptions:
-                subs_name = subscription.subscriber_name
-
-                if subs_name not in subscriber_notifications:
-                    subscriber_notifications[subs_name] = {}
-
+            for row_uuid, row_change_info in table_changes.iteritems():
                 try:
-                    sub = subscriber_notifications[subs_name]
-                    added, modified, deleted = \
-                        yield subscription.get_changes(manager, idl,
-                                                       self._schema)
-
-                    self._add_updates(sub, consts.UPDATE_TYPE_ADDED, added)
-                    self._add_updates(sub, consts.UPDATE_TYPE_MODIFIED,
-                                      modified)
-                    self._add_updates(sub, consts.UPDATE_TYPE_DELETED, deleted)
+                    yield self._dispatch_row_change(manager, idl, table,
+                                                    row_uuid, row_change_info,
+                                                    subscriber_notifications,
+                                                    cache)
 
                 except NotificationMismatch as e:
                     app_log.debug(e.details)
@@ -277,26 +310,224 @@ class NotificationHandler():
                     app_log.error("Error processing notification."
                                   "Error: %s" % e.details)
 
+        self._flush_pending_updates(subscriber_notifications)
+
         for subscriber_name, changes in subscriber_notifications.iteritems():
             self.notify_subscriber(subscriber_name, changes,
                                    self._subscriber_idl)
 
     @gen.coroutine
-    def get_initial_values_and_notify(self, idl, subscription):
-        notify_msg = {}
-        initial_values = yield subscription.get_initial_values(idl,
-                                                               self._schema)
+    def _dispatch_row_change(self, manager, idl, table, row_uuid,
+                             row_change_info, subscriber_notifications,
+                             cache):
+        """
+        Adds the notifications of a row change to the subscriptions it
+        affects. The URI and the values of a new row are retrieved once,
+        whatever the number of subscriptions to its collections, and the
+        values notified are encoded once per batch in cache.
+        """
+        seqno = manager.curr_seqno
+
+        if notifutils.is_resource_added(row_change_info, seqno):
+            if not self._index.has_collections(table):
+                return
+
+            app_log.debug("Detected new resource added to collection")
+            row = idl.tables[table].rows[row_uuid]
+            resource_uri = utils.get_reference_uri(table, row, self._schema,
+                                                   idl)
+
+            app_log.debug("URI of added resource retrieved: %s" %
+                          resource_uri)
+
+            subscriptions = \
+                self._index.match_collections(table, resource_uri.split('/'))
+            if not subscriptions:
+                raise NotificationMismatch("URI not a part of a subscribed "
+                                           "collection. Skip.")
+
+            for subscription in subscriptions:
+                # Subscriptions with the same projection share the values
+                values = yield get_encoded_row_values(cache,
+                                                      subscription.projection,
+                                                      row_uuid, table,
+                                                      self._schema, idl,
+                                                      resource_uri)
+
+                # The subscription may have been removed meanwhile
+                if subscription not in \
+                        self._subscriptions_by_table.get(table, ()):
+                    continue
+
+                added = subscription.add_row(row_uuid, resource_uri, values)
+                self._index.add_collection_row(subscription, row_uuid)
+                self._add_subscription_update(subscriber_notifications,
+                                              subscription,
+                                              consts.UPDATE_TYPE_ADDED, added)
+
+        elif notifutils.is_resource_deleted(row_change_info, seqno):
+            for subscription in \
+                    self._index.get_collection_subscriptions(table, row_uuid):
+                app_log.debug("Detected resource deleted from collection")
+                deleted = subscription.remove_row(row_uuid)
+                self._index.remove_collection_row(subscription, row_uuid)
+                self._add_subscription_update(subscriber_notifications,
+                                              subscription,
+                                              consts.UPDATE_TYPE_DELETED,
+                                              deleted)
+
+            for subscription in \
+                    self._index.get_row_subscriptions(table, row_uuid):
+                self._add_subscription_update(subscriber_notifications,
+                                              subscription,
+                                              consts.UPDATE_TYPE_DELETED,
+                                              subscription.get_deleted())
+
+        elif notifutils.is_resource_modified(row_change_info, seqno):
+            for subscription in \
+                    self._index.get_row_subscriptions(table, row_uuid):
+                # Changes to columns that aren't projected cost nothing
+                columns = \
+                    subscription.get_notified_columns(row_change_info.columns)
+                if not columns:
+                    continue
+
+                modified = yield subscription.get_modified(columns, idl,
+                                                           self._schema, cache)
+                if modified is None:
+                    continue
+
+                self._add_subscription_update(subscriber_notifications,
+                                              subscription,
+                                              consts.UPDATE_TYPE_MODIFIED,
+                                              modified, columns)
+
+        else:
+            raise NotificationMismatch("No changes detected")
+
+    def _add_subscription_update(self, subscriber_notifications,
+                                 subscription, update_type, update,
+                                 columns=None):
+        if not subscription.policy.is_immediate():
+            # Delivered by _flush_pending_updates
+            if subscription not in self._pending_updates:
+                self._pending_updates[subscription] = \
+                    PendingUpdates(subscription.policy)
+            self._pending_updates[subscription].add(update_type, update,
+                                                    columns)
+            return
+
+        subs_name = subscription.subscriber_name
+        if subs_name not in subscriber_notifications:
+            subscriber_notifications[subs_name] = {}
+
+        self._add_updates(subscriber_notifications[subs_name], update_type,
+                          update)
+
+    def _flush_pending_updates(self, subscriber_notifications):
+        """
+        Adds the pending updates that can be delivered now, as allowed
+        by the delivery policy of their subscription, and schedules the
+        delivery of the others
+        """
+        now = time.time()
+        next_delay = None
+
+        for subscription, pending in self._pending_updates.iteritems():
+            delay = pending.get_delay(now)
+            if delay == 0:
+                for update_type, update in pending.take(now):
+                    self._add_updates(subscriber_notifications.setdefault(
+                        subscription.subscriber_name, {}), update_type,
+                        update)
+                delay = pending.get_delay(now)
+
+            if delay is not None and (next_delay is None or
+                                      delay < next_delay):
+                next_delay = delay
+
+        if next_delay is not None:
+            self._schedule_flush(now + next_delay)
+
+    def _schedule_flush(self, deadline):
+        if self._flush_handle is not None:
+            if self._flush_deadline <= deadline:
+                return
+            IOLoop.current().remove_timeout(self._flush_handle)
+
+        self._flush_deadline = deadline
+        self._flush_handle = IOLoop.current().add_timeout(deadline,
+                                                          self._flush_timeout)
+
+    def _flush_timeout(self):
+        self._flush_handle = None
+
+        subscriber_notifications = {}
+        self._flush_pending_updates(subscriber_notifications)
 
-        if initial_values:
+        for subscriber_name, changes in subscriber_notifications.iteritems():
+            self.notify_subscriber(subscriber_name, changes,
+                                   self._subscriber_idl)
+
+    @gen.coroutine
+    def get_initial_values_and_notify(self, idl, subscription, cache=None):
+        """
+        Notifies the initial values of a subscription, the rows of a
+        collection being notified in chunks. Between chunks, the IOLoop
+        serves other requests and the subscriber's websocket drains.
+        The last notification marks the initial sync as complete, it is
+        sent on its own for empty collections.
+        """
+        chunks = [None]
+        if isinstance(subscription, CollectionSubscription) and \
+                self._initial_chunk_size:
+            row_uuids = subscription.rows_to_uri.keys()
+            size = self._initial_chunk_size
+            chunks = [row_uuids[start:start + size]
+                      for start in xrange(0, len(row_uuids), size)] or [[]]
+
+        for index, row_uuids in enumerate(chunks):
+            if index:
+                yield gen.moment
+                yield NotificationConnection.wait_for_drain(
+                    subscription.subscriber_name)
+
+                # The subscription may have been removed meanwhile
+                if subscription.subscription_uri not in \
+                        self._subscriptions_by_uri:
+                    return
+
+            if row_uuids is None:
+                initial_values = \
+                    yield subscription.get_initial_values(idl, self._schema,
+                                                          cache)
+            else:
+                initial_values = \
+                    yield subscription.get_initial_values(idl, self._schema,
+                                                          cache, row_uuids)
+
+            notify_msg = {}
             self._add_updates(notify_msg, consts.UPDATE_TYPE_ADDED,
                               initial_values)
-            self.notify_subscriber(subscription.subscriber_name, notify_msg,
-                                   idl)
-
-    def notify_subscriber(self, subscriber_name, changes, idl):
+            if index == len(chunks) - 1:
+                self._add_updates(notify_msg, consts.UPDATE_TYPE_SYNC_COMPLETE,
+                                  subscription.get_sync_complete())
+
+            # Initial values aren't replayed, a subscriber that missed
+            # them resyncs
+            seqno = self.notify_subscriber(subscription.subscriber_name,
+                                           notify_msg, idl, record=False)
+            if seqno is not None:
+                subscription.seqno = seqno
+
+    def notify_subscriber(self, subscriber_name, changes, idl, record=True):
+        """
+        Notifies the changes with the next sequence number, which is
+        returned. The updates are kept for replay unless record is False.
+        """
         if not changes:
             app_log.debug("No changes. Skip notification")
-            return
+            return None
 
         app_log.debug("Notifying subscriber %s." % subscriber_name)
         subscriber_row = lookup_subscriber_by_name(idl, subscriber_name)
@@ -305,13 +536,109 @@ class NotificationHandler():
             subscriber_type = self._get_subscriber_type(subscriber_row, idl)
 
             if subscriber_type == consts.SUBSCRIBER_TYPE_WS:
-                notif_msg = {consts.NOTIF_MSG: changes}
-                WSNotificationsHandler.send_notification_msg(subscriber_name,
-                                                             notif_msg)
+                self._seqno += 1
+                if record:
+                    self._record_updates(subscriber_name, changes,
+                                         self._seqno)
+
+                NotificationConnection.send_notification_msg(
+                    subscriber_name, changes, self._seqno)
+                return self._seqno
             else:
                 app_log.error("Unsupported subscriber type: %s" %
                               subscriber_type)
 
+        return None
+
+    def _record_updates(self, subscriber_name, changes, seqno):
+        for update_type, updates in changes.iteritems():
+            for update in updates:
+                subscription = self._subscriptions_by_uri.get(
+                    update[consts.NOTIF_SUBSCRIPTION_FIELD])
+                if subscription is None:
+                    continue
+
+                table = subscription.table
+                if table not in self._replay_buffers:
+                    self._replay_buffers[table] = \
+                        ReplayBuffer(self._replay_size)
+                self._replay_buffers[table].add(seqno, subscriber_name,
+                                                update_type, update)
+
+    @gen.coroutine
+    def resume_subscriber(self, subscriber_name, seqno, idl):
+        """
+        Notifies a subscriber reconnecting of the updates notified after
+        seqno, the sequence number of the last notification it received,
+        with their original sequence numbers. If they aren't all kept,
+        or seqno is None, the subscriber is notified to resync followed
+        by the initial values of its subscriptions.
+        """
+        subscriptions = [subscription for subscription in
+                         self._subscriptions.itervalues()
+                         if subscription.subscriber_name == subscriber_name]
+
+        for subscription in subscriptions:
+            NotificationConnection.register_subscription(
+                subscriber_name, subscription.subscription_uri)
+
+        updates = self._get_missed_updates(subscriber_name, subscriptions,
+                                           seqno)
+        if updates is None:
+            app_log.debug("Updates missed by %s not kept, resyncing." %
+                          subscriber_name)
+            NotificationConnection.send_resync_msg(subscriber_name)
+
+            cache = EncodingCache()
+            for subscription in subscriptions:
+                yield self.get_initial_values_and_notify(idl, subscription,
+                                                         cache)
+            return
+
+        app_log.debug("Replaying %d updates to %s." %
+                      (len(updates), subscriber_name))
+
+        # One notification per original notification, in order
+        changes = {}
+        for index, (update_seqno, update_type, update) in \
+                enumerate(updates):
+            self._add_updates(changes, update_type, update)
+            if index + 1 == len(updates) or \
+                    updates[index + 1][0] != update_seqno:
+                NotificationConnection.send_notification_msg(
+                    subscriber_name, changes, update_seqno)
+                changes = {}
+
+    def _get_missed_updates(self, subscriber_name, subscriptions, seqno):
+        """
+        Returns the updates of the subscriptions notified after seqno,
+        in order, or None if some of them aren't kept
+        """
+        if seqno is None or seqno > self._seqno:
+            return None
+
+        subscription_uris = set()
+        tables = set()
+        for subscription in subscriptions:
+            if subscription.seqno > seqno:
+                return None
+            subscription_uris.add(subscription.subscription_uri)
+            tables.add(subscription.table)
+
+        updates = []
+        for table in tables:
+            replay_buffer = self._replay_buffers.get(table)
+            if replay_buffer is None:
+                continue
+            if not replay_buffer.can_replay(seqno):
+                return None
+            updates.extend(replay_buffer.get_updates(subscriber_name,
+                                                     subscription_uris,
+                                                     seqno))
+
+        updates.sort(key=lambda update: update[0])
+        return updates
+
     def add_subscription(self, subscription_uuid, subscription):
         app_log.debug("Adding subscription: %s\n%s" %
                       (subscription_uuid, subscription))
@@ -325,12 +652,15 @@ class NotificationHandler():
             # self._notification_monitor.add_table_monitor(subscription.table)
 
             # TODO: Remove this when second monitor is available.
-            self._manager.idl.track_add_all_columns(subscription.table)
+            self._manager.track_table(subscription.table)
 
         self._subscriptions_by_table[subscription.table].add(subscription)
+        self._index.add(subscription)
 
         # Add the subscription by name for reverse lookup
         self._subscriptions[subscription_uuid] = subscription
+        self._subscriptions_by_uri[subscription.subscription_uri] = \
+            subscription
 
     def remove_subscription(self, subscription_uuid):
         app_log.debug("Removing subscription %s" % subscription_uuid)
@@ -340,24 +670,31 @@ class NotificationHandler():
             subscription = self._subscriptions[subscription_uuid]
 
             del self._subscriptions[subscription_uuid]
+            self._subscriptions_by_uri.pop(subscription.subscription_uri,
+                                           None)
 
         # Remove the subscription from the table map if it exists
         if subscription and subscription.table in self._subscriptions_by_table:
             table = subscription.table
             self._subscriptions_by_table[table].discard(subscription)
+            self._index.remove(subscription)
+            self._pending_updates.pop(subscription, None)
+            NotificationConnection.unregister_subscription(
+                subscription.subscriber_name, subscription.subscription_uri)
 
             # If the table is no longer being monitored, remove tracking and
             # monitoring from the idl.
             if not self._subscriptions_by_table[table]:
                 # No longer need the table entry in the mapping.
                 del self._subscriptions_by_table[table]
+                self._replay_buffers.pop(table, None)
 
                 # TODO: Reeable this when second monitor is available
                 # Need to also remove tracking/monitoring
                 # self._notification_monitor.remove_table_monitor(table)
 
                 # TODO: Remove this when second monitor is available
-                self._manager.idl.track_remove_all_columns(subscription.table)
+                self._manager.untrack_table(subscription.table)
 
     def _add_updates(self, subscriber_changes, update_type, updates):
         if not updates:
@@ -0,0 +1,156 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from opsrest.notifications.subscription import CollectionSubscription
+
+
+class UriTrie(object):
+    """
+    Collection subscriptions by the segments of their collection URI
+    """
+    __slots__ = ('children', 'subscriptions')
+
+    def __init__(self):
+        self.children = {}
+        self.subscriptions = set()
+
+    def add(self, segments, subscription):
+        node = self
+        for segment in segments:
+            if segment not in node.children:
+                node.children[segment] = UriTrie()
+            node = node.children[segment]
+        node.subscriptions.add(subscription)
+
+    def remove(self, segments, subscription):
+        path = []
+        node = self
+        for segment in segments:
+            if segment not in node.children:
+                return
+            path.append((node, segment))
+            node = node.children[segment]
+        node.subscriptions.discard(subscription)
+
+        # Prune the nodes left without subscriptions
+        for parent, segment in reversed(path):
+            child = parent.children[segment]
+            if child.subscriptions or child.children:
+                break
+            del parent.children[segment]
+
+    def match(self, segments):
+        """
+        Returns the subscriptions to the collections a resource with
+        the given URI segments belongs to, i.e. the subscriptions whose
+        URI segments are a prefix of the resource's
+        """
+        matches = []
+        node = self
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                break
+            matches.extend(node.subscriptions)
+        return matches
+
+    def is_empty(self):
+        return not self.children and not self.subscriptions
+
+
+class SubscriptionIndex(object):
+    """
+    Subscriptions by table, indexed so that the subscriptions affected
+    by a row change are found without going through every subscription
+    to the table:
+      - Row subscriptions by row UUID.
+      - Collection subscriptions in a trie of their collection URIs,
+        for added rows, and by the UUIDs of the rows they hold, for
+        deleted rows.
+    """
+    def __init__(self):
+        self._row_subscriptions = {}
+        self._collection_tries = {}
+        self._collection_rows = {}
+
+    def add(self, subscription):
+        table = subscription.table
+        if isinstance(subscription, CollectionSubscription):
+            if table not in self._collection_tries:
+                self._collection_tries[table] = UriTrie()
+            self._collection_tries[table].add(subscription.uri_segments,
+                                              subscription)
+
+            for row_uuid in subscription.rows_to_uri:
+                self.add_collection_row(subscription, row_uuid)
+        else:
+            rows = self._row_subscriptions.setdefault(table, {})
+            rows.setdefault(subscription.row, set()).add(subscription)
+
+    def remove(self, subscription):
+        table = subscription.table
+        if isinstance(subscription, CollectionSubscription):
+            trie = self._collection_tries.get(table)
+            if trie is not None:
+                trie.remove(subscription.uri_segments, subscription)
+                if trie.is_empty():
+                    del self._collection_tries[table]
+
+            for row_uuid in subscription.rows_to_uri:
+                self.remove_collection_row(subscription, row_uuid)
+        else:
+            _discard(self._row_subscriptions, table, subscription.row,
+                     subscription)
+
+    def add_collection_row(self, subscription, row_uuid):
+        rows = self._collection_rows.setdefault(subscription.table, {})
+        rows.setdefault(row_uuid, set()).add(subscription)
+
+    def remove_collection_row(self, subscription, row_uuid):
+        _discard(self._collection_rows, subscription.table, row_uuid,
+                 subscription)
+
+    def has_collections(self, table):
+        return table in self._collection_tries
+
+    def match_collections(self, table, uri_segments):
+        """
+        Returns the collection subscriptions a new row of the table
+        belongs to, given the segments of the row's URI
+        """
+        trie = self._collection_tries.get(table)
+        if trie is None:
+            return []
+        return trie.match(uri_segments)
+
+    def get_collection_subscriptions(self, table, row_uuid):
+        """
+        Returns the collection subscriptions holding a row
+        """
+        return list(self._collection_rows.get(table, {}).get(row_uuid, []))
+
+    def get_row_subscriptions(self, table, row_uuid):
+        return list(self._row_subscriptions.get(table, {}).get(row_uuid, []))
+
+
+def _discard(table_map, table, row_uuid, subscription):
+    rows = table_map.get(table)
+    if rows is None or row_uuid not in rows:
+        return
+
+    rows[row_uuid].discard(subscription)
+    if not rows[row_uuid]:
+        del rows[row_uuid]
+        if not rows:
+            del table_map[table]
@@ -0,0 +1,197 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+import json
+import urlparse
+
+from opsrest.notifications.constants import (
+    NOTIF_NEW_VALUES_FIELD,
+    NOTIF_RESOURCE_FIELD,
+    NOTIF_SUBSCRIPTION_FIELD,
+    POLICY_COALESCE,
+    POLICY_MAX_BATCH,
+    POLICY_MIN_INTERVAL,
+    PROJECTION_COLUMNS,
+    UPDATE_TYPE_DELETED,
+    UPDATE_TYPE_MODIFIED
+)
+from opsrest.notifications.projection import Projection
+
+
+def split_resource_uri(resource_uri):
+    """
+    Splits the resource URI of a subscription into the URI of the
+    resource, its delivery policy and its column projection, given as
+    query arguments. The projection is None for all the columns.
+    Raises ValueError if the arguments are invalid.
+    """
+    if '?' not in resource_uri:
+        return (resource_uri, DeliveryPolicy(), None)
+
+    (path, query) = resource_uri.split('?', 1)
+    arguments = urlparse.parse_qs(query, keep_blank_values=True)
+
+    projection = None
+    if PROJECTION_COLUMNS in arguments:
+        projection = Projection.from_argument(
+            arguments.pop(PROJECTION_COLUMNS)[-1])
+
+    return (path, DeliveryPolicy.from_arguments(arguments), projection)
+
+
+class DeliveryPolicy(object):
+    """
+    How the updates of a subscription are delivered:
+      - min_interval: Milliseconds between two notifications.
+      - max_batch: Maximum number of updates per notification, the
+        others are delivered with the next ones.
+      - coalesce: Whether successive modifications of a resource not
+        delivered yet are merged, the latest values winning.
+    """
+    __slots__ = ('min_interval', 'max_batch', 'coalesce')
+
+    def __init__(self, min_interval=0, max_batch=0, coalesce=False):
+        self.min_interval = min_interval
+        self.max_batch = max_batch
+        self.coalesce = coalesce
+
+    @staticmethod
+    def from_arguments(arguments):
+        policy = DeliveryPolicy()
+        for name, values in arguments.iteritems():
+            value = values[-1]
+            if name == POLICY_MIN_INTERVAL:
+                policy.min_interval = _to_count(name, value)
+            elif name == POLICY_MAX_BATCH:
+                policy.max_batch = _to_count(name, value)
+            elif name == POLICY_COALESCE:
+                if value not in ('true', 'false'):
+                    raise ValueError("Invalid %s value %s" % (name, value))
+                policy.coalesce = value == 'true'
+            else:
+                raise ValueError("Unknown delivery policy %s" % name)
+        return policy
+
+    def is_immediate(self):
+        return not self.min_interval and not self.max_batch and \
+            not self.coalesce
+
+
+def _to_count(name, value):
+    try:
+        count = int(value)
+    except ValueError:
+        count = -1
+    if count < 0:
+        raise ValueError("Invalid %s value %s" % (name, value))
+    return count
+
+
+class PendingUpdates(object):
+    """
+    Updates of a subscription waiting to be delivered
+    """
+    def __init__(self, policy):
+        self.policy = policy
+        self.last_sent = 0.0
+        self.updates = []
+        # pending modifications by subscription and resource, with
+        # their columns
+        self.modified = {}
+
+    def add(self, update_type, update, columns=None):
+        """
+        Queues an update, columns being the columns changed by a
+        modification, None if unknown
+        """
+        key = _get_update_key(update)
+        if self.policy.coalesce:
+            if update_type == UPDATE_TYPE_MODIFIED and key in self.modified:
+                self._merge(self.modified[key], update, columns)
+                return
+            if update_type == UPDATE_TYPE_DELETED:
+                self._drop_modified(key)
+
+        if columns is not None:
+            columns = frozenset(columns)
+        entry = [update_type, update, columns]
+        self.updates.append(entry)
+        if self.policy.coalesce and update_type == UPDATE_TYPE_MODIFIED:
+            self.modified[key] = entry
+
+    def _merge(self, entry, update, columns):
+        # columns are None when unknown, the values are merged then
+        if columns is not None:
+            columns = frozenset(columns)
+            if entry[2] is not None and columns >= entry[2]:
+                entry[1] = update
+                return
+
+        values = _decode(entry[1][NOTIF_NEW_VALUES_FIELD])
+        values.update(_decode(update[NOTIF_NEW_VALUES_FIELD]))
+        merged = dict(update)
+        merged[NOTIF_NEW_VALUES_FIELD] = values
+        entry[1] = merged
+        if columns is None or entry[2] is None:
+            entry[2] = None
+        else:
+            entry[2] = entry[2] | columns
+
+    def _drop_modified(self, key):
+        entry = self.modified.pop(key, None)
+        if entry is None:
+            return
+
+        for index, pending in enumerate(self.updates):
+            if pending is entry:
+                del self.updates[index]
+                break
+
+    def get_delay(self, now):
+        """
+        Returns the seconds left before the updates can be delivered
+        """
+        if not self.updates:
+            return None
+        return max(self.last_sent + self.policy.min_interval / 1000.0 - now,
+                   0)
+
+    def take(self, now):
+        """
+        Returns the updates to deliver now, as a list of
+        (update type, update)
+        """
+        count = self.policy.max_batch or len(self.updates)
+        taken = self.updates[:count]
+        del self.updates[:count]
+
+        for (update_type, update, columns) in taken:
+            if update_type == UPDATE_TYPE_MODIFIED:
+                self.modified.pop(_get_update_key(update), None)
+
+        self.last_sent = now
+        return [(update_type, update) for (update_type, update, _) in taken]
+
+
+def _get_update_key(update):
+    # updates of several subscriptions can be queued together
+    return (update.get(NOTIF_SUBSCRIPTION_FIELD),
+            update[NOTIF_RESOURCE_FIELD])
+
+
+def _decode(values):
+    # values may be encoded already
+    if isinstance(values, basestring):
+        return json.loads(values)
+    return dict(values)
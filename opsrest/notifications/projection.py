@@ -0,0 +1,88 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from opsrest.notifications.constants import PROJECTION_KEY_SEPARATOR
+
+
+class Projection(object):
+    """
+    Columns, and keys of map columns, a subscription is notified of,
+    e.g. "link_state,admin_state,statistics.rx_packets"
+
+    Attributes:
+        columns (dict): Keys of the map columns projected, by column.
+            None for a whole column.
+        key (tuple): Hashable representation of the projection.
+    """
+    __slots__ = ('columns', 'key')
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.key = tuple(sorted(self._get_column_keys(columns)))
+
+    @staticmethod
+    def from_argument(value):
+        """
+        Returns the projection given as a comma separated list of
+        columns and column.key. Raises ValueError if empty.
+        """
+        columns = {}
+        for item in value.split(','):
+            item = item.strip()
+            if not item:
+                continue
+
+            if PROJECTION_KEY_SEPARATOR in item:
+                (column, key) = item.split(PROJECTION_KEY_SEPARATOR, 1)
+                if column not in columns:
+                    columns[column] = set()
+                if columns[column] is not None:
+                    columns[column].add(key)
+            else:
+                columns[item] = None
+
+        if not columns:
+            raise ValueError("Empty column projection")
+
+        return Projection(dict((column, frozenset(keys) if keys else None)
+                               for column, keys in columns.iteritems()))
+
+    def _get_column_keys(self, columns):
+        return [(column, tuple(sorted(keys)) if keys else None)
+                for column, keys in columns.iteritems()]
+
+    def has_keys(self):
+        return any(keys for keys in self.columns.itervalues())
+
+    def get_changed_columns(self, columns):
+        """
+        Returns the projected columns among the changed ones
+        """
+        return [column for column in columns if column in self.columns]
+
+    def apply(self, values):
+        """
+        Returns the projected values from the values of a row by column
+        """
+        projected = {}
+        for column, keys in self.columns.iteritems():
+            if column not in values:
+                continue
+
+            value = values[column]
+            if keys and isinstance(value, dict):
+                value = dict((key, value[key]) for key in keys
+                             if key in value)
+            projected[column] = value
+        return projected
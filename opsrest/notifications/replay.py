@@ -0,0 +1,52 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from collections import deque
+
+from opsrest.notifications.constants import NOTIF_SUBSCRIPTION_FIELD
+
+
+class ReplayBuffer(object):
+    """
+    Latest updates notified for the subscriptions to a table, with the
+    sequence number of their notification, so that a subscriber
+    reconnecting gets the updates it missed. The oldest updates are
+    dropped once the buffer is full.
+    """
+    def __init__(self, size):
+        self.updates = deque(maxlen=size)
+        # Sequence number of the latest update dropped
+        self.dropped_seqno = 0
+
+    def add(self, seqno, subscriber_name, update_type, update):
+        if len(self.updates) == self.updates.maxlen:
+            self.dropped_seqno = self.updates[0][0] if self.updates \
+                else seqno
+        self.updates.append((seqno, subscriber_name, update_type, update))
+
+    def can_replay(self, seqno):
+        """
+        Returns whether all the updates notified after seqno are kept
+        """
+        return self.dropped_seqno <= seqno
+
+    def get_updates(self, subscriber_name, subscription_uris, seqno):
+        """
+        Returns the updates of the subscriptions notified after seqno,
+        as a list of (seqno, update type, update)
+        """
+        return [(update_seqno, update_type, update)
+                for (update_seqno, name, update_type, update) in self.updates
+                if update_seqno > seqno and name == subscriber_name and
+                update.get(NOTIF_SUBSCRIPTION_FIELD) in subscription_uris]
@@ -12,30 +12,22 @@
 #  License for the specific language governing permissions and limitations
 #  under the License.
 
-from opsrest.utils.utils import (
-    get_reference_uri,
-    row_ovs_column_to_json
-)
+from opsrest.utils.utils import row_ovs_column_to_json
 from opsrest.get import get_row_json, get_column_json
-from opsrest.notifications.utils import (
-    get_table_changes_from_idl,
-    is_resource_added,
-    is_resource_deleted,
-    is_resource_modified
-)
 from opsrest.notifications.constants import (
     NOTIF_SUBSCRIPTION_FIELD,
     NOTIF_RESOURCE_FIELD,
     NOTIF_NEW_VALUES_FIELD,
     NOTIF_VALUES_FIELD
 )
-from opsrest.notifications.exceptions import (
-    NotificationMismatch,
-    NotificationValueError
-)
-from tornado.log import app_log
+from opsrest.notifications.exceptions import NotificationValueError
+from opsrest.notifications.policy import DeliveryPolicy
 from tornado import gen
 
+# Cache key of the projected values of a row, apart from the changed
+# columns of modifications
+ROW_VALUES_KEY = 'row'
+
 
 def construct_modified_msg(subscription_uri, resource_uri, changes):
     modified = {NOTIF_SUBSCRIPTION_FIELD: subscription_uri,
@@ -57,9 +49,14 @@ def construct_deleted_msg(subscription_uri, resource_uri):
     return deleted
 
 
+def construct_sync_complete_msg(subscription_uri, resource_uri):
+    sync_complete = {NOTIF_SUBSCRIPTION_FIELD: subscription_uri,
+                     NOTIF_RESOURCE_FIELD: resource_uri}
+    return sync_complete
+
+
 @gen.coroutine
-def get_row_initial_values(row, table, schema, idl, resource_uri,
-                           subscription_uri):
+def get_row_values(row, table, schema, idl, resource_uri):
     resource_data = yield get_row_json(row, table, schema, idl, resource_uri)
 
     # Remove categories returned by get_row_json
@@ -67,20 +64,68 @@ def get_row_initial_values(row, table, schema, idl, resource_uri,
     for category, column_data in resource_data.iteritems():
         columns_to_values.update(column_data)
 
+    raise gen.Return(columns_to_values)
+
+
+@gen.coroutine
+def get_projected_row_values(projection, row, table, schema, idl,
+                             resource_uri):
+    columns_to_values = yield get_row_values(row, table, schema, idl,
+                                             resource_uri)
+    if projection is not None:
+        columns_to_values = projection.apply(columns_to_values)
+
+    raise gen.Return(columns_to_values)
+
+
+def get_encoded_row_values(cache, projection, row, table, schema, idl,
+                           resource_uri):
+    """
+    Returns the encoded values of a row from cache, the values of a
+    projection being cached apart from those of the whole row
+    """
+    key = None
+    if projection is not None:
+        key = (ROW_VALUES_KEY, projection.key)
+
+    return cache.get(table, row, key, resource_uri, get_projected_row_values,
+                     projection, row, table, schema, idl, resource_uri)
+
+
+@gen.coroutine
+def get_row_initial_values(row, table, schema, idl, resource_uri,
+                           subscription_uri, cache=None, projection=None):
+    if cache is None:
+        columns_to_values = yield get_projected_row_values(projection, row,
+                                                           table, schema, idl,
+                                                           resource_uri)
+    else:
+        columns_to_values = yield get_encoded_row_values(cache, projection,
+                                                         row, table, schema,
+                                                         idl, resource_uri)
+
     raise gen.Return(construct_added_msg(subscription_uri, resource_uri,
                                          columns_to_values))
 
 
 class Subscription(object):
+    __slots__ = ('table', 'subscriber_name', 'subscription_uri', 'policy',
+                 'projection', 'seqno')
+
     def __init__(self, table, subscriber_name, subscription_uri):
         self.table = table
         self.subscriber_name = subscriber_name
         self.subscription_uri = subscription_uri
+        self.policy = DeliveryPolicy()
+        # Columns notified, None for all
+        self.projection = None
+        # Sequence number of the notification of the initial values
+        self.seqno = 0
 
-    def get_initial_values(self, idl, schema):
+    def get_initial_values(self, idl, schema, cache=None):
         pass
 
-    def get_changes(self, manager, idl, schema):
+    def get_sync_complete(self):
         pass
 
     def __str__(self):
@@ -91,6 +136,8 @@ class Subscription(object):
 
 
 class RowSubscription(Subscription):
+    __slots__ = ('resource_uri', 'row', 'notified_values')
+
     def __init__(self, table, subscriber_name, subscription_uri,
                  resource_uri, row):
         super(RowSubscription, self).__init__(table, subscriber_name,
@@ -100,40 +147,74 @@ class RowSubscription(Subscription):
         self.resource_uri = resource_uri
         self.row = row
 
+        # Values last notified, when keys of map columns are projected
+        self.notified_values = {}
+
+    def _tracks_keys(self):
+        return self.projection is not None and self.projection.has_keys()
+
     @gen.coroutine
-    def get_initial_values(self, idl, schema):
+    def get_initial_values(self, idl, schema, cache=None):
+        if self._tracks_keys():
+            # Values are kept to detect changes of the projected keys
+            cache = None
+
         values = yield get_row_initial_values(self.row, self.table, schema,
                                               idl, self.resource_uri,
-                                              self.subscription_uri)
+                                              self.subscription_uri, cache,
+                                              self.projection)
+
+        if self._tracks_keys():
+            self.notified_values = dict(values[NOTIF_VALUES_FIELD])
+
         raise gen.Return(values)
 
+    def get_notified_columns(self, columns):
+        """
+        Returns the changed columns the subscription is notified of
+        """
+        if self.projection is None:
+            return columns
+        return self.projection.get_changed_columns(columns)
+
     @gen.coroutine
-    def get_changes(self, manager, idl, schema):
-        deleted = None
-        modified = None
-
-        # Check if current subscription is in the list of changes
-        table_changes = get_table_changes_from_idl(self.table, idl)
-        if self.row not in table_changes:
-            raise NotificationMismatch("Row not found in changes.")
-
-        row_change_info = table_changes[self.row]
-
-        # Check if it was deleted or modified
-        if is_resource_modified(row_change_info, manager.curr_seqno):
-            updated_cols = row_change_info.columns
-            columns_to_values = yield self.get_columns_to_values(updated_cols,
-                                                                 idl, schema)
-            modified = construct_modified_msg(self.subscription_uri,
-                                              self.resource_uri,
-                                              columns_to_values)
-        elif is_resource_deleted(row_change_info, manager.curr_seqno):
-            deleted = construct_deleted_msg(self.subscription_uri,
-                                            self.resource_uri)
+    def get_modified(self, columns, idl, schema, cache=None):
+        """
+        Returns the modified message for the changed columns, or None
+        if the projected keys of the columns didn't change
+        """
+        if self._tracks_keys():
+            # Map columns change as a whole, e.g. statistics
+            columns_to_values = yield self.get_columns_to_values(columns, idl,
+                                                                 schema)
+            columns_to_values = self.projection.apply(columns_to_values)
+            columns_to_values = dict(
+                (column, value)
+                for column, value in columns_to_values.iteritems()
+                if column not in self.notified_values or
+                self.notified_values[column] != value)
+
+            if not columns_to_values:
+                raise gen.Return(None)
+            self.notified_values.update(columns_to_values)
+        elif cache is None:
+            columns_to_values = yield self.get_columns_to_values(columns, idl,
+                                                                 schema)
         else:
-            raise NotificationMismatch("No changes detected")
+            columns_to_values = \
+                yield cache.get(self.table, self.row, columns,
+                                self.resource_uri, self.get_columns_to_values,
+                                columns, idl, schema)
+        raise gen.Return(construct_modified_msg(self.subscription_uri,
+                                                self.resource_uri,
+                                                columns_to_values))
+
+    def get_deleted(self):
+        return construct_deleted_msg(self.subscription_uri, self.resource_uri)
 
-        raise gen.Return((None, modified, deleted))
+    def get_sync_complete(self):
+        return construct_sync_complete_msg(self.subscription_uri,
+                                           self.resource_uri)
 
     @gen.coroutine
     def get_columns_to_values(self, columns, idl, schema):
@@ -173,6 +254,8 @@ class RowSubscription(Subscription):
 
 
 class CollectionSubscription(Subscription):
+    __slots__ = ('collection_uri', 'uri_segments', 'rows_to_uri')
+
     def __init__(self, table, subscriber_name, subscription_uri,
                  collection_uri, rows_to_uri):
         super(CollectionSubscription, self).__init__(table, subscriber_name,
@@ -187,82 +270,52 @@ class CollectionSubscription(Subscription):
         self.rows_to_uri = rows_to_uri
 
     @gen.coroutine
-    def get_initial_values(self, idl, schema):
+    def get_initial_values(self, idl, schema, cache=None, row_uuids=None):
+        """
+        Returns the initial values of the given rows, all by default.
+        Rows no longer in the collection are skipped.
+        """
+        if row_uuids is None:
+            row_uuids = self.rows_to_uri.keys()
+
         initial_values = []
 
-        for row_uuid, resource_uri in self.rows_to_uri.iteritems():
+        for row_uuid in row_uuids:
+            resource_uri = self.rows_to_uri.get(row_uuid)
+            if resource_uri is None:
+                continue
+
             data = yield get_row_initial_values(row_uuid, self.table, schema,
                                                 idl, resource_uri,
-                                                self.subscription_uri)
+                                                self.subscription_uri, cache,
+                                                self.projection)
 
             if data:
                 initial_values.append(data)
 
         raise gen.Return(initial_values)
 
-    @gen.coroutine
-    def get_changes(self, manager, idl, schema):
-        table_changes = get_table_changes_from_idl(self.table, idl)
-        added = []
-        deleted = []
-
-        for row_uuid, row_change_info in table_changes.iteritems():
-            # Check for additions
-            if is_resource_added(row_change_info, manager.curr_seqno):
-                app_log.debug("Detected new resource added to collection")
-
-                row = idl.tables[self.table].rows[row_uuid]
-
-                # Since added, need to check if it's part of the subscribed
-                # collection URI. Get URI trace for this resource.
-                resource_uri = get_reference_uri(self.table, row, schema, idl)
-                uri_trace = resource_uri.split('/')
-
-                app_log.debug("URI of added resource retrieved: %s" %
-                              resource_uri)
-
-                # Lengths of the resource URI should be greater than the
-                # collection's URI.
-                if len(uri_trace) < len(self.uri_segments):
-                    raise NotificationMismatch("URI not a part of "
-                                               "the collection. Skip.")
-
-                for idx, segment in enumerate(self.uri_segments):
-                    # TODO: In the future, for wildcards, also check for *
-                    if segment != uri_trace[idx]:
-                        # This resource change is not a part of a subscribed
-                        # collection.
-                        app_log.debug("Parents did not match. %s != %s" %
-                                      (segment, uri_trace[idx]))
-                        raise NotificationMismatch("Subscription mismatch.")
-
-                # Add new entry
-                self.rows_to_uri[row_uuid] = resource_uri
-
-                added_data = \
-                    yield get_row_initial_values(row_uuid, self.table,
-                                                 schema, idl,
-                                                 resource_uri,
-                                                 self.subscription_uri)
-
-                added.append(added_data)
-
-            elif is_resource_deleted(row_change_info, manager.curr_seqno):
-                app_log.debug("Detected resource deleted from collection")
-
-                # Check if it's part of a collection that we were tracking
-                if row_uuid in self.rows_to_uri:
-                    app_log.debug("Row found in subscription.")
-
-                    # Grab the resource URI before it's deleted.
-                    data = construct_deleted_msg(self.subscription_uri,
-                                                 self.rows_to_uri[row_uuid])
-                    deleted.append(data)
-                    del self.rows_to_uri[row_uuid]
-            else:
-                raise NotificationMismatch("No changes detected")
-
-        raise gen.Return((added, None, deleted))
+    def get_sync_complete(self):
+        return construct_sync_complete_msg(self.subscription_uri,
+                                           self.collection_uri)
+
+    def add_row(self, row_uuid, resource_uri, values):
+        """
+        Adds a new row of the collection, with its URI and the values
+        of its columns. Returns the added message.
+        """
+        self.rows_to_uri[row_uuid] = resource_uri
+        return construct_added_msg(self.subscription_uri, resource_uri,
+                                   values)
+
+    def remove_row(self, row_uuid):
+        """
+        Removes a deleted row of the collection. Returns the deleted
+        message.
+        """
+        # Grab the resource URI before it's deleted.
+        resource_uri = self.rows_to_uri.pop(row_uuid)
+        return construct_deleted_msg(self.subscription_uri, resource_uri)
 
     def __str__(self):
         info_str = super(CollectionSubscription, self).__str__()
@@ -20,10 +20,124 @@ import ovs.ovsuuid
 import types
 import json
 import urllib
+import weakref
+import collections
 
 from tornado.log import app_log
 
 
+# Maximum number of resolved URIs kept by a router
+URI_CACHE_SIZE = 512
+
+_routers = weakref.WeakKeyDictionary()
+
+
+def get_router(schema):
+    '''
+    Returns the UriRouter compiled for schema
+    '''
+    router = _routers.get(schema)
+    if router is None:
+        router = UriRouter(schema)
+        _routers[schema] = router
+    return router
+
+
+class Route(object):
+    '''
+    Describes where a URI segment leads to from a given table
+    '''
+    def __init__(self, table, relation, column=None, n_max=None,
+                 kv_type=False, kv_key_type=None, indexes=None):
+        self.table = table
+        self.relation = relation
+        self.column = column
+        self.n_max = n_max
+        self.kv_type = kv_type
+        self.kv_key_type = kv_key_type
+        # index columns, None for tables indexed by uuid
+        self.indexes = indexes
+
+
+class UriRouter(object):
+    '''
+    The REST schema compiled into a table -> segment -> Route trie, plus
+    a LRU cache of resolved Resource chains keyed by (path, IDL seqno).
+    '''
+    def __init__(self, schema, cache_size=URI_CACHE_SIZE):
+        self.routes = {}
+        self.cache = collections.OrderedDict()
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._compile(schema)
+
+    def _compile(self, schema):
+        ovs_tables = schema.ovs_tables
+
+        for table_name, table in ovs_tables.iteritems():
+            routes = {}
+
+            # forward referenced children take precedence
+            for column in table.children:
+                if column not in table.columns or \
+                        column not in table.references:
+                    continue
+
+                reference = table.references[column]
+                kv_key_type = None
+                if reference.kv_type:
+                    kv_key_type = reference.kv_key_type.name
+                routes[column] = Route(reference.ref_table,
+                                       OVSDB_SCHEMA_CHILD, column,
+                                       reference.n_max, reference.kv_type,
+                                       kv_key_type,
+                                       self._get_indexes(schema,
+                                                         reference.ref_table))
+
+            for plural_name, child_table in schema.plural_name_map.iteritems():
+                if plural_name in routes:
+                    continue
+
+                if child_table in table.children:
+                    relation = OVSDB_SCHEMA_BACK_REFERENCE
+                elif table_name == OVSDB_SCHEMA_SYSTEM_TABLE and \
+                        ovs_tables[child_table].parent is None:
+                    relation = OVSDB_SCHEMA_TOP_LEVEL
+                else:
+                    continue
+
+                routes[plural_name] = \
+                    Route(child_table, relation,
+                          indexes=self._get_indexes(schema, child_table))
+
+            self.routes[table_name] = routes
+
+    def _get_indexes(self, schema, table):
+        indexes = schema.ovs_tables[table].indexes
+        if indexes[0] == 'uuid':
+            return None
+        return indexes
+
+    def lookup(self, path, idl):
+        key = (path, idl.change_seqno)
+        resource = self.cache.get(key)
+        if resource is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # move to the most recently used end
+        del self.cache[key]
+        self.cache[key] = resource
+        return resource.copy()
+
+    def store(self, path, idl, resource):
+        self.cache[(path, idl.change_seqno)] = resource.copy()
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+
 def split_path(path):
     path = path.split('/')
     path = [urllib.unquote(i) for i in path if i != '']
@@ -32,6 +146,19 @@ def split_path(path):
 
 def parse_url_path(path, schema, idl, http_method='GET'):
 
+    router = get_router(schema)
+    resource = router.lookup(path, idl)
+    if resource is not None:
+        return resource
+
+    resource = _parse_url_path(path, schema, idl, http_method)
+    if resource is not None:
+        router.store(path, idl, resource)
+    return resource
+
+
+def _parse_url_path(path, schema, idl, http_method):
+
     if not path.startswith(REST_VERSION_PATH):
         app_log.debug("[parse_url_path]: path does not start with %s" %
                       REST_VERSION_PATH)
@@ -83,29 +210,25 @@ def parse(path, resource, schema, idl, http_method):
     if not path:
         return None
 
-    ovs_tables = schema.ovs_tables
-    table_names = ovs_tables.keys()
-    new_resource = None
+    route = get_router(schema).routes[resource.table].get(path[0])
+    if route is None:
+        app_log.debug('URI not allowed: relationship does not exist')
+        raise Exception
+
+    resource.relation = route.relation
+    new_resource = Resource(route.table, schema)
+    resource.next = new_resource
+    indexes = route.indexes
+    path = path[1:]
 
     # check if path[0] is a forward referenced child of resource.table
-    if path[0] in ovs_tables[resource.table].columns \
-            and path[0] in ovs_tables[resource.table].children:
+    if route.relation == OVSDB_SCHEMA_CHILD:
 
-        resource.relation = OVSDB_SCHEMA_CHILD
-        resource.column = path[0]
-        _max = schema.ovs_tables[resource.table].references[resource.column].n_max
-        app_log.debug("%s is a forward child in %s" % (path[0],
+        resource.column = route.column
+        _max = route.n_max
+        app_log.debug("%s is a forward child in %s" % (route.column,
                       resource.table))
 
-        child_table = ovs_tables[resource.table].references[resource.column].ref_table
-        new_resource = Resource(child_table, schema)
-        resource.next = new_resource
-
-        # index columns
-        indexes = ovs_tables[new_resource.table].indexes if \
-                ovs_tables[new_resource.table].indexes[0] != 'uuid' else None
-        path = path[1:]
-
         if not path and _max > 1:
             # done parsing uri
             return
@@ -147,8 +270,7 @@ def parse(path, resource, schema, idl, http_method):
 
             index = path[0]
             if isinstance(children, dict):
-                column = schema.ovs_tables[resource.table].references[resource.column]
-                key_type = column.kv_key_type.name
+                key_type = route.kv_key_type
                 if key_type  == 'integer':
                     index = int(index)
                 elif key_type == 'uuid':
@@ -167,32 +289,9 @@ def parse(path, resource, schema, idl, http_method):
                 raise Exception
 
     # top-level reference or back referenced child
-    elif path[0] in schema.plural_name_map:
-        # check if path[0] is a back referenced child of resource.table
-        path[0] = schema.plural_name_map[path[0]]
-        if path[0] in ovs_tables[resource.table].children:
-            resource.relation = OVSDB_SCHEMA_BACK_REFERENCE
-            new_resource = Resource(path[0], schema)
-            resource.next = new_resource
-            app_log.debug("%s is a backward child in %s"
-                          % (path[0], resource.table))
-
-        # or if path[0] is a top level table
-        elif resource.table == OVSDB_SCHEMA_SYSTEM_TABLE and \
-                ovs_tables[path[0]].parent is None:
-                    resource.relation = OVSDB_SCHEMA_TOP_LEVEL
-                    new_resource = Resource(path[0], schema)
-                    resource.next = new_resource
-                    app_log.debug("%s is a top level table" % (path[0]))
-
-        # do not proceed if relationship cannot be ascertained
-        if not resource.relation:
-            app_log.debug('URI not allowed: relationship does not exist')
-            raise Exception
-
-        indexes = ovs_tables[new_resource.table].indexes if \
-                ovs_tables[new_resource.table].indexes[0] != 'uuid' else None
-        path = path[1:]
+    else:
+        app_log.debug("%s is a %s table of %s" % (route.table,
+                      route.relation, resource.table))
 
         # done processing URI
         if not path:
@@ -209,10 +308,6 @@ def parse(path, resource, schema, idl, http_method):
             new_resource.index = index_list
             path = path[len(index_list):]
 
-    if not new_resource:
-        app_log.debug('URI not allowed: relationship does not exist')
-        raise Exception
-
     app_log.debug("table: %s, row: %s, column: %s, relation: %s"
                   % (resource.table, str(resource.row),
                       str(resource.column), str(resource.relation)))
@@ -25,12 +25,11 @@ import jsonpatch
 
 from jsonpointer import JsonPointerException
 from tornado.log import app_log
-from copy import deepcopy
 from tornado import gen
 
 
 @gen.coroutine
-def patch_resource(data, resource, schema, txn, idl, uri):
+def patch_resource(data, resource, schema, txn, idl, uri, merge=False):
 
     # Allow PATCH operation on System table
     if resource is None:
@@ -59,14 +58,32 @@ def patch_resource(data, resource, schema, txn, idl, uri):
 
     needs_update = False
 
-    # Create and verify patch
-    (patch, needs_update) = create_patch(data)
+    # Create and verify patch, and find out which columns it touches.
+    # columns is None when the patch can't be applied column by column
+    if merge:
+        (patch, needs_update) = create_merge_patch(data)
+        columns = get_merge_patch_columns(patch, resource_update)
+        removed_columns = get_merge_removed_columns(patch, resource_update)
+    else:
+        (patch, needs_update) = create_patch(data)
+        columns = get_patch_columns(patch, resource_update)
+        removed_columns = get_removed_columns(patch)
 
     # Get the JSON to patch
-    row_json = yield get_current_row(resource_update, uri, schema, idl)
+    if columns is None:
+        row_json = yield get_current_row(resource_update, uri, schema, idl)
+    else:
+        app_log.debug("PATCH limited to columns %s" % list(columns))
+        row_json = yield get_current_columns(resource_update, columns, uri,
+                                             schema, idl)
 
     # Now apply the patch to that JSON
-    patched_row_json = apply_patch(patch, row_json, resource_update, schema)
+    if merge:
+        patched_row_json = apply_merge_patch(patch, row_json,
+                                             resource_update, schema)
+    else:
+        patched_row_json = apply_patch(patch, row_json,
+                                       resource_update, schema)
 
     # If at least one PATCH operation changed the row,
     # since a valid patch can contain just a PATCH_OP_TEST,
@@ -74,12 +91,14 @@ def patch_resource(data, resource, schema, txn, idl, uri):
     if needs_update:
 
         # Validate and prepare final JSON to send to IDL
-        new_row_json = prepare_data(patch, patched_row_json, resource,
-                                    resource_update, schema, idl)
+        new_row_json = prepare_data(removed_columns, patched_row_json,
+                                    resource, resource_update, schema, idl,
+                                    columns)
 
         app_log.debug("New row -> %s" % new_row_json)
 
-        # Update resource with the patched JSON
+        # Update resource with the patched JSON, only the
+        # columns present in it are written to the row
         # System: resource.next is None
         # All other rows: resource.relation is not None
         if resource.next is None or resource.relation is not None:
@@ -166,6 +185,124 @@ def create_patch(data):
     return (patch, modified)
 
 
+def create_merge_patch(data):
+    '''
+    Verifies a JSON Merge Patch (RFC 7396). The patch has to be an
+    object whose members are the resource's attributes, a null value
+    removes the attribute.
+    '''
+    if not isinstance(data, dict):
+        raise DataValidationFailed("Malformed JSON merge patch")
+
+    app_log.debug("PATCH Created merge patch %s" % data)
+
+    modified = bool(data)
+    if modified:
+        app_log.debug("PATCH will modify row")
+
+    return (data, modified)
+
+
+def get_patchable_columns(resource_update):
+    '''
+    Returns the names of the configuration and configuration
+    reference columns of the resource that a PATCH can modify
+    '''
+    columns = set(resource_update.keys[OVSDB_SCHEMA_CONFIG].keys())
+
+    references = resource_update.keys[OVSDB_SCHEMA_REFERENCE]
+    for key, reference in references.iteritems():
+        if reference.category == OVSDB_SCHEMA_CONFIG and \
+                reference.relation != OVSDB_SCHEMA_PARENT:
+            columns.add(key)
+
+    return columns
+
+
+def get_path_column(path):
+    '''
+    Returns the column a JSON pointer such as "/a/b/c" starts
+    with, "a" in this case, or None for the whole document
+    '''
+    tokens = path.split("/")
+    if len(tokens) < 2 or tokens[0] or not tokens[1]:
+        return None
+
+    return tokens[1].replace("~1", "/").replace("~0", "~")
+
+
+def get_patch_columns(patch, resource_update):
+    '''
+    Returns the set of columns modified or tested by the patch if
+    every operation is confined to a single column, the patch can
+    then be applied to just those columns instead of the whole row.
+    None is returned when the whole row is needed, i.e. for move
+    and copy operations, which may cross columns, or for paths
+    that don't start with a column the resource can modify.
+    '''
+    patchable_columns = get_patchable_columns(resource_update)
+
+    columns = set()
+    for patch_op in patch.patch:
+        if patch_op[PATCH_KEY_OP] in (PATCH_OP_MOVE, PATCH_OP_COPY):
+            return None
+
+        column = get_path_column(patch_op[PATCH_KEY_PATH])
+        if column is None or column not in patchable_columns:
+            return None
+
+        columns.add(column)
+
+    return columns
+
+
+def get_merge_patch_columns(patch, resource_update):
+    '''
+    Returns the set of columns modified by a JSON Merge Patch, or None
+    if a member isn't a column the resource can modify, in which case
+    the whole row is patched and verified as for other patches
+    '''
+    patchable_columns = get_patchable_columns(resource_update)
+
+    columns = set(patch.keys())
+    if not columns.issubset(patchable_columns):
+        return None
+
+    return columns
+
+
+def get_merge_removed_columns(patch, resource_update):
+    '''
+    Returns the columns the null members of a JSON Merge Patch clear,
+    null members that aren't columns the resource can modify having
+    nothing to clear
+    '''
+    patchable_columns = get_patchable_columns(resource_update)
+
+    return [column for column, value in patch.iteritems()
+            if value is None and column in patchable_columns]
+
+
+def get_removed_columns(patch):
+    '''
+    Returns the columns that the remove and move operations of
+    the patch may take out of the row's JSON representation
+    '''
+    removed_columns = []
+    for patch_op in patch.patch:
+
+        # Paths are validated previously when creating the patch,
+        # so it's guaranteed that the resource's target column is
+        # the first element in a path like "/a/b/c", in this case "a"
+
+        if patch_op[PATCH_KEY_OP] == PATCH_OP_REMOVE:
+            removed_columns.append(patch_op[PATCH_KEY_PATH].split("/")[1])
+        elif patch_op[PATCH_KEY_OP] == PATCH_OP_MOVE:
+            removed_columns.append(patch_op[PATCH_KEY_FROM].split("/")[1])
+
+    return removed_columns
+
+
 @gen.coroutine
 def get_current_row(resource_update, uri, schema, idl):
 
@@ -182,6 +319,36 @@ def get_current_row(resource_update, uri, schema, idl):
     raise gen.Return(row_json)
 
 
+@gen.coroutine
+def get_current_columns(resource_update, columns, uri, schema, idl):
+
+    # Get a JSON representation of just the given columns of the row,
+    # the same way get_current_row represents them
+    uri = get._get_uri(resource_update, schema, uri)
+    db_row = idl.tables[resource_update.table].rows[resource_update.row]
+
+    config_keys = resource_update.keys[OVSDB_SCHEMA_CONFIG]
+    row_json = {}
+    for column in columns:
+        if column in config_keys:
+            row_json[column] = \
+                utils.row_ovs_column_to_json(db_row, config_keys[column])
+            continue
+
+        column_json = yield get.get_column_json(column, resource_update.row,
+                                                resource_update.table,
+                                                schema, idl,
+                                                uri + '/' + column,
+                                                OVSDB_SCHEMA_CONFIG, 0, 1)
+        # Empty references are not part of the row's representation
+        if column_json:
+            row_json[column] = column_json
+
+    app_log.debug("Pre-patch columns_json -> %s" % row_json)
+
+    raise gen.Return(row_json)
+
+
 def apply_patch(patch, row_json, resource_update=None, schema=None):
 
     try:
@@ -196,6 +363,21 @@ def apply_patch(patch, row_json, resource_update=None, schema=None):
         app_log.debug(e)
         raise PatchOperationFailed("Invalid path within PATCH.")
 
+    return post_process_patched_row(patched_row_json, resource_update,
+                                    schema)
+
+
+def apply_merge_patch(patch, row_json, resource_update=None, schema=None):
+
+    patched_row_json = merge_patch(row_json, patch)
+
+    return post_process_patched_row(patched_row_json, resource_update,
+                                    schema)
+
+
+def post_process_patched_row(patched_row_json, resource_update=None,
+                             schema=None):
+
     if resource_update is not None and schema is not None:
         app_log.debug("Post-patch pre-hack row_json -> %s" % patched_row_json)
         # TODO remove this ugly hack after fix in GET behavior is merged
@@ -208,29 +390,56 @@ def apply_patch(patch, row_json, resource_update=None, schema=None):
     return patched_row_json
 
 
-def prepare_data(patch, patched_row_json, resource,
-                 resource_update, schema, idl):
+def merge_patch(target, patch):
+    '''
+    MergePatch algorithm of RFC 7396
+    '''
+    if not isinstance(patch, dict):
+        return patch
+
+    if isinstance(target, dict):
+        target = dict(target)
+    else:
+        target = {}
+
+    for key, value in patch.iteritems():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = merge_patch(target.get(key), value)
+
+    return target
+
 
-    # Verify final transaction data
-    verified_data = verify.verify_data(patched_row_json, resource, schema,
-                                       idl, REQUEST_TYPE_PATCH)
+def prepare_data(removed_columns, patched_row_json, resource,
+                 resource_update, schema, idl, columns=None):
+
+    # Verify final transaction data, only the patched
+    # columns if the patch was applied column by column
+    if columns is None:
+        verified_data = verify.verify_data(patched_row_json, resource,
+                                           schema, idl, REQUEST_TYPE_PATCH)
+    else:
+        verified_data = verify.verify_patch_data(patched_row_json, resource,
+                                                 schema, idl, columns)
 
     app_log.debug("Verified data pre- move/remove fix-> %s" % verified_data)
 
     # Removed columns need to be filled with
     # "empty" values before sending to IDL
-    verified_data = refill_removed_columns(patch, verified_data,
+    verified_data = refill_removed_columns(removed_columns, verified_data,
                                            resource_update, schema)
 
     return verified_data
 
 
-def refill_removed_columns(patch, data, resource, schema):
+def refill_removed_columns(removed_columns, data, resource, schema):
     '''
     For PATCH_OP_REMOVE and PATCH_OP_MOVE operations,
-    applying the patch actually removes keys from the
-    JSON that gets sent to IDL, which accomplishes
-    nothing when removing/moving an entire column.
+    and null members of a merge patch, applying the
+    patch actually removes keys from the JSON that
+    gets sent to IDL, which accomplishes nothing when
+    removing/moving an entire column.
     In order to clear a column's value, it is needed
     to write an empty list or dict in the column and
     send this to IDL. For IDL, an optional column is
@@ -243,57 +452,31 @@ def refill_removed_columns(patch, data, resource, schema):
     empty list/dict is not an accepted value.
     '''
 
-    patch_list = patch.patch
-
-    config_keys = deepcopy(schema.ovs_tables[resource.table].config)
+    config_keys = schema.ovs_tables[resource.table].config
     references = schema.ovs_tables[resource.table].references
-    for key in references:
-        if references[key].category == OVSDB_SCHEMA_CONFIG:
-            config_keys.update({key: references[key]})
-
-    patch_fix_list = []
-    for patch_op in patch_list:
-
-        if patch_op[PATCH_KEY_OP] in (PATCH_OP_REMOVE, PATCH_OP_MOVE):
 
-            # Paths are validated previously when creating the patch,
-            # so it's guaranteed that the resource's target column is
-            # the first element in a path like "/a/b/c", in this case "a"
+    for column in removed_columns:
 
-            if patch_op[PATCH_KEY_OP] == PATCH_OP_REMOVE:
-                column = patch_op[PATCH_KEY_PATH].split("/")[1]
-            else:
-                column = patch_op[PATCH_KEY_FROM].split("/")[1]
+        # If the column was removed entirely, it is no
+        # longer in the data, so it's added back with
+        # the default value.
+        if column in data:
+            continue
 
-            # Set the "default" value
-            default_value = []
-            if config_keys[column].is_dict:
-                default_value = {}
+        if column in config_keys:
+            column_keys = config_keys[column]
+        else:
+            column_keys = references[column]
 
-            # If the PATCH_OP_MOVE or PATCH_OP_REMOVE
-            # operation was performed on an entire column,
-            # this column is no longer in the data, so it's
-            # added back with the default value.
-            if column not in data:
+        # Set the "default" value
+        default_value = []
+        if column_keys.is_dict:
+            default_value = {}
 
-                # Create and append PATCH_OP_ADD
-                add_op = {}
-                add_op[PATCH_KEY_OP] = PATCH_OP_ADD
-                add_op[PATCH_KEY_PATH] = "/%s" % column
-                add_op[PATCH_KEY_VALUE] = default_value
-                patch_fix_list.append(add_op)
+        app_log.debug("Refill empty column %s" % column)
+        data[column] = default_value
 
-    try:
-        patch_fix = jsonpatch.JsonPatch(patch_fix_list)
-    except:
-        raise DataValidationFailed("Malformed final JSON patch")
-
-    # If there's at least one operation, apply the patch
-    if patch_fix:
-        app_log.debug("Refill empty columns patch %s" % patch_fix.to_string())
-        return patch_fix.apply(data, in_place=True)
-    else:
-        return data
+    return data
 
 
 def remove_empty_optional_columns(schema, resource_update, data):
@@ -0,0 +1,233 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+'''
+    Cached resolution of reference URIs and declarative config indexes.
+
+    Request payloads commonly carry hundreds of references that share the
+    same collection prefix (e.g. /rest/v1/system/vlans/). Instead of walking
+    the whole URI for each of them, the resolver caches what a prefix
+    resolves to and looks up the trailing index in the IDL index maps.
+    Cached entries are only valid for the IDL change sequence number they
+    were computed with.
+'''
+
+import weakref
+
+import ops.utils
+from opsrest import parse
+from opsrest.resource import Resource
+from opsrest.utils import utils
+from opsrest.constants import *
+
+# Upper bound on cached entries, the cache is dropped when exceeded
+MAX_CACHE_ENTRIES = 4096
+
+_resolvers = weakref.WeakKeyDictionary()
+
+
+def get_resolver(schema, idl):
+    '''
+    Returns the resolver shared by all users of the given idl
+    '''
+    resolver = _resolvers.get(idl)
+    if resolver is None or resolver.schema is not schema:
+        resolver = UriResolver(schema)
+        _resolvers[idl] = resolver
+    return resolver
+
+
+class CollectionPrefix(object):
+    '''
+    What a URI prefix ending in a collection resolves to: the parent
+    resource and the table the trailing index belongs to.
+    '''
+    def __init__(self, relation, parent_table, parent_row, table,
+                 parent_column=None):
+        self.relation = relation
+        self.parent_table = parent_table
+        self.parent_row = parent_row
+        self.table = table
+        # reference column of a back referenced child pointing to the parent
+        self.parent_column = parent_column
+
+
+class UriResolver(object):
+    def __init__(self, schema):
+        self.schema = schema
+        self.seqno = None
+        self.prefixes = {}
+        self.indexes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _check_seqno(self, idl):
+        if self.seqno != idl.change_seqno:
+            self.prefixes.clear()
+            self.indexes.clear()
+            self.seqno = idl.change_seqno
+
+    def _store(self, cache, key, value):
+        if len(cache) >= MAX_CACHE_ENTRIES:
+            cache.clear()
+        cache[key] = value
+
+    def resolve(self, uri, idl):
+        '''
+        Returns the last Resource the uri resolves to or None if
+        the uri is not valid
+        '''
+        self._check_seqno(idl)
+
+        if not uri.startswith(REST_VERSION_PATH):
+            return None
+
+        segments = parse.split_path(uri[len(REST_VERSION_PATH):])
+
+        for arity in range(1, len(segments)):
+            prefix = self.prefixes.get(tuple(segments[:-arity]))
+            if prefix is None:
+                continue
+
+            table_schema = self.schema.ovs_tables[prefix.table]
+            if len(table_schema.indexes) != arity:
+                continue
+
+            index_values = segments[-arity:]
+            row = self.lookup(prefix, index_values, idl)
+            if row is None:
+                return None
+
+            self.hits += 1
+            return Resource(prefix.table, self.schema, row=row.uuid,
+                            index=index_values)
+
+        self.misses += 1
+        resource = parse.parse_url_path(uri, self.schema, idl)
+        if resource is None:
+            return None
+
+        parent = None
+        while resource.next is not None:
+            parent = resource
+            resource = resource.next
+
+        if parent is not None and resource.row is not None:
+            self._add_prefix(segments, parent, resource)
+
+        return resource
+
+    def resolve_row(self, uri, idl):
+        '''
+        Returns the ovs.db.idl.Row the uri resolves to
+        '''
+        resource = self.resolve(uri, idl)
+        if resource is None:
+            return None
+        return utils.get_row_from_resource(resource, idl)
+
+    def _add_prefix(self, segments, parent, resource):
+        # only resources identified by their index columns are cached,
+        # lists and key/value children depend on the parent's column data
+        if not isinstance(resource.index, list):
+            return
+
+        if parent.relation == OVSDB_SCHEMA_CHILD:
+            reference = self.schema.ovs_tables[parent.table].references[
+                parent.column]
+            if reference.kv_type or reference.n_max == 1:
+                return
+
+        elif parent.relation not in (OVSDB_SCHEMA_TOP_LEVEL,
+                                     OVSDB_SCHEMA_BACK_REFERENCE):
+            return
+
+        parent_column = None
+        if parent.relation == OVSDB_SCHEMA_BACK_REFERENCE:
+            references = self.schema.ovs_tables[resource.table].references
+            for name, reference in references.iteritems():
+                if (reference.relation == OVSDB_SCHEMA_PARENT and
+                        reference.ref_table == parent.table):
+                    parent_column = name
+                    break
+
+        key = tuple(segments[:-len(resource.index)])
+        self._store(self.prefixes, key,
+                    CollectionPrefix(parent.relation, parent.table,
+                                     parent.row, resource.table,
+                                     parent_column))
+
+    def lookup(self, prefix, index_values, idl):
+        '''
+        Returns the row of prefix.table identified by index_values
+        '''
+        dbtable = idl.tables[prefix.table]
+        table_schema = self.schema.ovs_tables[prefix.table]
+
+        values = dict(zip(table_schema.indexes, index_values))
+        if prefix.parent_column is not None:
+            values[prefix.parent_column] = str(prefix.parent_row)
+
+        row = None
+        index_map = getattr(dbtable, 'index_map', None)
+        if index_map is not None and dbtable.indexes:
+            key = []
+            for column in dbtable.indexes[0]:
+                if column.name not in values:
+                    break
+                key.append(values[column.name])
+            else:
+                row = index_map.get(tuple(key))
+
+        if row is None or not self._row_matches(row, table_schema.indexes,
+                                                index_values):
+            # index map is not usable for this table, scan it
+            row = utils.index_to_row(index_values, table_schema, dbtable)
+
+        if row is None:
+            return None
+
+        if prefix.parent_column is not None:
+            parent = row.__getattr__(prefix.parent_column)
+            if parent.uuid != prefix.parent_row:
+                return None
+
+        return row
+
+    def _row_matches(self, row, indexes, index_values):
+        for index, value in zip(indexes, index_values):
+            if str(row.__getattr__(index)) != value:
+                return False
+        return True
+
+    def index_to_row(self, index, table, idl):
+        '''
+        Cached ops.utils.index_to_row used by the declarative config
+        writer. Only rows found in the database are cached.
+        '''
+        self._check_seqno(idl)
+
+        key = (table, index)
+        row = self.indexes.get(key)
+        if row is not None and idl.tables[table].rows.get(row.uuid) is not row:
+            # Deleted, and maybe re-created, by the transaction in
+            # progress, the change seqno only changes once committed
+            del self.indexes[key]
+            row = None
+
+        if row is None:
+            row = ops.utils.index_to_row(index, self.schema, table, idl)
+            if row is not None:
+                self._store(self.indexes, key, row)
+        return row
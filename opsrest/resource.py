@@ -25,6 +25,9 @@ from constants import *
 
 
 class Resource(object):
+    __slots__ = ('table', 'row', 'column', 'keys', 'index', 'relation',
+                 'next')
+
     def __init__(self, table, schema=None, row=None, column=None,
                  index=None, relation=None):
         # these attriutes uniquely identify an entry in OVSDB table
@@ -49,6 +52,25 @@ class Resource(object):
         self.keys[OVSDB_SCHEMA_STATS] = table.stats
         self.keys[OVSDB_SCHEMA_REFERENCE] = table.references
 
+    def copy(self):
+        '''
+        Returns a copy of the Resource chain starting at this resource.
+        The category keys are shared with the original resource.
+        '''
+        resource = Resource.__new__(Resource)
+        resource.table = self.table
+        resource.row = self.row
+        resource.column = self.column
+        resource.keys = dict(self.keys)
+        resource.index = self.index
+        if isinstance(self.index, list):
+            resource.index = list(self.index)
+        resource.relation = self.relation
+        resource.next = None
+        if self.next is not None:
+            resource.next = self.next.copy()
+        return resource
+
     def get_allowed_methods(self, schema):
         # TODO: Process schema to determine allowed methods
         return [REQUEST_TYPE_DELETE, REQUEST_TYPE_READ,
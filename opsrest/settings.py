@@ -38,6 +38,41 @@ settings['ext_schema'] = '/usr/share/openvswitch/openswitch.opsschema'
 settings['auth_enabled'] = True
 settings['cfg_db_schema'] = '/usr/share/openvswitch/configdb.ovsschema'
 
+# Notification websockets and streams: bytes written but not sent yet
+# to the client before notifications are queued, queued updates before
+# the overflow policy applies, and the policy: merge, resync or
+# disconnect
+settings['ws_max_bytes_in_flight'] = 256 * 1024
+settings['ws_max_queued_updates'] = 1000
+settings['ws_overflow_policy'] = 'merge'
+
+# permessage-deflate of notification websockets, if the client asks for
+# it: zlib compression level (1-9) and memory level (1-9), the memory
+# kept per connection growing with the memory level
+settings['ws_compression'] = True
+settings['ws_compression_level'] = 6
+settings['ws_compression_mem_level'] = 5
+
+# Seconds the subscriber of a closed resumable notification websocket,
+# or of a closed notification stream, is kept, during which the client
+# can reconnect and resume, and the number of updates kept per table to
+# replay the notifications missed
+settings['ws_resume_grace_period'] = 30
+settings['notification_replay_size'] = 1000
+
+# Seconds between the comments sent on idle notification streams, so
+# that proxies don't close them
+settings['sse_keepalive_interval'] = 15
+
+# Rows of a collection per notification of the initial values of a
+# subscription, 0 for a single notification
+settings['notification_initial_chunk_size'] = 500
+
+# Seconds a GET with the wait argument waits for the resource to change
+# when no timeout is given, and at most
+settings['long_poll_default_timeout'] = 30
+settings['long_poll_max_timeout'] = 300
+
 settings["account_schema"] = os.path.join(os.path.dirname(custom.__file__),
                                           'schemas/Account.json')
 settings["passwd_srv_yaml"] = '/etc/ops-passwd-srv/ops-passwd-srv.yaml'
@@ -25,7 +25,9 @@ class OvsdbTransactionList:
         self.txn_list.append(txn)
 
 
-class OvsdbTransaction:
+class OvsdbTransaction(object):
+    __slots__ = ('status', 'txn', 'event')
+
     def __init__(self, idl):
         self.status = None
         self.txn = ovs.db.idl.Transaction(idl)
@@ -18,6 +18,7 @@ from opsrest.handlers.logout import LogoutHandler
 from opsrest.handlers.ovsdbapi import OVSDBAPIHandler
 from opsrest.handlers.customrest import CustomRESTHandler
 from opsrest.handlers.websocket.notifications import WSNotificationsHandler
+from opsrest.handlers.notifications import SSENotificationsHandler
 from custom.logcontroller import LogController
 from custom.accountcontroller import AccountController
 from custom.configcontroller import ConfigController
@@ -30,6 +31,7 @@ url_patterns =\
      (r'/rest/v1/login', LoginHandler),
      (r'/rest/v1/logout', LogoutHandler),
      (r'/rest/v1/ws/notifications', WSNotificationsHandler),
+     (r'/rest/v1/notifications/stream', SSENotificationsHandler),
      (r'/rest/v1/system', OVSDBAPIHandler),
      (r'/rest/v1/system/.*', OVSDBAPIHandler)]
 
@@ -39,7 +41,9 @@ custom_url_patterns =\
      # TODO new handler for account API to replace /account above
      (r'/rest/v1/account', CustomRESTHandler, AccountController),
      (r'/rest/v1/system/full-configuration', CustomRESTHandler,
-      ConfigController)]
+      ConfigController),
+     (r'/rest/v1/system/full-configuration/(?P<resource_id>status)',
+      CustomRESTHandler, ConfigController)]
 
 static_url_patterns =\
     [(r"/api/(.*)", StaticContentHandler,
@@ -0,0 +1,92 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from tornado import gen
+from tornado.log import app_log
+
+import ops.cfgd
+from opsrest.constants import INCOMPLETE, ERROR
+from opsrest.exceptions import InternalError
+
+
+def get_idl(manager):
+    if manager.idl is None or not manager.connected:
+        raise InternalError("Configuration database is not available")
+    return manager.idl
+
+
+def read(manager, version=None):
+    """
+    Returns the startup configuration from the replica of the
+    configuration database kept by manager, None if there is none.
+    A previous version is rebuilt from the history if given. The
+    replica is in memory, so nothing is waited for.
+    """
+    if version is not None:
+        return ops.cfgd.read_version(get_idl(manager), version)
+
+    config = ops.cfgd.get_startup_config(get_idl(manager))
+    if config:
+        return ops.cfgd.decode_config(config)
+
+    return None
+
+
+def read_stream(manager):
+    """
+    Same as read, but returns a generator over the stored JSON
+    document instead of the parsed configuration
+    """
+    config = ops.cfgd.get_startup_config(get_idl(manager))
+    if config:
+        return ops.cfgd.iter_config(config)
+
+    return None
+
+
+def get_fingerprint(manager):
+    """
+    Returns the hash tree of the startup configuration, None if there
+    is none
+    """
+    return ops.cfgd.get_fingerprint(get_idl(manager))
+
+
+@gen.coroutine
+def write(manager, data):
+    """
+    Stores the startup configuration through manager's connection,
+    waiting for the transaction to complete without blocking the
+    IOLoop. Returns the transaction's status and error.
+    """
+    idl = get_idl(manager)
+    txn = manager.get_new_transaction()
+    error = None
+    try:
+        ops.cfgd.set_startup_config(idl, txn.txn, data)
+        status = txn.commit()
+        if status == INCOMPLETE:
+            manager.monitor_transaction(txn)
+            yield txn.event.wait()
+            status = txn.status
+
+        app_log.debug('Startup configuration transaction result: %s',
+                      status)
+        if status == ERROR:
+            error = txn.get_error()
+    except Exception:
+        txn.abort()
+        raise
+
+    raise gen.Return((status, error))
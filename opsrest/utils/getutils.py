@@ -181,6 +181,12 @@ def validate_non_plural_query_args(query_arguments):
     if REST_QUERY_PARAM_DEPTH in query_arguments:
         valid_keys_count += 1
 
+    if REST_QUERY_PARAM_WAIT in query_arguments:
+        valid_keys_count += 1
+
+    if REST_QUERY_PARAM_TIMEOUT in query_arguments:
+        valid_keys_count += 1
+
     invalid_keys_count = len(query_arguments) - valid_keys_count
 
     if invalid_keys_count > 0:
@@ -271,7 +277,8 @@ def get_filters_args(query_arguments, schema, resource=None):
             # NOTE any new query keys should be added to this condition
             if key in (REST_QUERY_PARAM_LIMIT, REST_QUERY_PARAM_OFFSET,
                        REST_QUERY_PARAM_DEPTH, REST_QUERY_PARAM_SORTING,
-                       REST_QUERY_PARAM_SELECTOR, REST_QUERY_PARAM_KEYS):
+                       REST_QUERY_PARAM_SELECTOR, REST_QUERY_PARAM_KEYS,
+                       REST_QUERY_PARAM_WAIT, REST_QUERY_PARAM_TIMEOUT):
                 continue
             elif key in valid_keys:
                 filters[key] = []
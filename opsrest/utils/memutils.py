@@ -0,0 +1,126 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+import sys
+import types
+
+import ovs.db.idl
+
+from opsrest import parse
+from opsrest import resolver
+from opsrest.utils import utils
+
+
+def get_deep_size(obj, seen=None):
+    """
+    Approximate number of bytes used by obj and everything it refers to.
+    Objects already accounted for in seen are skipped, IDL rows are only
+    counted as references since they belong to the IDL.
+    """
+    if seen is None:
+        seen = set()
+
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, (ovs.db.idl.Row, types.ModuleType, types.FunctionType,
+                        types.MethodType, type)):
+        return size
+
+    if isinstance(obj, dict):
+        for key, value in obj.iteritems():
+            size += get_deep_size(key, seen)
+            size += get_deep_size(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += get_deep_size(item, seen)
+    else:
+        if hasattr(obj, '__dict__'):
+            size += get_deep_size(obj.__dict__, seen)
+
+        for cls in type(obj).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name != '__weakref__' and hasattr(obj, name):
+                    size += get_deep_size(getattr(obj, name), seen)
+
+    return size
+
+
+def get_schema_footprint(schema, seen=None):
+    columns = 0
+    for table in schema.ovs_tables.itervalues():
+        columns += len(table.config) + len(table.status) + \
+            len(table.stats) + len(table.references)
+
+    return (get_deep_size(schema, seen), len(schema.ovs_tables), columns)
+
+
+def get_index_footprint(idl):
+    size = 0
+    entries = 0
+    for table in idl.tables.itervalues():
+        index_map = getattr(table, 'index_map', None)
+        if index_map is None:
+            continue
+        entries += len(index_map)
+        size += get_deep_size(index_map)
+
+    return (size, entries)
+
+
+def get_memory_report(schema, idl):
+    """
+    Returns a text report of the memory used by the schema, the IDL
+    index maps and the caches built on top of them.
+    """
+    buff = "Memory usage:\n"
+
+    # Caches refer to schema objects which were already accounted for
+    schema_seen = set()
+    size, tables, columns = get_schema_footprint(schema, schema_seen)
+    buff += "  Schema: %d bytes (%d tables, %d columns)\n" % \
+        (size, tables, columns)
+
+    if idl is not None:
+        size, entries = get_index_footprint(idl)
+        buff += "  Index maps: %d bytes (%d entries)\n" % (size, entries)
+
+    router = parse.get_router(schema)
+    buff += "  URI route cache: %d bytes (%d entries, %d hits, " \
+        "%d misses)\n" % (get_deep_size(router.cache, set(schema_seen)),
+                          len(router.cache),
+                          router.hits, router.misses)
+
+    if idl is not None:
+        uri_resolver = resolver.get_resolver(schema, idl)
+        entries = len(uri_resolver.prefixes) + len(uri_resolver.indexes)
+        seen = set(schema_seen)
+        size = get_deep_size(uri_resolver.prefixes, seen) + \
+            get_deep_size(uri_resolver.indexes, seen)
+        buff += "  URI resolver cache: %d bytes (%d entries, %d hits, " \
+            "%d misses)\n" % (size, entries, uri_resolver.hits,
+                              uri_resolver.misses)
+
+    seen = set(schema_seen)
+    views = 0
+    size = 0
+    for table_views in utils._category_views.values():
+        views += len(table_views.views)
+        size += get_deep_size(table_views.views, seen)
+    buff += "  Category views: %d bytes (%d views)\n" % (size, views)
+
+    return buff
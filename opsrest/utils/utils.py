@@ -19,6 +19,8 @@ import types
 import uuid
 import re
 import urllib
+import copy
+import weakref
 
 from opsrest.resource import Resource
 from opsrest.constants import *
@@ -834,9 +836,9 @@ def exec_validators_with_resource(idl, schema, resource, http_method):
             children = [children]
         elif isinstance(children, dict):
             children = children.values()
-        for row in children:
-            validator.exec_validators(idl, schema, table_name, row, http_method,
-                                      p_table_name, p_row)
+        rows = [(row, p_table_name, p_row) for row in children]
+        validator.exec_validators_batch(idl, schema, table_name, http_method,
+                                        rows)
 
     elif child_resource.row is None and resource.relation == OVSDB_SCHEMA_BACK_REFERENCE:
         p_row = idl.tables[p_table_name].rows[resource.row]
@@ -848,10 +850,11 @@ def exec_validators_with_resource(idl, schema, resource, http_method):
                 refcol = key
                 break
 
-        for row in idl.tables[child_resource.table].rows.itervalues():
-            if row.__getattr__(refcol) == p_row:
-                validator.exec_validators(idl, schema, table_name, row,
-                                          http_method, p_table_name, p_row)
+        rows = [(row, p_table_name, p_row)
+                for row in idl.tables[child_resource.table].rows.itervalues()
+                if row.__getattr__(refcol) == p_row]
+        validator.exec_validators_batch(idl, schema, table_name, http_method,
+                                        rows)
     else:
         row = idl.tables[table_name].rows[child_resource.row]
         validator.exec_validators(idl, schema, table_name, row, http_method,
@@ -870,9 +873,140 @@ def redirect_http_to_https(current_instance):
     return False
 
 
+class CategoryViews(object):
+    """
+    Per-table cache of category keys for tables with dynamic columns.
+
+    The schema's config/status/stats/references dictionaries are the base
+    categorization and are never modified. For each combination of
+    categories resolved for the dynamic columns, an overlay of those
+    dictionaries is built once, with copies of the dynamic columns
+    carrying their resolved category, and shared by every row that
+    resolves to the same combination. Views must be treated as read-only.
+    """
+    def __init__(self, ovs_table):
+        self.ovs_table = ovs_table
+        self.dynamic_columns = ovs_table.dynamic.items()
+        self.views = {}
+        # (column name, category) -> column copy with that category
+        self.columns = {}
+
+        # Store the column used to get the category value
+        self.source_columns = []
+        for column_name, category_obj in self.dynamic_columns:
+            if category_obj.follows is not None:
+                source_column = category_obj.follows
+            else:
+                source_column = column_name
+            self.source_columns.append(source_column)
+
+        columns = {}
+        columns.update(ovs_table.config)
+        columns.update(ovs_table.status)
+        columns.update(ovs_table.stats)
+        self.all_columns = columns
+
+        self.base_keys = {OVSDB_SCHEMA_CONFIG: ovs_table.config,
+                          OVSDB_SCHEMA_STATUS: ovs_table.status,
+                          OVSDB_SCHEMA_STATS: ovs_table.stats,
+                          OVSDB_SCHEMA_REFERENCE: ovs_table.references}
+
+    def get_keys(self, row, keys=None):
+        """
+        Returns the category keys for a ovs.db.idl.Row or a dict
+        containing new data. Keys other than the table's base
+        categorization are recategorized without being cached.
+        """
+        categories = self.get_categories(row)
+        if keys is not None and not self._is_base(keys):
+            return self._build_view(categories, keys)
+
+        view = self.views.get(categories)
+        if view is None:
+            view = self._build_view(categories, self.base_keys)
+            self.views[categories] = view
+        return view
+
+    def get_categories(self, row):
+        categories = []
+        for (column_name, category_obj), source_column in \
+                zip(self.dynamic_columns, self.source_columns):
+            # Get column data from follows/per_value
+            if isinstance(row, ovs.db.idl.Row):
+                column_data = get_column_data_from_row(row, source_column)
+            elif source_column in row:
+                column_data = row[source_column]
+            else:
+                app_log.debug("per-value column '%s' is not present"
+                              % source_column)
+                raise Exception("Attribute '%s' is required "
+                                "by attribute '%s'."
+                                % (source_column, column_name))
+
+            # Get new category for that value using per-value data
+            per_value = self.all_columns[source_column].category.per_value
+            categories.append(per_value[column_data])
+
+        return tuple(categories)
+
+    def _is_base(self, keys):
+        for category, columns in self.base_keys.iteritems():
+            if keys.get(category) is not columns:
+                return False
+        return True
+
+    def _build_view(self, categories, keys):
+        view = {}
+        for category in self.base_keys:
+            view[category] = dict(keys.get(category, {}))
+
+        for (column_name, category_obj), new_category in \
+                zip(self.dynamic_columns, categories):
+            if column_name in view[OVSDB_SCHEMA_REFERENCE]:
+                column = view[OVSDB_SCHEMA_REFERENCE][column_name]
+                view[OVSDB_SCHEMA_REFERENCE][column_name] = \
+                    self._get_column(column, new_category)
+                continue
+
+            for prev_category in (OVSDB_SCHEMA_CONFIG, OVSDB_SCHEMA_STATUS,
+                                  OVSDB_SCHEMA_STATS):
+                if prev_category != new_category and \
+                        column_name in view[prev_category]:
+                    column = view[prev_category].pop(column_name)
+                    view[new_category][column_name] = \
+                        self._get_column(column, new_category)
+
+        return view
+
+    def _get_column(self, column, category):
+        if column.category.value == category:
+            return column
+
+        key = (column.name, category)
+        if key not in self.columns:
+            new_column = copy.copy(column)
+            new_column.category = copy.copy(column.category)
+            new_column.category.value = category
+            self.columns[key] = new_column
+        return self.columns[key]
+
+
+_category_views = weakref.WeakKeyDictionary()
+
+
+def get_category_views(ovs_table):
+    views = _category_views.get(ovs_table)
+    if views is None:
+        views = CategoryViews(ovs_table)
+        _category_views[ovs_table] = views
+    return views
+
+
 def update_category_keys(keys, row, idl, schema, table):
     """
-    Update the keys categories for a given resource
+    Returns the keys categories for a given resource. The keys given
+    are not modified, the returned keys are shared and must not be
+    modified either.
     Parameters:
         -keys: dictionary of key columns
         (configuration,status,statistics, references)
@@ -898,63 +1032,7 @@ def update_category_keys(keys, row, idl, schema, table):
                       "have dynamic columns")
         return keys
 
-    # Get all columns
-    columns = {}
-    columns.update(keys[OVSDB_SCHEMA_CONFIG])
-    columns.update(keys[OVSDB_SCHEMA_STATUS])
-    columns.update(keys[OVSDB_SCHEMA_STATS])
-    references = keys[OVSDB_SCHEMA_REFERENCE]
-
-    dynamic_columns = ovs_table.dynamic
-    for column_name, category_obj in dynamic_columns.iteritems():
-        # Store the column used to get the category value
-        if category_obj.follows is not None:
-            source_column = category_obj.follows
-        elif category_obj.per_value is not None:
-            source_column = column_name
-
-        column_data = None
-        # Get column data from follows/per_value
-        if isinstance(row, ovs.db.idl.Row):
-            column_data = get_column_data_from_row(row, source_column)
-        elif isinstance(row, dict):
-            if source_column in row:
-                column_data = row[source_column]
-            else:
-                app_log.debug("per-value column '%s' is not present"
-                              % source_column)
-                raise Exception("Attribute '%s' is required "
-                                "by attribute '%s'."
-                                % (source_column, column_name))
-
-        # Set the new category
-        # Get new category for that value using per-value data
-        new_category = \
-            columns[source_column].category.per_value[column_data]
-
-        # Store old category
-        if column_name in references:
-            prev_category = references[column_name].category.value
-        else:
-            prev_category = columns[column_name].category.value
-
-        # Check if the category changed
-        if prev_category != new_category:
-            if column_name in columns:
-                orig_columns = keys[prev_category]
-                dest_columns = keys[new_category]
-                # Change the category
-                column = orig_columns[column_name]
-                column.category.value = new_category
-                dest_columns[column_name] = column
-                orig_columns.pop(column_name)
-
-            # If the column is at references change the category
-            if column_name in references:
-                reference = references[column_name]
-                reference.category.value = new_category
-
-    return keys
+    return get_category_views(ovs_table).get_keys(row, keys)
 
 
 def update_resource_keys(resource, schema, idl, data=None):
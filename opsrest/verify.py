@@ -12,7 +12,7 @@
 #  License for the specific language governing permissions and limitations
 #  under the License.
 
-from opsrest import parse
+from opsrest import resolver
 from opsrest.utils import utils
 from opsrest.constants import *
 from opsrest.exceptions import DataValidationFailed
@@ -226,7 +226,7 @@ def verify_put_data(data, resource, schema, idl):
     return verified_data
 
 
-def verify_patch_data(data, resource, schema, idl):
+def verify_patch_data(data, resource, schema, idl, columns=None):
 
     # We need to verify System table
     if resource.next is None:
@@ -240,7 +240,8 @@ def verify_patch_data(data, resource, schema, idl):
         verified_config_data = verify_config_data(resource_verify,
                                                   data,
                                                   schema,
-                                                  REQUEST_TYPE_PATCH)
+                                                  REQUEST_TYPE_PATCH,
+                                                  columns=columns)
 
         verified_data.update(verified_config_data)
 
@@ -257,7 +258,7 @@ def verify_patch_data(data, resource, schema, idl):
 
 
 def verify_config_data(resource, data, schema, request_type,
-                       row=None, get_all_errors=False):
+                       row=None, get_all_errors=False, columns=None):
 
     config_keys = resource.keys[OVSDB_SCHEMA_CONFIG]
     reference_keys = resource.keys[OVSDB_SCHEMA_REFERENCE]
@@ -279,16 +280,20 @@ def verify_config_data(resource, data, schema, request_type,
     non_mutable_attributes = get_non_mutable_attributes(resource,
                                                         schema)
 
-    # Check for all required/valid attributes to be present
+    # Check for all required/valid attributes to be present. When only
+    # some columns are being modified, the rest are left as they are.
     for column_name in config_keys:
+        if columns is not None and column_name not in columns:
+            continue
+
         is_optional = config_keys[column_name].is_optional
 
         if column_name in data:
             try:
-                verify_attribute_type(column_name, config_keys[column_name],
-                                      data[column_name])
-                verify_attribute_range(column_name, config_keys[column_name],
-                                       data[column_name])
+                validate = get_column_validator(schema, resource.table,
+                                                column_name,
+                                                config_keys[column_name])
+                validate(data[column_name])
             except DataValidationFailed as e:
                 if get_all_errors:
                     errors.append(e.detail)
@@ -337,255 +342,220 @@ def verify_config_data(resource, data, schema, request_type,
         return verified_config_data
 
 
-def verify_attribute_type(column_name, column_data, request_data):
-    data = request_data
-    data_type = type(data)
-    valid_types = column_data.type.python_types
+def get_column_validator(schema, table, column_name, column_data):
+    '''
+    Returns the validator compiled for a configuration column, compiling
+    it if it was not compiled when the schema was loaded
+    '''
+    validators = schema.validators.setdefault(table, {})
+    validator = validators.get(column_name)
+    if validator is None:
+        validator = compile_column_validator(column_name, column_data)
+        validators[column_name] = validator
+    return validator
 
-    # If column is a list, data must be a list
-    if column_data.is_list:
-        valid_types = [list]
 
+def compile_column_validator(column_name, column_data):
+    '''
+    Compiles the type, value and range checks of a configuration column
+    into a function that verifies the request data given for the column.
+    All the column metadata (types, enums, ranges and key/value types)
+    is looked up once here instead of for every request.
+    '''
+    string_types = ovs_types.StringType.python_types
+    boolean_types = ovs_types.BooleanType.python_types
+
+    python_types = column_data.type.python_types
+    is_list = column_data.is_list
+    is_dict = column_data.is_dict
+    n_min = column_data.n_min
+    n_max = column_data.n_max
+    range_min = column_data.rangeMin
+    range_max = column_data.rangeMax
+    check_keys = column_name not in OVSDB_COMMON_COLUMNS
+    kvs = column_data.kvs
+
+    # If column is a list, data must be a list
     # If column is a dictionary, data must be a dictionary
-    elif column_data.is_dict:
+    if is_list:
+        valid_types = [list]
+    elif is_dict:
         valid_types = [dict]
+        value_types = column_data.value_type.python_types
+        value_range_min = column_data.valueRangeMin
+        value_range_max = column_data.valueRangeMax
+    else:
+        valid_types = python_types
+
+    # Key/value information
+    valid_keys = set(kvs.keys())
+    optional_keys = set()
+    kvs_enums = []
+    kvs_ranges = {}
+    for key, value in kvs.iteritems():
+        if value['is_optional']:
+            optional_keys.add(key)
+        if value['enum']:
+            kvs_enums.append((key, set(value['enum'].as_list()),
+                              value['type']))
+        kvs_ranges[key] = (value['type'] == ovs_types.BooleanType,
+                           value['rangeMin'], value['rangeMax'],
+                           value['type'])
+
+    enum = None
+    if not kvs and column_data.enum:
+        enum = set(column_data.enum.as_list())
 
-    # If data is a list but column is not,
-    # we expect a single value in the list
-    elif data_type is list:
-        if len(data) == 1:
-            data = data[0]
-            data_type = type(data)
-
-    try:
-        if data_type in valid_types:
-
-            # Check each value's type for elements in lists and dictionaries
-            if column_data.n_max > 1:
-                verify_container_values_type(column_name, column_data,
-                                             request_data)
-
-            # Now check for invalid values
-            verify_valid_attribute_values(data, column_data,
-                                          column_name)
-        else:
-            error = "Attribute type mismatch for column %s" % column_name
-            raise DataValidationFailed(error)
-    except DataValidationFailed as e:
-        raise e
-
-
-def verify_container_values_type(column_name, column_data, request_data):
-
-    if column_data.is_list:
-        for value in request_data:
-            if type(value) not in column_data.type.python_types:
-                error = "Value type mismatch in column %s" % column_name
-                raise DataValidationFailed(error)
+    invalid_message = "Attribute value is invalid for column '%s'." % \
+        column_name
 
-    elif column_data.is_dict:
-        for key, value in request_data.iteritems():
-            # Check if request data has unknown keys for columns other than
-            # those in OVSDB_COMMON_COLUMNS (which should accept any keys).
-            # Note: common columns which do not require key validation should
-            # be added to OVSDB_COMMON_COLUMNS array.
-            if column_name not in OVSDB_COMMON_COLUMNS:
-                if column_data.kvs and key not in column_data.kvs:
-                    error = "Unknown key %s for column %s" % (key, column_name)
+    def verify_container_values_type(request_data):
+        if is_list:
+            for value in request_data:
+                if type(value) not in python_types:
+                    error = "Value type mismatch in column %s" % column_name
                     raise DataValidationFailed(error)
 
-            value_type = type(value)
-
-            # Values in dict must match JSON schema
-            if value_type in column_data.value_type.python_types:
-
-                # If they match, they might be strings that represent other
-                # types, so each value must be checked if kvs type exists
-
-                if value_type in ovs_types.StringType.python_types \
-                        and column_data.kvs and key in column_data.kvs:
-                    kvs_value_type = column_data.kvs[key]['type']
-                    converted_value = \
-                        convert_string_to_value_by_type(value, kvs_value_type)
-
-                    if converted_value is None:
-                        error = "Value type mismatch for key %s in column %s"\
-                                % (key, column_name)
-                        raise DataValidationFailed(error)
-            else:
-                error = "Value type mismatch for key %s in column %s"\
-                        % (key, column_name)
-                raise DataValidationFailed(error)
-
-
-def convert_string_to_value_by_type(value, type_):
-
-    converted_value = value
-
-    if type_ == ovs_types.IntegerType or \
-            type_ in ovs_types.IntegerType.python_types:
-        try:
-            converted_value = int(value)
-        except ValueError:
-            converted_value = None
-    elif type_ == ovs_types.RealType or \
-            type_ in ovs_types.RealType.python_types:
-        try:
-            converted_value = float(value)
-        except ValueError:
-            converted_value = None
-    elif type_ == ovs_types.BooleanType or \
-            type_ in ovs_types.BooleanType.python_types:
-        if not (value == 'true' or value == 'false'):
-            converted_value = None
-
-    return converted_value
-
-
-def verify_valid_attribute_values(request_data, column_data, column_name):
-
-    valid = True
-
-    error_details = ""
-    error_message = "Attribute value is invalid for column '%s'." % column_name
-
-    # If data has key-values dict defined, check for missing/invalid keys
-    # It's assumed type is validated, meaning kvs is defined for dicts only
-    if column_data.kvs:
+        elif is_dict:
+            for key, value in request_data.iteritems():
+                # Check if request data has unknown keys for columns other
+                # than those in OVSDB_COMMON_COLUMNS (which should accept
+                # any keys).
+                if check_keys and kvs and key not in kvs:
+                    error = "Unknown key %s for column %s" % (key,
+                                                              column_name)
+                    raise DataValidationFailed(error)
 
-        valid_keys = set(column_data.kvs.keys())
-        data_keys = set(request_data.keys())
-        unknown_keys = []
-        if column_name not in OVSDB_COMMON_COLUMNS:
-            unknown_keys = data_keys.difference(valid_keys)
-        missing_keys = valid_keys.difference(data_keys)
+                value_type = type(value)
 
-        if unknown_keys:
-            error_details += "Unknown keys: '%s'. " % list(unknown_keys)
+                # Values in dict must match JSON schema
+                if value_type in value_types:
 
-        if missing_keys:
-            true_missing_keys = []
+                    # If they match, they might be strings that represent
+                    # other types, so each value must be checked if kvs
+                    # type exists
+                    if value_type in string_types and kvs and key in kvs:
+                        converted_value = \
+                            convert_string_to_value_by_type(value,
+                                                            kvs[key]['type'])
 
-            for key in missing_keys:
-                if not column_data.kvs[key]["is_optional"]:
-                    true_missing_keys.append(key)
+                        if converted_value is None:
+                            error = "Value type mismatch for key %s in " \
+                                    "column %s" % (key, column_name)
+                            raise DataValidationFailed(error)
+                else:
+                    error = "Value type mismatch for key %s in column %s"\
+                            % (key, column_name)
+                    raise DataValidationFailed(error)
 
-            if true_missing_keys:
-                missing_keys = true_missing_keys
-                error_details += "Missing keys: '%s'. " % list(missing_keys)
-            else:
-                missing_keys = []
+    def verify_valid_attribute_values(request_data):
+        valid = True
+        error_details = ""
+
+        # If data has key-values dict defined, check for missing/invalid
+        # keys. It's assumed type is validated, meaning kvs is defined for
+        # dicts only
+        if kvs:
+            data_keys = set(request_data.keys())
+            unknown_keys = []
+            if check_keys:
+                unknown_keys = data_keys.difference(valid_keys)
+            missing_keys = valid_keys.difference(data_keys)
+
+            if unknown_keys:
+                error_details += "Unknown keys: '%s'. " % list(unknown_keys)
+
+            if missing_keys:
+                true_missing_keys = [key for key in missing_keys
+                                     if key not in optional_keys]
+
+                if true_missing_keys:
+                    missing_keys = true_missing_keys
+                    error_details += "Missing keys: '%s'. " % \
+                        list(missing_keys)
+                else:
+                    missing_keys = []
 
-        if unknown_keys or missing_keys:
-            valid = False
+            if unknown_keys or missing_keys:
+                valid = False
 
-        if valid:
-            # Now that keys have been checked,
-            # verify their values are valid
-            for key, value in column_data.kvs.iteritems():
-                if key in request_data and value['enum']:
-                    enum = set(value['enum'].as_list())
+            if valid:
+                # Now that keys have been checked,
+                # verify their values are valid
+                for key, key_enum, key_type in kvs_enums:
+                    if key not in request_data:
+                        continue
 
                     data_value = request_data[key]
-
-                    if type(data_value) \
-                            in ovs_types.StringType.python_types:
+                    if type(data_value) in string_types:
                         data_value = \
                             convert_string_to_value_by_type(data_value,
-                                                            value['type'])
+                                                            key_type)
 
-                    if not is_value_in_enum(data_value, enum):
+                    if not is_value_in_enum(data_value, key_enum):
                         valid = False
                         error_details += "Invalid value for key '%s'. " % key
                         break
 
-    # If data has an enum defined, check for a valid value
-    elif column_data.enum:
-
-        enum = set(column_data.enum.as_list())
-        valid = is_value_in_enum(request_data, enum)
-
-    if not valid:
-        if error_details:
-            error_message += ": " + error_details
-        raise DataValidationFailed(error_message)
+        # If data has an enum defined, check for a valid value
+        elif enum is not None:
+            valid = is_value_in_enum(request_data, enum)
 
+        if not valid:
+            error_message = invalid_message
+            if error_details:
+                error_message += ": " + error_details
+            raise DataValidationFailed(error_message)
 
-def is_value_in_enum(value, enum):
+    def verify_attribute_range(request_data):
+        data_type = type(request_data)
 
-    valid = True
+        # Check elements in in a list
+        if is_list:
 
-    # Check if request's list contains values not valid
-    if type(value) is list:
-        if set(value).difference(enum):
-            valid = False
-
-    # Check if single request value is valid
-    elif value not in enum:
-        valid = False
-
-    return valid
-
-
-def verify_attribute_range(column_name, column_data, request_data):
-
-    # We assume verify_attribute_type has already been called,
-    # so request_data type must be correct (save for a small
-    # exception if column is list)
-
-    data_type = type(request_data)
-
-    # Check elements in in a list
-    if column_data.is_list:
+            # Exception: a single value might be accepted
+            # by OVSDB as a single element list
+            if data_type is not list:
+                request_list = [request_data]
+            else:
+                request_list = request_data
 
-        # Exception: a single value might be accepted
-        # by OVSDB as a single element list
-        request_list = []
-        if data_type is not list:
-            request_list.append(request_data)
-        else:
-            request_list = request_data
+            request_len = len(request_list)
+            if request_len < n_min or request_len > n_max:
+                error = "List number of elements is out of range for " \
+                    "column %s" % column_name
+                raise DataValidationFailed(error)
 
-        request_len = len(request_list)
-        if request_len < column_data.n_min or request_len > column_data.n_max:
-            error = "List number of elements is out of range for column %s" % \
-                column_name
-            raise DataValidationFailed(error)
-        else:
             for element in request_list:
                 # We usually check the value itself
                 # But for a string, we check its length instead
                 value = element
-                if type(element) in ovs_types.StringType.python_types:
+                if type(element) in string_types:
                     value = len(element)
 
-                if (value < column_data.rangeMin or
-                        value > column_data.rangeMax):
-                    error = "List element %s is out of range for column %s" % \
-                        (element, column_name)
+                if value < range_min or value > range_max:
+                    error = "List element %s is out of range for " \
+                        "column %s" % (element, column_name)
                     raise DataValidationFailed(error)
 
-    # Check elements in a dictionary
-    elif column_data.is_dict:
-        request_len = len(request_data)
-        if request_len < column_data.n_min or request_len > column_data.n_max:
-            error = "Dict number of elements is out of range for column %s" % \
-                column_name
-            raise DataValidationFailed(error)
-        else:
+        # Check elements in a dictionary
+        elif is_dict:
+            request_len = len(request_data)
+            if request_len < n_min or request_len > n_max:
+                error = "Dict number of elements is out of range for " \
+                    "column %s" % column_name
+                raise DataValidationFailed(error)
+
             for key, data in request_data.iteritems():
 
                 # First check the key
-                # TODO is this necessary? Valid keys are verified prior to this
-
                 value = key
-                if type(key) in ovs_types.StringType.python_types:
+                if type(key) in string_types:
                     value = len(key)
 
-                if (value < column_data.rangeMin or
-                        value > column_data.rangeMax):
-                    error = "Key %s's value is out of range for column %s" % \
-                        (key, column_name)
+                if value < range_min or value > range_max:
+                    error = "Key %s's value is out of range for column %s" \
+                        % (key, column_name)
                     raise DataValidationFailed(error)
 
                 # Now check ranges for values in dictionary
@@ -595,69 +565,128 @@ def verify_attribute_range(column_name, column_data, request_data):
                     continue
 
                 value = data
+                min_ = value_range_min
+                max_ = value_range_max
 
-                min_ = column_data.valueRangeMin
-                max_ = column_data.valueRangeMax
+                # If kvs is defined, ranges should be taken from it
+                if key in kvs_ranges:
+                    is_boolean, min_, max_, key_type = kvs_ranges[key]
 
-                # If kvs is defined, ranges shouldbe taken from it
-                if column_data.kvs and key in column_data.kvs:
                     # Skip range check for booleans
-                    if column_data.kvs[key]['type'] == ovs_types.BooleanType:
+                    if is_boolean:
                         continue
-                    else:
-                        min_ = column_data.kvs[key]['rangeMin']
-                        max_ = column_data.kvs[key]['rangeMax']
-
-                    # If value is a string, it might represent values of other
-                    # types and therefore it needs to be converted
-                    if type(value) in ovs_types.StringType.python_types:
-                        column_ovs_type = column_data.kvs[key]['type']
-                        value = \
-                            convert_string_to_value_by_type(value,
-                                                            column_ovs_type)
+
+                    # If value is a string, it might represent values of
+                    # other types and therefore it needs to be converted
+                    if type(value) in string_types:
+                        value = convert_string_to_value_by_type(value,
+                                                                key_type)
 
                 # If it was a string all along or if after convertion it's
                 # still a string, its length range is checked instead
-                if type(value) in ovs_types.StringType.python_types:
+                if type(value) in string_types:
                     value = len(value)
 
-                if (value < min_ or
-                        value > max_):
+                if value < min_ or value > max_:
                     error = "Dictionary value %s is out of range " % data + \
                         "for key %s in column %s" % (key, column_name)
                     raise DataValidationFailed(error)
 
-    # Check single elements (non-list/non-dictionary)
-    # Except boolean, as there's no range for them
-    elif data_type not in ovs_types.BooleanType.python_types:
+        # Check single elements (non-list/non-dictionary)
+        # Except boolean, as there's no range for them
+        elif data_type not in boolean_types:
 
-        # Exception: if column is not a list,
-        # a single value list is accepted
-        if data_type is list:
-            value = request_data[0]
-            data_type = type(value)
-        else:
-            value = request_data
+            # Exception: if column is not a list,
+            # a single value list is accepted
+            if data_type is list:
+                value = request_data[0]
+                data_type = type(value)
+            else:
+                value = request_data
+
+            if data_type in string_types:
+                value = len(value)
 
-        if data_type in ovs_types.StringType.python_types:
-            value = len(value)
+            if value < range_min or value > range_max:
+                error = "Attribute value is out of range for column %s" % \
+                    column_name
+                raise DataValidationFailed(error)
+
+    def validate(request_data):
+        data = request_data
+        data_type = type(data)
+
+        # If data is a list but column is not,
+        # we expect a single value in the list
+        if not is_list and not is_dict and data_type is list:
+            if len(data) == 1:
+                data = data[0]
+                data_type = type(data)
 
-        if value < column_data.rangeMin or value > column_data.rangeMax:
-            error = "Attribute value is out of range for column %s" % \
-                column_name
+        if data_type not in valid_types:
+            error = "Attribute type mismatch for column %s" % column_name
             raise DataValidationFailed(error)
 
+        # Check each value's type for elements in lists and dictionaries
+        if n_max > 1:
+            verify_container_values_type(request_data)
+
+        # Now check for invalid values
+        verify_valid_attribute_values(data)
+
+        verify_attribute_range(request_data)
+
+    return validate
+
+
+def convert_string_to_value_by_type(value, type_):
+
+    converted_value = value
+
+    if type_ == ovs_types.IntegerType or \
+            type_ in ovs_types.IntegerType.python_types:
+        try:
+            converted_value = int(value)
+        except ValueError:
+            converted_value = None
+    elif type_ == ovs_types.RealType or \
+            type_ in ovs_types.RealType.python_types:
+        try:
+            converted_value = float(value)
+        except ValueError:
+            converted_value = None
+    elif type_ == ovs_types.BooleanType or \
+            type_ in ovs_types.BooleanType.python_types:
+        if not (value == 'true' or value == 'false'):
+            converted_value = None
+
+    return converted_value
+
+
+def is_value_in_enum(value, enum):
+
+    valid = True
+
+    # Check if request's list contains values not valid
+    if type(value) is list:
+        if set(value).difference(enum):
+            valid = False
+
+    # Check if single request value is valid
+    elif value not in enum:
+        valid = False
+
+    return valid
+
 
 def _get_row_from_uri(uri, schema, idl):
 
-    verified_resource = parse.parse_url_path(uri, schema, idl)
+    verified_resource = resolver.get_resolver(schema, idl).resolve(uri, idl)
     if verified_resource is None:
         error = "Reference %s could not be identified" % uri
         raise DataValidationFailed(error)
 
     # get the Row instance of the reference we are adding
-    while verified_resource.next is not None:
-        verified_resource = verified_resource.next
     row = utils.get_row_from_resource(verified_resource, idl)
     return row
 
@@ -763,18 +792,13 @@ def verify_referenced_by(data, resource, schema, idl):
         if 'attributes' in item:
             attributes = item['attributes']
 
-        # verify URI
-        uri_resource = parse.parse_url_path(uri, schema, idl,
-                                            REQUEST_TYPE_CREATE)
+        # verify URI, the resolver returns the last resource
+        uri_resource = resolver.get_resolver(schema, idl).resolve(uri, idl)
 
         if uri_resource is None:
             error = "referenced_by resource error"
             raise DataValidationFailed(error)
 
-        # go to the last resource
-        while uri_resource.next is not None:
-            uri_resource = uri_resource.next
-
         if uri_resource.row is None:
             app_log.debug('uri: ' + uri + ' not found')
             error = "referenced_by resource error"
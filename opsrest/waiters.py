@@ -0,0 +1,113 @@
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from tornado.locks import Event
+
+from opsrest.notifications.utils import get_table_changes_from_idl
+
+
+def get_wait_target(resource):
+    """
+    Returns the table and the row UUID whose changes a request for the
+    resource waits for, the row UUID being None for a collection
+    """
+    while resource.next is not None:
+        resource = resource.next
+    return (resource.table, resource.row)
+
+
+class Waiter(object):
+    """
+    Request waiting for changes to a row, or to any row of a table
+    """
+    __slots__ = ('table', 'row', 'event', 'cancelled')
+
+    def __init__(self, table, row=None):
+        self.table = table
+        self.row = row
+        self.event = Event()
+        self.cancelled = False
+
+    def wait(self, deadline):
+        """
+        Returns a future resolved once woken, failing with
+        gen.TimeoutError at the deadline, in IOLoop time
+        """
+        return self.event.wait(timeout=deadline)
+
+    def cancel(self):
+        self.cancelled = True
+        self.event.set()
+
+
+class ResourceWaiters(object):
+    """
+    Waiters by table and by row UUID, None for the waiters of any row,
+    so that a change only wakes the requests waiting for the rows
+    changed. The tables waited on are tracked in the IDL for as long as
+    they have waiters.
+    """
+    def __init__(self, manager):
+        self._manager = manager
+        self._waiters = {}
+
+    def add(self, table, row=None):
+        waiter = Waiter(table, row)
+        if table not in self._waiters:
+            self._waiters[table] = {}
+            self._manager.track_table(table)
+        self._waiters[table].setdefault(row, set()).add(waiter)
+        return waiter
+
+    def remove(self, waiter):
+        rows = self._waiters.get(waiter.table)
+        if rows is None or waiter.row not in rows:
+            return
+
+        rows[waiter.row].discard(waiter)
+        if not rows[waiter.row]:
+            del rows[waiter.row]
+            if not rows:
+                del self._waiters[waiter.table]
+                self._manager.untrack_table(waiter.table)
+
+    def wake(self, idl):
+        """
+        Wakes the waiters of the rows changed, going through the changed
+        rows or the rows waited on, whichever are fewer. Waiters are
+        removed by the requests once woken.
+        """
+        for table, rows in self._waiters.iteritems():
+            changes = get_table_changes_from_idl(table, idl)
+            if not changes:
+                continue
+
+            woken = []
+            if None in rows:
+                woken.extend(rows[None])
+
+            if len(rows) < len(changes):
+                woken.extend(waiter for row, waiters in rows.iteritems()
+                             if row is not None and row in changes
+                             for waiter in waiters)
+            else:
+                woken.extend(waiter for row in changes
+                             for waiter in rows.get(row, ()))
+
+            for waiter in woken:
+                waiter.event.set()
+
+    def count(self):
+        return sum(len(waiters) for rows in self._waiters.itervalues()
+                   for waiters in rows.itervalues())
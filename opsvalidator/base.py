@@ -43,5 +43,15 @@ class BaseValidator(object):
         app_log.debug("validate_modification not implemented for " +
                       self.type())
 
+    def validate_modifications(self, batch):
+        """
+        Validates the creation or update of several rows of the
+        resource at once, batch being a list of ValidationArgs.
+        Validators that can check a whole batch faster than one row
+        at a time override it.
+        """
+        for validation_args in batch:
+            self.validate_modification(validation_args)
+
     def validate_deletion(self, validation_args):
         app_log.debug("validate_deletion not implemented for " + self.type())
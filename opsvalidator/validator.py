@@ -3,16 +3,53 @@ import sys
 import imp
 import os
 import re
+import time
 from tornado.log import app_log
 from opsrest import constants
 from opsvalidator.base import BaseValidator, ValidationArgs
+from opsvalidator.error import ValidationError
 
 g_validators = {}
 
+# Validators by table name, as given to exec_validators
+g_dispatch = {}
+
+# Plugin directories already loaded
+g_plugin_dirs = set()
+
+# ValidatorStats by validator type
+g_stats = {}
+
+
+class ValidatorStats(object):
+    """
+    Time spent in a validator, to find out the slow ones
+    """
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.time = 0.0
+        self.max_time = 0.0
+
+    def add(self, rows, elapsed):
+        self.calls += 1
+        self.rows += rows
+        self.time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+
+    def to_json(self):
+        return {'calls': self.calls, 'rows': self.rows,
+                'time': self.time, 'max_time': self.max_time}
+
 
 def init_plugins(plugin_dir):
+    if plugin_dir in g_plugin_dirs:
+        return
+
     find_plugins(plugin_dir)
     register_plugins()
+    g_plugin_dirs.add(plugin_dir)
 
 
 def find_plugins(plugin_dir):
@@ -34,6 +71,10 @@ def find_plugins(plugin_dir):
 def register_plugins():
     app_log.debug("Registering plugins...")
 
+    # validators are registered again along with the new ones
+    g_validators.clear()
+    g_dispatch.clear()
+
     for plugin in BaseValidator.__subclasses__():
         if plugin.resource is not None and plugin.resource != "":
             if plugin.resource in g_validators:
@@ -46,25 +87,114 @@ def register_plugins():
             app_log.info("Invalid resource defined for %s" % plugin.type())
 
 
+def get_validators(table_name):
+    """
+    Returns the validators registered for a table
+    """
+    validators = g_dispatch.get(table_name)
+    if validators is None:
+        validators = g_validators.get(table_name.lower(), [])
+        g_dispatch[table_name] = validators
+    return validators
+
+
+def has_batch_validation(validator):
+    # unbound methods are created on every access, compare functions
+    return type(validator).validate_modifications.__func__ is not \
+        BaseValidator.validate_modifications.__func__
+
+
 def exec_validators(idl, schema, table_name, row, method,
                     p_table_name=None, p_row=None):
     app_log.debug("Executing validator...")
 
-    resource_name = table_name.lower()
-    if resource_name in g_validators:
-        resource_validators = g_validators[resource_name]
-
+    resource_validators = get_validators(table_name)
+    if resource_validators:
         validation_args = ValidationArgs(idl, schema, table_name, row,
                                          p_table_name, p_row, False)
 
         for validator in resource_validators:
             app_log.debug("Invoking validator \"%s\" for resource \"%s\"" %
-                          (validator.type(), resource_name))
+                          (validator.type(), table_name))
 
-            validate_by_method(validator, method, validation_args)
+            start = time.time()
+            try:
+                validate_by_method(validator, method, validation_args)
+            finally:
+                _add_stats(validator, 1, start)
     else:
         app_log.debug("Custom validator for \"%s\" does not exist" %
-                      resource_name)
+                      table_name)
+
+
+def exec_validators_batch(idl, schema, table_name, method, rows,
+                          errors=None):
+    """
+    Validates an operation on several rows of a table. rows is a list
+    of (row, p_table_name, p_row). Validators implementing
+    validate_modifications get all the rows at once, the others one
+    row at a time.
+
+    If errors is given, the error of every ValidationError raised is
+    appended to it and the remaining rows are still validated,
+    otherwise the first ValidationError is raised.
+    """
+    resource_validators = get_validators(table_name)
+    if not resource_validators:
+        app_log.debug("Custom validator for \"%s\" does not exist" %
+                      table_name)
+        return
+
+    is_new = method == constants.REQUEST_TYPE_CREATE
+    batch = [ValidationArgs(idl, schema, table_name, row, p_table_name,
+                            p_row, is_new)
+             for (row, p_table_name, p_row) in rows]
+
+    for validator in resource_validators:
+        app_log.debug("Invoking validator \"%s\" for %d rows of resource "
+                      "\"%s\"" % (validator.type(), len(batch), table_name))
+
+        start = time.time()
+        try:
+            if method != constants.REQUEST_TYPE_DELETE and \
+                    has_batch_validation(validator):
+                _validate(validator.validate_modifications, batch,
+                          errors=errors)
+            else:
+                for validation_args in batch:
+                    _validate(validate_by_method, validator, method,
+                              validation_args, errors=errors)
+        finally:
+            _add_stats(validator, len(batch), start)
+
+
+def _validate(function, *args, **kwargs):
+    errors = kwargs.get('errors')
+    if errors is None:
+        function(*args)
+        return
+
+    try:
+        function(*args)
+    except ValidationError as e:
+        app_log.debug(str(e.error))
+        errors.append(e.error)
+    except Exception as e:
+        app_log.debug("Validation failed: %s" % e)
+
+
+def _add_stats(validator, rows, start):
+    name = validator.type()
+    if name not in g_stats:
+        g_stats[name] = ValidatorStats()
+    g_stats[name].add(rows, time.time() - start)
+
+
+def get_stats():
+    """
+    Returns the time spent in each validator
+    """
+    return dict((name, stats.to_json()) for name, stats in g_stats.iteritems())
 
 
 def validate_by_method(validator, method, validation_args):
@@ -13,6 +13,9 @@ import tornado.http1connection
 from opsrest.settings import settings
 from opsrest.application import OvsdbApiApplication
 from opsrest.manager import OvsdbConnectionManager
+from opsrest.utils import memutils
+from opsrest.notifications.connection import NotificationConnection
+from opsvalidator import validator
 import ops.dc
 
 import ovs.unixctl
@@ -79,7 +82,36 @@ def diag_basic_handler(argv):
     for index, txn in enumerate(transactions.txn_list):
         buff += "  %s\t  %s\n" % (index, txn.status)
     buff += "Total number of pending "\
-            "transactions is %s" % len(transactions.txn_list)
+            "transactions is %s\n" % len(transactions.txn_list)
+    buff += memutils.get_memory_report(app.restschema, app.manager.idl)
+    buff += "Validators:\n"
+    buff += "  Name\t  Calls\t  Rows\t  Total(s)\t  Max(s)\n"
+    buff += "  ---------------\n"
+    for name, stats in sorted(validator.get_stats().iteritems()):
+        buff += "  %s\t  %d\t  %d\t  %.6f\t  %.6f\n" % (
+            name, stats['calls'], stats['rows'], stats['time'],
+            stats['max_time'])
+    buff += "Notification connections:\n"
+    buff += "  ID\t  Transport\t  Sent\t  Bytes\t  In flight\t"\
+            "  Max in flight\t  Queued\t  Merged\t  Dropped\t  Pending\t"\
+            "  Resyncs\n"
+    buff += "  ---------------\n"
+    for sub_name, connection in NotificationConnection.connections.items():
+        stats = connection.get_stats()
+        buff += "  %s\t  %s\t  %d\t  %d\t  %d\t  %d\t  %d\t  %d\t  %d\t"\
+                "  %d\t  %d\n" % (sub_name, connection.transport,
+                                  stats['messages_sent'],
+                                  stats['bytes_sent'],
+                                  stats['bytes_in_flight'],
+                                  stats['max_bytes_in_flight'],
+                                  stats['updates_queued'],
+                                  stats['updates_merged'],
+                                  stats['updates_dropped'],
+                                  stats['updates_pending'],
+                                  stats['resyncs'])
+    buff += "Detached notification subscribers: %d\n" % \
+        len(NotificationConnection.detached)
+    buff += "Requests waiting for changes: %d\n" % app.manager.waiters.count()
     return buff
 
 
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+'''
+Benchmark for resolving dynamic categories of rows.
+
+Compares the copy-on-write category views used by
+opsrest.utils.utils.update_category_keys against the previous
+implementation, which moved columns between the schema's dictionaries
+for every row. Rows are given as dicts, the same way new data is
+categorized on POST/PUT.
+
+Usage: python benchmark_dynamic_categories.py [rows] [iterations]
+'''
+
+import copy
+import sys
+import time
+
+from opslib.restparser import OVSTable
+from opsrest.constants import *
+from opsrest.utils import utils
+
+TABLE_JSON = {
+    "columns": {
+        "name": {"type": "string",
+                 "category": "configuration"},
+        "type": {"type": {"key": {"type": "string",
+                                  "enum": ["system", "internal",
+                                           "loopback"]}},
+                 "category": {"per-value": [
+                     {"value": "system", "category": "status"},
+                     {"value": "internal", "category": "configuration"},
+                     {"value": "loopback", "category": "configuration"}]}},
+        "admin_state": {"type": "string",
+                        "category": {"follows": "type"}},
+        "mtu": {"type": "integer",
+                "category": {"follows": "type"}},
+        "description": {"type": "string",
+                        "category": "configuration"},
+        "link_state": {"type": "string",
+                       "category": "status"},
+        "rx_packets": {"type": "integer",
+                       "category": "statistics"}
+    },
+    "indexes": [["name"]]
+}
+
+
+class Schema(object):
+    def __init__(self, table):
+        self.ovs_tables = {table.name: table}
+
+
+def legacy_update_category_keys(keys, row, table):
+    # Former implementation, moves columns between the dictionaries
+    # it is given and changes the categories of the columns in place
+    ovs_table = table
+    columns = {}
+    columns.update(keys[OVSDB_SCHEMA_CONFIG])
+    columns.update(keys[OVSDB_SCHEMA_STATUS])
+    columns.update(keys[OVSDB_SCHEMA_STATS])
+
+    for column_name, category_obj in ovs_table.dynamic.iteritems():
+        if category_obj.follows is not None:
+            source_column = category_obj.follows
+        else:
+            source_column = column_name
+
+        column_data = row[source_column]
+        new_category = \
+            columns[source_column].category.per_value[column_data]
+        prev_category = columns[column_name].category.value
+
+        if prev_category != new_category:
+            column = keys[prev_category][column_name]
+            column.category.value = new_category
+            keys[new_category][column_name] = column
+            keys[prev_category].pop(column_name)
+
+    return keys
+
+
+def make_table():
+    # The table's json is modified while parsed
+    return OVSTable.from_json(copy.deepcopy(TABLE_JSON), "Interface", False)
+
+
+def get_keys(table):
+    return {OVSDB_SCHEMA_CONFIG: table.config,
+            OVSDB_SCHEMA_STATUS: table.status,
+            OVSDB_SCHEMA_STATS: table.stats,
+            OVSDB_SCHEMA_REFERENCE: table.references}
+
+
+def make_rows(count):
+    types = ["system", "internal", "loopback"]
+    rows = []
+    for i in range(count):
+        rows.append({"name": str(i), "type": types[i % len(types)]})
+    return rows
+
+
+def run(label, function, rows, iterations):
+    start = time.time()
+    for i in range(iterations):
+        for row in rows:
+            function(row)
+    elapsed = time.time() - start
+    calls = len(rows) * iterations
+    print("%-10s %8d calls %8.3f s %8.2f us/call" %
+          (label, calls, elapsed, elapsed * 1000000 / calls))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    rows = make_rows(count)
+
+    table = make_table()
+    schema = Schema(table)
+    run("views", lambda row: utils.update_category_keys(get_keys(table),
+                                                        row, None, schema,
+                                                        table.name),
+        rows, iterations)
+
+    legacy_table = make_table()
+    run("legacy", lambda row: legacy_update_category_keys(
+        get_keys(legacy_table), row, legacy_table), rows, iterations)
+
+    # The base categorization must be left untouched
+    pristine = make_table()
+    for name in ("config", "status", "stats"):
+        assert sorted(getattr(table, name)) == \
+            sorted(getattr(pristine, name)), name
+
+
+if __name__ == '__main__':
+    main()
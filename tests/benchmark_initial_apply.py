@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+'''
+Benchmark for applying a configuration to a database holding hardware
+rows only, as done with the startup configuration at boot.
+
+Must be run on a switch. Every configuration is applied after the
+database is emptied with empty_config.db, once as a regular update and
+once as an initial apply. The configurations are the tests/*.db
+fixtures, and synthetic ones made of config_test1.db with VLANs added
+to its bridge and static routes added to its VRF. VLAN IDs are limited
+to 4094 by the schema.
+
+Usage: python benchmark_initial_apply.py [vlans] [routes]
+'''
+
+import copy
+import glob
+import json
+import os
+import sys
+import time
+import urllib
+
+import ovs.poller
+from opslib import restparser
+
+import ops.dc
+from ops.settings import settings
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+EMPTY_CONFIG = os.path.join(TESTS_DIR, 'empty_config.db')
+BASE_CONFIG = os.path.join(TESTS_DIR, 'config_test1.db')
+MAX_VLAN_ID = 4094
+
+
+def connect(extschema):
+    idl = ops.dc.register(extschema, settings.get('ovs_schema'),
+                          settings.get('ovs_remote'))
+    change_seqno = idl.change_seqno
+    while True:
+        idl.run()
+        if change_seqno != idl.change_seqno:
+            break
+        poller = ovs.poller.Poller()
+        idl.wait(poller)
+        poller.block()
+    return idl
+
+
+def load(filename):
+    with open(filename) as json_data:
+        return json.load(json_data)
+
+
+def make_vlans_config(count):
+    config = load(BASE_CONFIG)
+    bridge = config['System']['bridges'].values()[0]
+    vlans = bridge.setdefault('vlans', {})
+    for vlan_id in range(2, min(count + 2, MAX_VLAN_ID + 1)):
+        name = 'VLAN%d' % vlan_id
+        vlans[name] = {'id': vlan_id, 'name': name, 'admin': ['up']}
+    return config
+
+
+def make_routes_config(count):
+    config = load(BASE_CONFIG)
+    vrf = config['System']['vrfs'].values()[0]
+    routes = vrf.setdefault('Route', {})
+    for i in range(count):
+        prefix = '%d.%d.%d.0/24' % (10 + i / 65536, i / 256 % 256, i % 256)
+        routes['static/' + urllib.quote(prefix, safe='')] = {
+            'prefix': prefix,
+            'distance': [1],
+            'address_family': ['ipv4'],
+            'sub_address_family': ['unicast'],
+            'nexthops': {'Nexthop1': {'ip_address': ['192.168.0.1']}}}
+    return config
+
+
+def apply_config(data, extschema, idl, initial):
+    # write modifies the configuration it is given
+    data = copy.deepcopy(data)
+    start = time.time()
+    (result, error) = ops.dc.write(data, extschema, idl, initial=initial)
+    elapsed = time.time() - start
+
+    # wait for the committed rows to be in the IDL
+    idl.run()
+    return (elapsed, result, error)
+
+
+def run(name, data, extschema, idl):
+    empty = load(EMPTY_CONFIG)
+    for initial in (False, True):
+        apply_config(empty, extschema, idl, False)
+        (elapsed, result, error) = apply_config(data, extschema, idl,
+                                                initial)
+        mode = 'initial' if initial else 'update'
+        print("%-20s %-8s %8.3f s  %s" % (name, mode, elapsed, result))
+        if error:
+            print("  error: %s" % error)
+
+
+def main():
+    vlans = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    routes = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+
+    extschema = restparser.parseSchema(settings.get('ext_schema'))
+    idl = connect(extschema)
+
+    for filename in sorted(glob.glob(os.path.join(TESTS_DIR, '*.db'))):
+        run(os.path.basename(filename), load(filename), extschema, idl)
+
+    run('%d VLANs' % vlans, make_vlans_config(vlans), extschema, idl)
+    run('%d routes' % routes, make_routes_config(routes), extschema, idl)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+#
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+'''
+Benchmark for storing the startup configuration.
+
+Compares the compressed format of ops._startup against the previous
+base64 encoded JSON, for a configuration made of copies of the
+interfaces in json.data, and the delta kept in the history when a
+few interfaces change.
+
+Usage: python benchmark_startup_config.py [interfaces] [iterations]
+'''
+
+import base64
+import copy
+import json
+import os
+import sys
+import time
+
+from ops import _startup
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'json.data')
+
+
+def make_config(count):
+    with open(DATA_FILE) as data_file:
+        config = json.load(data_file)
+
+    interfaces = config['Interface'].values()
+    config['Interface'] = {}
+    for i in range(count):
+        interface = copy.deepcopy(interfaces[i % len(interfaces)])
+        interface['name'] = str(i)
+        interface['user_config'] = {'admin': 'up',
+                                    'description': 'interface %d' % i}
+        config['Interface'][str(i)] = interface
+    return config
+
+
+def legacy_save(config):
+    return base64.b64encode(json.dumps(config))
+
+
+def legacy_load(data):
+    return json.loads(base64.b64decode(data))
+
+
+def save(config):
+    return _startup.encode(config, _startup.CODEC_ZLIB, 1)
+
+
+def load(data):
+    return _startup.StoredConfig(data).get_document()
+
+
+def run(label, function, argument, iterations):
+    start = time.time()
+    for i in range(iterations):
+        result = function(argument)
+    elapsed = time.time() - start
+    print("%-14s %8.2f ms/call" % (label, elapsed * 1000 / iterations))
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    config = make_config(count)
+    print("JSON size:       %8d bytes" % len(json.dumps(config)))
+
+    legacy_data = run("legacy save", legacy_save, config, iterations)
+    assert run("legacy load", legacy_load, legacy_data, iterations) == config
+    data = run("save", save, config, iterations)
+    assert run("load", load, data, iterations) == config
+    print("Legacy size:     %8d bytes" % len(legacy_data))
+    print("Stored size:     %8d bytes" % len(data))
+
+    new_config = copy.deepcopy(config)
+    for i in range(0, count, 100):
+        new_config['Interface'][str(i)]['user_config']['admin'] = 'down'
+
+    delta = run("delta", lambda new: _startup.encode(
+        _startup.make_delta(new, config), _startup.CODEC_ZLIB_DELTA, 1),
+        new_config, iterations)
+    print("Delta size:      %8d bytes" % len(delta))
+
+    restored = _startup.apply_delta(copy.deepcopy(new_config),
+                                    load(delta))
+    assert restored == config
+
+
+if __name__ == '__main__':
+    main()
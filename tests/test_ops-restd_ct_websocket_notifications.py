@@ -999,6 +999,10 @@ class TestWebSocketEvents(testing.AsyncTestCase):
         subscription_uri = self.subscribe_and_check(subscriber_uri,
                                                     FORWARD_REF_COLL_SUB)
 
+        # The collection is empty, discard the notification marking the
+        # initial sync as complete.
+        response = yield conn.read_message()
+
         info("### Adding a forward reference row to trigger "
              "notification ###\n")
         status_code, _ = execute_request(FORWARD_REF_ROW_SUB_POST_URI, "POST",
@@ -1132,6 +1136,10 @@ class TestWebSocketEvents(testing.AsyncTestCase):
         subscription_uri = self.subscribe_and_check(subscriber_uri,
                                                     BACK_REF_COLL_SUB)
 
+        # The collection is empty, discard the notification marking the
+        # initial sync as complete.
+        response = yield conn.read_message()
+
         info("### Adding a backward reference row to trigger "
              "notification ###\n")
         self.switch.cmdCLI('configure terminal')
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import pytest
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+import ops.dc
+from opsrest.custom.configcontroller import (
+    ConfigController,
+    ConfigWriteStatus
+)
+from opsrest.constants import ERROR, REST_QUERY_PARAM_FINGERPRINT
+from opsrest.exceptions import APIException
+
+
+class Transaction(object):
+    def __init__(self, events):
+        self.txn = self
+        self.events = events
+
+    def abort(self):
+        self.events.append('abort')
+
+
+class Manager(object):
+    def __init__(self):
+        self.idl = None
+        self.events = []
+
+    def wait_for_staging(self):
+        future = Future()
+        future.set_result(None)
+        return future
+
+    def get_new_transaction(self):
+        return Transaction(self.events)
+
+    def begin_staging(self, txn):
+        self.events.append('begin_staging')
+
+    def end_staging(self):
+        self.events.append('end_staging')
+
+
+class Application(object):
+    def __init__(self):
+        self.manager = Manager()
+        self.restschema = None
+        self.cfg_manager = Manager()
+        self.config_write_status = ConfigWriteStatus()
+
+
+def is_fingerprint(query_args):
+    return ConfigController(Application()).is_fingerprint(query_args)
+
+
+def test_fingerprint_query_argument():
+    assert is_fingerprint({REST_QUERY_PARAM_FINGERPRINT: ['true']})
+    assert is_fingerprint({REST_QUERY_PARAM_FINGERPRINT: ['True']})
+    # bare ?fingerprint
+    assert is_fingerprint({REST_QUERY_PARAM_FINGERPRINT: ['']})
+
+    assert not is_fingerprint({REST_QUERY_PARAM_FINGERPRINT: ['false']})
+    assert not is_fingerprint({'type': ['running']})
+    assert not is_fingerprint({})
+
+
+def test_no_etag_for_fingerprint():
+    controller = ConfigController(Application())
+
+    etag = IOLoop.current().run_sync(
+        lambda: controller.get_etag(
+            query_args={'type': ['running'],
+                        REST_QUERY_PARAM_FINGERPRINT: ['']}))
+    assert etag is None
+
+
+def update_running_config(monkeypatch, errors=None, commit_result=None):
+    def write_steps(data, schema, idl, txn):
+        progress = ops.dc.WriteProgress()
+        progress.errors = errors
+        yield progress
+
+    monkeypatch.setattr(ops.dc, 'write_steps', write_steps)
+    monkeypatch.setattr(ops.dc, 'commit', lambda txn: commit_result)
+    app = Application()
+    controller = ConfigController(app)
+
+    with pytest.raises(APIException):
+        IOLoop.current().run_sync(
+            lambda: controller.update(None, {}, None, {}))
+    return app
+
+
+def test_invalid_config_aborted_once_while_staged(monkeypatch):
+    app = update_running_config(monkeypatch, errors=['invalid'])
+
+    assert app.manager.events == ['begin_staging', 'abort', 'end_staging']
+    assert app.config_write_status.state == ERROR
+
+
+def test_failed_commit_not_aborted(monkeypatch):
+    # The commit ends the transaction on its own
+    app = update_running_config(monkeypatch, commit_result=(ERROR, 'e'))
+
+    assert app.manager.events == ['begin_staging', 'end_staging']
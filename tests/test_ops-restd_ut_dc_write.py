@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import uuid
+
+from ops import dc, _write
+
+
+class TableSchema(object):
+    def __init__(self):
+        self.parent = None
+        self.index_columns = []
+        self.references = {}
+
+
+class Schema(object):
+    def __init__(self):
+        self.ovs_tables = {'System': TableSchema()}
+
+
+class Table(object):
+    def __init__(self):
+        self.rows = {uuid.uuid4(): object()}
+
+
+class Idl(object):
+    def __init__(self):
+        self.tables = {'System': Table()}
+
+
+def setup_table_rows(table, data, extschema, idl, txn, changed):
+    for index in data[table]:
+        yield index
+
+
+def test_initial_maps_cleared_when_write_aborted(monkeypatch):
+    monkeypatch.setattr(_write, 'setup_validators', lambda *args: None)
+    monkeypatch.setattr(_write, 'setup_table_rows', setup_table_rows)
+
+    steps = dc.write_steps({'System': {}}, Schema(), Idl(), None,
+                           initial=True)
+    progress = next(steps)
+    assert progress.stage == dc.WRITE_STAGE_ROWS
+    assert _write.initial_index_map is not None
+
+    steps.close()
+    assert _write.initial_index_map is None
+    assert _write.backward_children_map is None
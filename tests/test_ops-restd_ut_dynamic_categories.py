@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import copy
+
+import pytest
+
+from opslib.restparser import OVSTable
+from opsrest.constants import (
+    OVSDB_SCHEMA_CONFIG,
+    OVSDB_SCHEMA_REFERENCE,
+    OVSDB_SCHEMA_STATS,
+    OVSDB_SCHEMA_STATUS
+)
+from opsrest.utils import utils
+
+TABLE_JSON = {
+    "columns": {
+        "name": {"type": "string",
+                 "category": "configuration"},
+        "type": {"type": {"key": {"type": "string",
+                                  "enum": ["system", "internal"]}},
+                 "category": {"per-value": [
+                     {"value": "system", "category": "status"},
+                     {"value": "internal", "category": "configuration"}]}},
+        "mtu": {"type": "integer",
+                "category": {"follows": "type"}},
+        "link_state": {"type": "string",
+                       "category": "status"},
+        "rx_packets": {"type": "integer",
+                       "category": "statistics"}
+    },
+    "indexes": [["name"]]
+}
+
+
+class Schema(object):
+    def __init__(self):
+        # The table's json is modified while parsed
+        table = OVSTable.from_json(copy.deepcopy(TABLE_JSON), "Interface",
+                                   False)
+        self.ovs_tables = {table.name: table}
+
+
+def get_base_keys(table):
+    return {OVSDB_SCHEMA_CONFIG: table.config,
+            OVSDB_SCHEMA_STATUS: table.status,
+            OVSDB_SCHEMA_STATS: table.stats,
+            OVSDB_SCHEMA_REFERENCE: table.references}
+
+
+def snapshot(table):
+    # Categories of the base dictionaries' columns
+    result = {}
+    for category, columns in get_base_keys(table).iteritems():
+        result[category] = dict((name, column.category.value)
+                                for name, column in columns.iteritems())
+    return result
+
+
+def categories(keys):
+    result = {}
+    for category in (OVSDB_SCHEMA_CONFIG, OVSDB_SCHEMA_STATUS,
+                     OVSDB_SCHEMA_STATS):
+        for name, column in keys[category].iteritems():
+            assert column.category.value == category
+            result[name] = category
+    return result
+
+
+@pytest.fixture
+def schema():
+    return Schema()
+
+
+def test_categories_resolved_per_row(schema):
+    table = schema.ovs_tables['Interface']
+    views = utils.get_category_views(table)
+
+    system = views.get_keys({'name': '1', 'type': 'system'})
+    internal = views.get_keys({'name': '2', 'type': 'internal'})
+
+    assert categories(system) == {'name': OVSDB_SCHEMA_CONFIG,
+                                  'type': OVSDB_SCHEMA_STATUS,
+                                  'mtu': OVSDB_SCHEMA_STATUS,
+                                  'link_state': OVSDB_SCHEMA_STATUS,
+                                  'rx_packets': OVSDB_SCHEMA_STATS}
+    assert categories(internal) == {'name': OVSDB_SCHEMA_CONFIG,
+                                    'type': OVSDB_SCHEMA_CONFIG,
+                                    'mtu': OVSDB_SCHEMA_CONFIG,
+                                    'link_state': OVSDB_SCHEMA_STATUS,
+                                    'rx_packets': OVSDB_SCHEMA_STATS}
+
+
+def test_views_shared_by_rows_with_same_categories(schema):
+    table = schema.ovs_tables['Interface']
+    views = utils.get_category_views(table)
+
+    assert utils.get_category_views(table) is views
+    assert views.get_keys({'name': '1', 'type': 'system'}) is \
+        views.get_keys({'name': '2', 'type': 'system'})
+    assert len(views.views) == 1
+
+
+def test_schema_left_unchanged(schema):
+    table = schema.ovs_tables['Interface']
+    before = snapshot(table)
+
+    for row_type in ('system', 'internal', 'system'):
+        utils.update_category_keys(get_base_keys(table),
+                                   {'name': '1', 'type': row_type},
+                                   None, schema, 'Interface')
+
+    assert snapshot(table) == before
+
+
+def test_source_column_required(schema):
+    with pytest.raises(Exception) as excinfo:
+        utils.update_category_keys(
+            get_base_keys(schema.ovs_tables['Interface']), {'name': '1'},
+            None, schema, 'Interface')
+    assert "Attribute 'type' is required" in str(excinfo.value)
+
+
+def test_given_keys_recategorized(schema):
+    table = schema.ovs_tables['Interface']
+    keys = get_base_keys(table)
+    # Keys restricted to some of the columns
+    keys[OVSDB_SCHEMA_CONFIG] = {'type': table.config['type']}
+    keys[OVSDB_SCHEMA_STATUS] = {}
+    before = copy.copy(keys[OVSDB_SCHEMA_CONFIG])
+
+    result = utils.update_category_keys(keys,
+                                        {'name': '1', 'type': 'system'},
+                                        None, schema, 'Interface')
+
+    assert categories(result) == {'type': OVSDB_SCHEMA_STATUS,
+                                  'rx_packets': OVSDB_SCHEMA_STATS}
+    assert keys[OVSDB_SCHEMA_CONFIG] == before
+    assert keys[OVSDB_SCHEMA_STATUS] == {}
+    # Only views of the base categorization are cached
+    assert utils.get_category_views(table).views == {}
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+import pytest
+from tornado import gen
+from tornado.ioloop import IOLoop
+
+from opsrest.constants import CHANGES_CB_TYPE
+from opsrest.exceptions import DataValidationFailed
+from opsrest.handlers import ovsdbapi
+from opsrest.manager import OvsdbConnectionManager
+from opsrest.waiters import get_wait_target
+
+
+class Idl(object):
+    def __init__(self):
+        self.tracked = set()
+        self.changes = {}
+
+    def track_add_all_columns(self, table):
+        self.tracked.add(table)
+
+    def track_remove_all_columns(self, table):
+        self.tracked.discard(table)
+
+    def track_get(self, table):
+        return self.changes.get(table, {})
+
+    def track_clear_all(self):
+        self.changes = {}
+
+    def change(self, table, *rows):
+        self.changes[table] = dict((row, None) for row in rows)
+
+
+class Resource(object):
+    def __init__(self, table, row=None, next=None):
+        self.table = table
+        self.row = row
+        self.next = next
+
+
+class Request(object):
+    def __init__(self, path):
+        self.path = path
+        self.method = 'GET'
+
+
+class RefObject(object):
+    def __init__(self, manager):
+        self.manager = manager
+
+
+class Application(object):
+    def __init__(self):
+        self.settings = {'long_poll_default_timeout': 30,
+                         'long_poll_max_timeout': 300}
+
+
+class Handler(ovsdbapi.OVSDBAPIHandler):
+    def __init__(self, manager, resource, results, timeout=None):
+        # The tornado request handler isn't initialized, only what the
+        # long poll uses is set up
+        self.request = Request('/rest/v1/system/ports/1')
+        self.application = Application()
+        self.ref_object = RefObject(manager)
+        self.idl = manager.idl
+        self.schema = None
+        self.resource_path = resource
+        self.results = list(results)
+        self.timeout = timeout
+
+    def get_query_argument(self, name, default=None):
+        return self.timeout if self.timeout is not None else default
+
+    @gen.coroutine
+    def get_resource(self, selector):
+        raise gen.Return(self.results.pop(0))
+
+
+@pytest.fixture
+def manager():
+    manager = OvsdbConnectionManager('unix:/dev/null', None, None)
+    manager.idl = Idl()
+    return manager
+
+
+def etag(handler, result):
+    return handler.compute_etag(json.dumps(result))
+
+
+def test_wait_target():
+    assert get_wait_target(Resource('System', 's',
+                                     Resource('Port'))) == ('Port', None)
+    assert get_wait_target(Resource('System', 's',
+                                     Resource('Port', 'p'))) == ('Port', 'p')
+    assert get_wait_target(Resource('System', 's')) == ('System', 's')
+
+
+def test_changes_wake_waiters_of_rows_changed(manager):
+    waiters = manager.waiters
+    port1 = waiters.add('Port', 'p1')
+    port2 = waiters.add('Port', 'p2')
+    ports = waiters.add('Port')
+    vlan = waiters.add('VLAN', 'v1')
+    assert manager.idl.tracked == set(['Port', 'VLAN'])
+
+    manager.idl.change('Port', 'p1', 'p3', 'p4')
+    manager.run_callbacks(CHANGES_CB_TYPE)
+    assert port1.event.is_set() and ports.event.is_set()
+    assert not port2.event.is_set() and not vlan.event.is_set()
+
+    manager.idl.change('VLAN', 'v2')
+    manager.run_callbacks(CHANGES_CB_TYPE)
+    assert not vlan.event.is_set()
+
+    manager.idl.change('VLAN', 'v1')
+    manager.run_callbacks(CHANGES_CB_TYPE)
+    assert vlan.event.is_set()
+    assert waiters.count() == 4
+
+
+def test_tables_untracked_once_without_waiters(manager):
+    waiters = manager.waiters
+    port1 = waiters.add('Port', 'p1')
+    port2 = waiters.add('Port', 'p2')
+
+    waiters.remove(port1)
+    assert manager.idl.tracked == set(['Port'])
+    waiters.remove(port2)
+    assert manager.idl.tracked == set()
+    assert waiters.count() == 0
+
+    # Removing twice is harmless
+    waiters.remove(port2)
+    assert manager._tracked_tables == {}
+
+
+def test_tracked_tables_counted(manager):
+    manager.track_table('Port')
+    manager.track_table('Port')
+
+    manager.untrack_table('Port')
+    assert manager.idl.tracked == set(['Port'])
+    manager.untrack_table('Port')
+    assert manager.idl.tracked == set()
+
+    # Tables aren't untracked when all tables are tracked
+    manager.track_all = True
+    manager.idl.tracked.add('VLAN')
+    manager.track_table('VLAN')
+    manager.untrack_table('VLAN')
+    assert manager.idl.tracked == set(['VLAN'])
+
+
+def test_changed_resource_returned_at_once(manager):
+    handler = Handler(manager, Resource('Port', 'p1'), [{'name': 'p2'}])
+
+    result = IOLoop.current().run_sync(
+        lambda: handler.wait_for_change(None, etag(handler, {'name': 'p1'})))
+
+    assert result == ({'name': 'p2'}, True)
+    assert manager.waiters.count() == 0
+
+
+def test_wait_ended_by_change(manager, monkeypatch):
+    resource = Resource('Port', 'p1')
+    monkeypatch.setattr(ovsdbapi, 'parse_url_path',
+                        lambda *args: resource)
+    handler = Handler(manager, resource, [{'name': 'p1'}, {'name': 'p2'}])
+
+    @gen.coroutine
+    def wait():
+        waiting = handler.wait_for_change(None, etag(handler, {'name': 'p1'}))
+        yield gen.moment
+        assert manager.waiters.count() == 1
+
+        # Changes to other rows don't end the wait
+        manager.idl.change('Port', 'p2')
+        manager.run_callbacks(CHANGES_CB_TYPE)
+        yield gen.moment
+        assert not waiting.done()
+
+        manager.idl.change('Port', 'p1')
+        manager.run_callbacks(CHANGES_CB_TYPE)
+        result = yield waiting
+        raise gen.Return(result)
+
+    assert IOLoop.current().run_sync(wait) == ({'name': 'p2'}, True)
+    assert manager.waiters.count() == 0
+    assert manager.idl.tracked == set()
+
+
+def test_wait_times_out(manager):
+    handler = Handler(manager, Resource('Port'), [{'name': 'p1'}],
+                      timeout='0.01')
+
+    result = IOLoop.current().run_sync(
+        lambda: handler.wait_for_change(None, etag(handler, {'name': 'p1'})))
+
+    assert result == ({'name': 'p1'}, False)
+    assert manager.waiters.count() == 0
+
+
+def test_wait_cancelled_on_close(manager):
+    handler = Handler(manager, Resource('Port', 'p1'), [{'name': 'p1'}])
+
+    @gen.coroutine
+    def wait():
+        waiting = handler.wait_for_change(None, etag(handler, {'name': 'p1'}))
+        yield gen.moment
+        handler.on_connection_close()
+        result = yield waiting
+        raise gen.Return(result)
+
+    assert IOLoop.current().run_sync(wait) == (None, False)
+    assert manager.waiters.count() == 0
+
+
+def test_wait_timeout(manager):
+    assert Handler(manager, None, []).get_wait_timeout() == 30
+    assert Handler(manager, None, [], timeout='5').get_wait_timeout() == 5
+    assert Handler(manager, None, [],
+                   timeout='1000').get_wait_timeout() == 300
+
+    for timeout in ('-1', 'soon'):
+        with pytest.raises(DataValidationFailed):
+            Handler(manager, None, [], timeout=timeout).get_wait_timeout()
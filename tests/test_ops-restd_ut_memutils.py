@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import copy
+import re
+import uuid
+import weakref
+
+import pytest
+
+from opslib.restparser import RESTSchema, is_immutable
+from opsrest import parse
+from opsrest import resolver
+from opsrest.constants import OVSDB_SCHEMA_CONFIG, OVSDB_SCHEMA_STATUS
+from opsrest.notifications.subscription import (
+    CollectionSubscription,
+    RowSubscription
+)
+from opsrest.transaction import OvsdbTransaction
+from opsrest.utils import memutils
+from opsrest.utils import utils
+
+SCHEMA_JSON = {
+    "name": "OpenSwitch",
+    "version": "0.1.8",
+    "tables": {
+        "System": {
+            "isRoot": True,
+            "maxRows": 1,
+            "columns": {
+                "hostname": {"type": {"key": "string", "min": 0},
+                             "category": "configuration"},
+                "vrfs": {"type": {"key": {"type": "uuid",
+                                          "refTable": "VRF"},
+                                  "min": 0, "max": "unlimited"},
+                         "category": "configuration",
+                         "relationship": "1:m"}
+            }
+        },
+        "VRF": {
+            "columns": {
+                "name": {"type": "string",
+                         "category": "configuration"},
+                "ports": {"type": {"key": {"type": "uuid",
+                                           "refTable": "Port"},
+                                   "min": 0, "max": "unlimited"},
+                          "category": "configuration",
+                          "relationship": "1:m"}
+            },
+            "indexes": [["name"]]
+        },
+        "Port": {
+            "columns": {
+                "name": {"type": "string",
+                         "category": "configuration"},
+                "type": {"type": {"key": {"type": "string",
+                                          "enum": ["system", "internal"]}},
+                         "category": {"per-value": [
+                             {"value": "system", "category": "status"},
+                             {"value": "internal",
+                              "category": "configuration"}]}},
+                "mtu": {"type": "integer",
+                        "category": {"follows": "type"}},
+                "link_state": {"type": "string",
+                               "category": "status"},
+                "rx_packets": {"type": "integer",
+                               "category": "statistics"}
+            },
+            "indexes": [["name"]]
+        }
+    }
+}
+
+
+class Row(object):
+    def __init__(self, **columns):
+        self.uuid = uuid.uuid4()
+        self._columns = columns
+
+    def __getattr__(self, column):
+        try:
+            return self.__dict__['_columns'][column]
+        except KeyError:
+            raise AttributeError(column)
+
+
+class Table(object):
+    def __init__(self, *rows):
+        self.rows = dict((row.uuid, row) for row in rows)
+
+
+class Idl(object):
+    def __init__(self):
+        self.txn = None
+        self.change_seqno = 1
+        self.port = Row(name='1', type='system')
+        self.vrf = Row(name='red', ports=[self.port])
+        self.system = Row(vrfs=[self.vrf])
+        self.tables = {'System': Table(self.system),
+                       'VRF': Table(self.vrf),
+                       'Port': Table(self.port)}
+        self.tables['Port'].index_map = {('1',): self.port}
+
+
+@pytest.fixture
+def schema(monkeypatch):
+    # Only the views of this schema are reported
+    monkeypatch.setattr(utils, '_category_views', weakref.WeakKeyDictionary())
+
+    # As loaded by parseSchema, the json is modified while parsed
+    schema = RESTSchema.from_json(copy.deepcopy(SCHEMA_JSON), False)
+    for name, table in schema.ovs_tables.iteritems():
+        table.mutable = not is_immutable(name, schema)
+    return schema
+
+
+def get_report(schema, idl):
+    # "  Name: <bytes> bytes (<count> <what>, ...)" by name
+    report = {}
+    lines = memutils.get_memory_report(schema, idl).splitlines()
+    assert lines[0] == "Memory usage:"
+    for line in lines[1:]:
+        match = re.match(r'  ([^:]+): (\d+) bytes \((.*)\)$', line)
+        assert match, line
+        counts = [int(value.split()[0])
+                  for value in match.group(3).split(', ')]
+        report[match.group(1)] = [int(match.group(2))] + counts
+    return report
+
+
+def test_memory_report(schema):
+    idl = Idl()
+
+    # Fill the caches through the read and write paths, which set the
+    # attributes of the schema and resource objects
+    port_uri = '/rest/v1/system/vrfs/red/ports/1'
+    resource = parse.parse_url_path(port_uri, schema, idl)
+    resource.copy()
+    resolver.get_resolver(schema, idl).resolve(port_uri, idl)
+    utils.update_resource_keys(resource.next.next, schema, idl,
+                               {'name': '1', 'type': 'system'})
+
+    report = get_report(schema, idl)
+    assert sorted(report) == ['Category views', 'Index maps',
+                              'Schema', 'URI resolver cache',
+                              'URI route cache']
+
+    size, tables, columns = report['Schema']
+    assert size > 0
+    assert (tables, columns) == (3, 9)
+    assert report['Index maps'][1] == 1
+
+    size, entries, hits, misses = report['URI route cache']
+    assert size > 0 and entries == 1 and misses == 1
+
+    size, entries, hits, misses = report['URI resolver cache']
+    assert entries == 1 and misses == 1
+
+    size, views = report['Category views']
+    assert size > 0 and views == 1
+
+    for obj in (resource, schema.ovs_tables['Port'],
+                schema.ovs_tables['Port'].config['name'],
+                schema.ovs_tables['VRF'].references['ports']):
+        assert not hasattr(obj, '__dict__')
+
+    keys = resource.next.next.keys
+    assert keys[OVSDB_SCHEMA_STATUS]['mtu'].category.value == \
+        OVSDB_SCHEMA_STATUS
+    assert schema.ovs_tables['Port'].config['mtu'].category.value == \
+        OVSDB_SCHEMA_CONFIG
+
+
+def test_memory_report_without_idl(schema):
+    report = get_report(schema, None)
+
+    assert sorted(report) == ['Category views', 'Schema', 'URI route cache']
+
+
+def test_slotted_attributes_assigned(schema):
+    idl = Idl()
+
+    txn = OvsdbTransaction(idl)
+    txn.status = 'success'
+    txn.abort()
+    assert not hasattr(txn, '__dict__')
+
+    for subscription in (RowSubscription('Port', 'subscriber', 'uri',
+                                         '/rest/v1/system', idl.system),
+                         CollectionSubscription('VRF', 'subscriber', 'uri',
+                                                '/rest/v1/system/vrfs', {})):
+        subscription.policy = None
+        subscription.projection = None
+        subscription.seqno = 1
+        assert not hasattr(subscription, '__dict__')
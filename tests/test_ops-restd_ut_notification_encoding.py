@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+from tornado import gen
+from tornado.ioloop import IOLoop
+
+from opsrest.notifications import encoding
+
+
+def test_encoded_fragments_included_as_is():
+    fragment = encoding.JSONFragment('{"admin_state":"up"}')
+    msg = {'notifications': {'modified': [{'resource': '/1',
+                                           'new_values': fragment}]},
+           'seqno': 1}
+
+    data = encoding.encode(msg)
+    assert '{"admin_state":"up"}' in data
+    assert json.loads(data) == {
+        'notifications': {'modified': [{'resource': '/1',
+                                        'new_values': {'admin_state':
+                                                       'up'}}]},
+        'seqno': 1}
+
+
+def test_encode_plain_values():
+    msg = {'a': [1, 'b', None, (True, 2.5)], 'c': {}}
+    assert json.loads(encoding.encode(msg)) == json.loads(json.dumps(msg))
+
+
+def test_values_encoded_once_per_row_and_columns():
+    calls = []
+
+    @gen.coroutine
+    def get_values(row):
+        calls.append(row)
+        raise gen.Return({'row': row})
+
+    cache = encoding.EncodingCache()
+
+    @gen.coroutine
+    def get_all():
+        fragments = []
+        fragments.append((yield cache.get('Port', 'uuid1', ['a', 'b'], '/1',
+                                          get_values, 'uuid1')))
+        # same columns in another order
+        fragments.append((yield cache.get('Port', 'uuid1', ['b', 'a'], '/1',
+                                          get_values, 'uuid1')))
+        fragments.append((yield cache.get('Port', 'uuid1', None, '/1',
+                                          get_values, 'uuid1')))
+        fragments.append((yield cache.get('Port', 'uuid2', ['a', 'b'], '/2',
+                                          get_values, 'uuid2')))
+        raise gen.Return(fragments)
+
+    fragments = IOLoop.current().run_sync(get_all)
+
+    assert calls == ['uuid1', 'uuid1', 'uuid2']
+    assert fragments[0] is fragments[1]
+    assert isinstance(fragments[0], encoding.JSONFragment)
+    assert json.loads(fragments[3]) == {'row': 'uuid2'}
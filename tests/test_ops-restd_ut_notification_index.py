@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from opsrest.notifications.index import SubscriptionIndex, UriTrie
+from opsrest.notifications.subscription import (
+    CollectionSubscription,
+    RowSubscription
+)
+
+VRFS_URI = '/rest/v1/system/vrfs'
+BGP_URI = VRFS_URI + '/vrf_default/bgp_routers'
+
+
+def collection(name, collection_uri, rows=None):
+    return CollectionSubscription('BGP_Router', 'subscriber', name,
+                                  collection_uri, dict(rows or {}))
+
+
+def segments(uri):
+    return uri.split('/')
+
+
+def test_trie_matches_uri_prefixes():
+    trie = UriTrie()
+    trie.add(segments(VRFS_URI), 'vrfs')
+    trie.add(segments(BGP_URI), 'bgp')
+
+    assert sorted(trie.match(segments(BGP_URI + '/1'))) == ['bgp', 'vrfs']
+    assert trie.match(segments(VRFS_URI + '/red/bgp_routers/1')) == ['vrfs']
+    assert trie.match(segments('/rest/v1/system/interfaces/1')) == []
+
+
+def test_trie_pruned_on_removal():
+    trie = UriTrie()
+    trie.add(segments(VRFS_URI), 'vrfs')
+    trie.add(segments(BGP_URI), 'bgp')
+
+    trie.remove(segments(BGP_URI), 'bgp')
+    assert trie.match(segments(BGP_URI + '/1')) == ['vrfs']
+    assert 'vrf_default' not in \
+        trie.children[''].children['rest'].children['v1'].children[
+            'system'].children['vrfs'].children
+
+    trie.remove(segments(VRFS_URI), 'vrfs')
+    assert trie.is_empty()
+
+
+def test_row_subscriptions_by_row():
+    index = SubscriptionIndex()
+    subscription = RowSubscription('BGP_Router', 'subscriber', 'row',
+                                   BGP_URI + '/1', 'uuid1')
+    index.add(subscription)
+
+    assert index.get_row_subscriptions('BGP_Router', 'uuid1') == \
+        [subscription]
+    assert index.get_row_subscriptions('BGP_Router', 'uuid2') == []
+
+    index.remove(subscription)
+    assert index.get_row_subscriptions('BGP_Router', 'uuid1') == []
+    assert index._row_subscriptions == {}
+
+
+def test_collection_subscriptions():
+    index = SubscriptionIndex()
+    subscription = collection('bgp', BGP_URI, {'uuid1': BGP_URI + '/1'})
+    other = collection('other', VRFS_URI + '/red/bgp_routers')
+    index.add(subscription)
+    index.add(other)
+
+    assert index.has_collections('BGP_Router')
+    assert not index.has_collections('VRF')
+
+    # new rows are matched by URI
+    assert index.match_collections('BGP_Router',
+                                   segments(BGP_URI + '/2')) == \
+        [subscription]
+
+    # deleted rows by the rows each subscription holds
+    assert index.get_collection_subscriptions('BGP_Router', 'uuid1') == \
+        [subscription]
+    index.add_collection_row(other, 'uuid3')
+    assert index.get_collection_subscriptions('BGP_Router', 'uuid3') == \
+        [other]
+    index.remove_collection_row(other, 'uuid3')
+    assert index.get_collection_subscriptions('BGP_Router', 'uuid3') == []
+
+    index.remove(subscription)
+    index.remove(other)
+    assert not index.has_collections('BGP_Router')
+    assert index.get_collection_subscriptions('BGP_Router', 'uuid1') == []
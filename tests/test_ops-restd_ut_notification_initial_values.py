@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import pytest
+from tornado import gen
+from tornado.ioloop import IOLoop
+
+from opsrest.notifications import handler as notifhandler
+from opsrest.notifications.constants import (
+    SUBSCRIPTION_TABLE,
+    UPDATE_TYPE_ADDED,
+    UPDATE_TYPE_SYNC_COMPLETE
+)
+from opsrest.notifications.handler import NotificationHandler
+from opsrest.notifications.subscription import CollectionSubscription
+
+COLLECTION_URI = '/rest/v1/system/interfaces'
+
+
+class Manager(object):
+    def __init__(self):
+        self.idl = None
+        self.curr_seqno = 0
+        self.tracked = []
+
+    def add_callback(self, cb_type, callback):
+        pass
+
+    def track_table(self, table):
+        self.tracked.append(table)
+
+    def untrack_table(self, table):
+        self.tracked.remove(table)
+
+
+class Subscription(CollectionSubscription):
+    __slots__ = ()
+
+    @gen.coroutine
+    def get_initial_values(self, idl, schema, cache=None, row_uuids=None):
+        if row_uuids is None:
+            row_uuids = self.rows_to_uri.keys()
+        raise gen.Return([{'resource': self.rows_to_uri[row_uuid]}
+                          for row_uuid in sorted(row_uuids)])
+
+
+def get_handler(monkeypatch, chunk_size):
+    monkeypatch.setitem(notifhandler.settings,
+                        'notification_initial_chunk_size', chunk_size)
+    handler = NotificationHandler(None, Manager())
+    handler.notified = []
+
+    def notify_subscriber(subscriber_name, changes, idl, record=True):
+        handler.notified.append(changes)
+        return len(handler.notified)
+
+    handler.notify_subscriber = notify_subscriber
+    return handler
+
+
+def subscribe(handler, rows_to_uri):
+    subscription = Subscription('Interface', 'subscriber', 'subscription',
+                                COLLECTION_URI, rows_to_uri)
+    handler.add_subscription('uuid', subscription)
+    IOLoop.current().run_sync(
+        lambda: handler.get_initial_values_and_notify(None, subscription))
+    return subscription
+
+
+@pytest.mark.parametrize('chunk_size', [0, 2])
+def test_empty_collection_sync_complete(monkeypatch, chunk_size):
+    handler = get_handler(monkeypatch, chunk_size)
+    subscribe(handler, {})
+
+    assert handler.notified == [{
+        UPDATE_TYPE_SYNC_COMPLETE: [{'subscription': 'subscription',
+                                     'resource': COLLECTION_URI}]}]
+
+
+def test_initial_values_in_chunks(monkeypatch):
+    handler = get_handler(monkeypatch, 2)
+    rows_to_uri = dict(('uuid%d' % index, '%s/%d' % (COLLECTION_URI, index))
+                       for index in range(3))
+    subscription = subscribe(handler, rows_to_uri)
+
+    assert [len(changes[UPDATE_TYPE_ADDED])
+            for changes in handler.notified] == [2, 1]
+    assert [UPDATE_TYPE_SYNC_COMPLETE in changes
+            for changes in handler.notified] == [False, True]
+    assert subscription.seqno == 2
+
+
+def test_subscription_removed_if_initial_values_fail(monkeypatch):
+    handler = get_handler(monkeypatch, 0)
+    subscription = Subscription('Interface', 'subscriber', 'subscription',
+                                COLLECTION_URI, {})
+
+    class ChangeInfo(object):
+        create_seqno = 1
+
+    class Table(object):
+        rows = {'uuid': None}
+
+    class Idl(object):
+        tables = {SUBSCRIPTION_TABLE: Table()}
+
+        def track_get(self, table):
+            return {'uuid': ChangeInfo()}
+
+    @gen.coroutine
+    def create_subscription(name, row, resource_uri, idl):
+        raise gen.Return(subscription)
+
+    @gen.coroutine
+    def get_initial_values_and_notify(idl, subscription, cache=None):
+        raise Exception('Error getting initial values')
+
+    monkeypatch.setattr(notifhandler.utils, 'get_table_key',
+                        lambda *args: ['subscription'])
+    monkeypatch.setattr(notifhandler.utils, 'get_column_data_from_row',
+                        lambda *args: COLLECTION_URI)
+    handler.create_subscription = create_subscription
+    handler.get_initial_values_and_notify = get_initial_values_and_notify
+
+    IOLoop.current().run_sync(
+        lambda: handler.subscription_changes_check_callback(handler._manager,
+                                                            Idl()))
+
+    assert handler._subscriptions == {}
+    assert handler._subscriptions_by_uri == {}
+    assert not handler._index.has_collections('Interface')
+    assert handler._manager.tracked == [SUBSCRIPTION_TABLE]
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+import pytest
+from tornado.concurrent import Future
+
+from opsrest.notifications.connection import NotificationConnection
+from opsrest.notifications.constants import (
+    NOTIF_NEW_VALUES_FIELD,
+    UPDATE_TYPE_ADDED,
+    UPDATE_TYPE_DELETED,
+    UPDATE_TYPE_MODIFIED,
+    WS_OVERFLOW_MERGE
+)
+from opsrest.notifications.encoding import JSONFragment
+from opsrest.notifications.policy import (
+    DeliveryPolicy,
+    PendingUpdates,
+    split_resource_uri
+)
+from opsrest.notifications.subscription import (
+    construct_added_msg,
+    construct_deleted_msg,
+    construct_modified_msg
+)
+
+SUBSCRIPTION_URI = '/rest/v1/system/notification_subscribers/s/' \
+    'notification_subscriptions/1'
+RESOURCE_URI = '/rest/v1/system/interfaces/1'
+
+
+def modified(values, resource_uri=RESOURCE_URI):
+    return construct_modified_msg(SUBSCRIPTION_URI, resource_uri, values)
+
+
+def test_split_resource_uri():
+    (uri, policy, projection) = split_resource_uri(RESOURCE_URI)
+    assert uri == RESOURCE_URI
+    assert policy.is_immediate()
+    assert projection is None
+
+    (uri, policy, projection) = split_resource_uri(
+        RESOURCE_URI + '?min_interval=1000&max_batch=10&coalesce=true')
+    assert uri == RESOURCE_URI
+    assert (policy.min_interval, policy.max_batch, policy.coalesce) == \
+        (1000, 10, True)
+    assert not policy.is_immediate()
+
+
+def test_invalid_delivery_policies():
+    for arguments in ('min_interval=-1', 'max_batch=x', 'coalesce=yes',
+                      'unknown=1'):
+        with pytest.raises(ValueError):
+            split_resource_uri(RESOURCE_URI + '?' + arguments)
+
+
+def test_max_batch():
+    pending = PendingUpdates(DeliveryPolicy(max_batch=2))
+    for index in range(3):
+        pending.add(UPDATE_TYPE_ADDED,
+                    construct_added_msg(SUBSCRIPTION_URI, str(index), {}))
+
+    assert len(pending.take(0)) == 2
+    assert len(pending.take(0)) == 1
+    assert pending.take(0) == []
+
+
+def test_min_interval():
+    pending = PendingUpdates(DeliveryPolicy(min_interval=500))
+    assert pending.get_delay(10.0) is None
+
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'a': 1}), ['a'])
+    assert pending.get_delay(10.0) == 0
+    pending.take(10.0)
+
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'a': 2}), ['a'])
+    assert pending.get_delay(10.25) == pytest.approx(0.25)
+    assert pending.get_delay(11.0) == 0
+
+
+def test_coalesced_modifications():
+    pending = PendingUpdates(DeliveryPolicy(coalesce=True))
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'a': 1, 'b': 1}),
+                ['a', 'b'])
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'b': 2}), ['b'])
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'a': 3, 'b': 3}),
+                ['a', 'b'])
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'c': 1}, '/other'), ['c'])
+
+    updates = pending.take(0)
+    assert [update[NOTIF_NEW_VALUES_FIELD] for (update_type, update)
+            in updates] == [{'a': 3, 'b': 3}, {'c': 1}]
+
+
+def test_coalesced_modifications_keep_earlier_columns():
+    pending = PendingUpdates(DeliveryPolicy(coalesce=True))
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'a': 1}), ['a'])
+    pending.add(UPDATE_TYPE_MODIFIED, modified('{"b": 2}'), ['b'])
+
+    [(update_type, update)] = pending.take(0)
+    assert update_type == UPDATE_TYPE_MODIFIED
+    assert update[NOTIF_NEW_VALUES_FIELD] == {'a': 1, 'b': 2}
+
+
+def test_deletion_drops_coalesced_modifications():
+    pending = PendingUpdates(DeliveryPolicy(coalesce=True))
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'a': 1}), ['a'])
+    pending.add(UPDATE_TYPE_DELETED,
+                construct_deleted_msg(SUBSCRIPTION_URI, RESOURCE_URI))
+
+    assert [update_type for (update_type, update) in pending.take(0)] == \
+        [UPDATE_TYPE_DELETED]
+
+
+def test_coalesced_modifications_with_unknown_columns():
+    pending = PendingUpdates(DeliveryPolicy(coalesce=True))
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'a': 1}))
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'b': 2}))
+    pending.add(UPDATE_TYPE_MODIFIED, modified({'a': 3}), ['a'])
+
+    [(update_type, update)] = pending.take(0)
+    assert update[NOTIF_NEW_VALUES_FIELD] == {'a': 3, 'b': 2}
+
+
+class Connection(NotificationConnection):
+    def __init__(self, overflow_policy):
+        self.id = 'subscriber'
+        self.init_notifications(max_bytes_in_flight=1,
+                                max_queued_updates=10,
+                                overflow_policy=overflow_policy,
+                                grace_period=0)
+        self.sent = []
+
+    def send_notification_data(self, data, seqno):
+        self.sent.append(json.loads(data))
+        # never written, later notifications are queued
+        return Future()
+
+
+def test_merged_connection_queue_keeps_all_columns():
+    connection = Connection(WS_OVERFLOW_MERGE)
+    connection.queue_notification({UPDATE_TYPE_ADDED: []}, 1)
+    connection.queue_notification(
+        {UPDATE_TYPE_MODIFIED: [modified({'a': 1})]}, 2)
+    connection.queue_notification(
+        {UPDATE_TYPE_MODIFIED: [modified(JSONFragment('{"b": 2}'))]}, 3)
+
+    assert connection.stats.updates_merged == 1
+    [(update_type, update)] = connection.pending.take(0)
+    assert update[NOTIF_NEW_VALUES_FIELD] == {'a': 1, 'b': 2}
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import pytest
+from tornado import gen
+from tornado.ioloop import IOLoop
+
+from opsrest.notifications.constants import NOTIF_NEW_VALUES_FIELD
+from opsrest.notifications.policy import split_resource_uri
+from opsrest.notifications.projection import Projection
+from opsrest.notifications.subscription import RowSubscription
+
+RESOURCE_URI = '/rest/v1/system/interfaces/1'
+
+
+def test_projection_from_argument():
+    projection = Projection.from_argument(
+        'link_state, statistics.rx_packets,statistics.tx_packets')
+
+    assert projection.columns == {
+        'link_state': None,
+        'statistics': frozenset(['rx_packets', 'tx_packets'])}
+    assert projection.has_keys()
+    assert projection.key == \
+        Projection.from_argument('statistics.tx_packets,'
+                                 'statistics.rx_packets,link_state').key
+
+    # A whole column includes all its keys
+    projection = Projection.from_argument('statistics,statistics.rx_packets')
+    assert projection.columns == {'statistics': None}
+    assert not projection.has_keys()
+
+    with pytest.raises(ValueError):
+        Projection.from_argument(' , ')
+
+
+def test_projection_from_resource_uri():
+    (uri, policy, projection) = split_resource_uri(
+        RESOURCE_URI + '?columns=link_state&coalesce=true')
+
+    assert uri == RESOURCE_URI
+    assert policy.coalesce
+    assert projection.columns == {'link_state': None}
+
+
+def test_apply_projection():
+    projection = Projection.from_argument('link_state,statistics.rx_packets')
+    values = {'link_state': 'up', 'admin_state': 'up',
+              'statistics': {'rx_packets': 1, 'tx_packets': 2}}
+
+    assert projection.apply(values) == {'link_state': 'up',
+                                        'statistics': {'rx_packets': 1}}
+    assert projection.get_changed_columns(['admin_state', 'statistics']) == \
+        ['statistics']
+
+
+def test_modifications_of_unprojected_keys_not_notified(monkeypatch):
+    values = {'statistics': {'rx_packets': 1, 'tx_packets': 1}}
+
+    @gen.coroutine
+    def get_columns_to_values(subscription, columns, idl, schema):
+        raise gen.Return(dict((column, values[column]) for column in columns))
+
+    monkeypatch.setattr(RowSubscription, 'get_columns_to_values',
+                        get_columns_to_values)
+
+    subscription = RowSubscription('Interface', 'subscriber', 'subscription',
+                                   RESOURCE_URI, 'row')
+    subscription.projection = Projection.from_argument(
+        'statistics.rx_packets')
+
+    def get_modified():
+        return IOLoop.current().run_sync(
+            lambda: subscription.get_modified(['statistics'], None, None))
+
+    modified = get_modified()
+    assert modified[NOTIF_NEW_VALUES_FIELD] == \
+        {'statistics': {'rx_packets': 1}}
+
+    values['statistics'] = {'rx_packets': 1, 'tx_packets': 2}
+    assert get_modified() is None
+
+    values['statistics'] = {'rx_packets': 2, 'tx_packets': 2}
+    assert get_modified()[NOTIF_NEW_VALUES_FIELD] == \
+        {'statistics': {'rx_packets': 2}}
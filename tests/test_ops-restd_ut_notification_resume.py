@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import pytest
+from tornado.ioloop import IOLoop
+
+from opsrest.notifications.connection import NotificationConnection
+from opsrest.notifications.constants import (
+    NOTIF_SUBSCRIPTION_FIELD,
+    SUBSCRIBER_TABLE,
+    UPDATE_TYPE_MODIFIED,
+    WS_OVERFLOW_MERGE
+)
+from opsrest.notifications.replay import ReplayBuffer
+
+
+class Idl(object):
+    def __init__(self):
+        self.subscribers = set()
+
+    def index_to_row_lookup(self, index_values, table):
+        assert table == SUBSCRIBER_TABLE
+        return index_values[0] in self.subscribers or None
+
+
+class Connection(NotificationConnection):
+    def __init__(self, idl, name, user, resumable=True):
+        self.idl = idl
+        self.id = name
+        self.user = user
+        self.removed = False
+        self.init_notifications(max_bytes_in_flight=1024,
+                                max_queued_updates=10,
+                                overflow_policy=WS_OVERFLOW_MERGE,
+                                grace_period=60)
+        self.resumable = resumable
+
+    def get_current_user(self):
+        return self.user
+
+    def remove_subscriber(self):
+        self.removed = True
+
+
+@pytest.fixture
+def idl(monkeypatch):
+    monkeypatch.setattr(NotificationConnection, 'connections', {})
+    monkeypatch.setattr(NotificationConnection, 'detached', {})
+    idl = Idl()
+    idl.subscribers.add('subscriber')
+    yield idl
+
+    for (timeout, owner) in NotificationConnection.detached.itervalues():
+        IOLoop.current().remove_timeout(timeout)
+
+
+def test_subscriber_resumed_by_its_user(idl):
+    connection = Connection(idl, 'subscriber', 'admin')
+    connection.attach()
+    connection.detach()
+    assert 'subscriber' in NotificationConnection.detached
+    assert not connection.removed
+
+    resuming = Connection(idl, 'new', 'admin')
+    resuming.attach()
+    assert resuming.take_over('subscriber')
+    assert resuming.id == 'subscriber'
+    assert NotificationConnection.connections == {'subscriber': resuming}
+    assert NotificationConnection.detached == {}
+
+
+def test_subscriber_not_resumed_by_another_user(idl):
+    connection = Connection(idl, 'subscriber', 'admin')
+    connection.attach()
+    connection.detach()
+
+    resuming = Connection(idl, 'new', 'netop')
+    resuming.attach()
+    assert not resuming.take_over('subscriber')
+    assert resuming.id == 'new'
+    # still resumable by its user
+    assert 'subscriber' in NotificationConnection.detached
+
+
+def test_unknown_or_removed_subscriber_not_resumed(idl):
+    resuming = Connection(idl, 'new', 'admin')
+    assert not resuming.take_over('subscriber')
+
+    connection = Connection(idl, 'subscriber', 'admin')
+    connection.attach()
+    connection.detach()
+    idl.subscribers.discard('subscriber')
+    assert not resuming.take_over('subscriber')
+
+
+def test_subscriber_not_resumable_removed_on_close(idl):
+    connection = Connection(idl, 'subscriber', 'admin', resumable=False)
+    connection.attach()
+    connection.detach()
+
+    assert connection.removed
+    assert NotificationConnection.detached == {}
+    assert NotificationConnection.connections == {}
+
+
+def test_replay_buffer():
+    buffer = ReplayBuffer(3)
+    for seqno in (1, 2, 3):
+        buffer.add(seqno, 'subscriber', UPDATE_TYPE_MODIFIED,
+                   {NOTIF_SUBSCRIPTION_FIELD: 'subscription'})
+    buffer.add(3, 'other', UPDATE_TYPE_MODIFIED,
+               {NOTIF_SUBSCRIPTION_FIELD: 'subscription'})
+
+    # the update of seqno 1 was dropped
+    assert not buffer.can_replay(0)
+    assert buffer.can_replay(1)
+    assert [seqno for (seqno, update_type, update) in
+            buffer.get_updates('subscriber', set(['subscription']), 1)] == \
+        [2, 3]
+    assert buffer.get_updates('subscriber', set(['other']), 1) == []
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+
+import pytest
+from tornado import gen
+from tornado.ioloop import IOLoop
+from tornado.locks import Event
+
+from opsrest.constants import HTTP_HEADER_LAST_EVENT_ID
+from opsrest.handlers.notifications import SSENotificationsHandler
+from opsrest.notifications.connection import NotificationConnection
+from opsrest.notifications.constants import (
+    SUBSCRIBER_TABLE,
+    SUBSCRIBER_TABLE_LOWER,
+    SUBSCRIBER_TYPE_WS,
+    WS_OVERFLOW_MERGE,
+    WS_RESOURCE_URI
+)
+
+
+class Request(object):
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class Application(object):
+    def __init__(self):
+        self.settings = {}
+
+
+class TableSchema(object):
+    plural_name = 'notification_subscribers'
+
+
+class Schema(object):
+    def __init__(self):
+        self.ovs_tables = {SUBSCRIBER_TABLE: TableSchema()}
+
+
+class Idl(object):
+    def index_to_row_lookup(self, index_values, table):
+        return None
+
+
+class Handler(SSENotificationsHandler):
+    def __init__(self, headers=None):
+        # The tornado request handler isn't initialized, only what the
+        # stream uses is set up
+        self.request = Request(headers or {})
+        self.application = Application()
+        self.idl = Idl()
+        self.schema = Schema()
+        self.id = None
+        self.closed = Event()
+        self.keepalive = None
+        self.streaming = False
+        self.init_notifications(max_bytes_in_flight=1024,
+                                max_queued_updates=10,
+                                overflow_policy=WS_OVERFLOW_MERGE,
+                                grace_period=60)
+        self.resumable = True
+
+        self.added = []
+        self.removed = False
+        self.written = []
+
+    def get_query_argument(self, name, default=None):
+        return default
+
+    def get_current_user(self):
+        return 'admin'
+
+    @gen.coroutine
+    def add_subscriber(self, subscriber_type):
+        self.added.append(subscriber_type)
+        raise gen.Return(True)
+
+    def remove_subscriber(self):
+        self.removed = True
+
+    def set_header(self, name, value):
+        pass
+
+    def write(self, data):
+        self.written.append(data)
+
+    def flush(self):
+        return None
+
+
+@pytest.fixture(autouse=True)
+def connections(monkeypatch):
+    monkeypatch.setattr(NotificationConnection, 'connections', {})
+    monkeypatch.setattr(NotificationConnection, 'detached', {})
+
+
+def test_last_event_id():
+    handler = Handler({HTTP_HEADER_LAST_EVENT_ID: 'subscriber:42'})
+    assert handler._get_last_event_id() == ('subscriber', 42)
+
+    # No notification received yet
+    handler = Handler({HTTP_HEADER_LAST_EVENT_ID: 'subscriber:'})
+    assert handler._get_last_event_id() == ('subscriber', None)
+
+    handler = Handler({HTTP_HEADER_LAST_EVENT_ID: 'subscriber'})
+    assert handler._get_last_event_id() == (None, None)
+
+    assert Handler()._get_last_event_id() == (None, None)
+
+
+def test_event_id():
+    handler = Handler()
+    handler.id = 'subscriber'
+
+    assert handler._get_event_id(42) == 'subscriber:42'
+    assert handler._get_event_id(None) == 'subscriber:'
+
+
+def test_stream_adds_connection_subscriber():
+    handler = Handler()
+
+    @gen.coroutine
+    def stream():
+        streaming = handler.get()
+        yield gen.moment
+
+        assert NotificationConnection.connections == {handler.id: handler}
+        handler.on_connection_close()
+        yield streaming
+
+    IOLoop.current().run_sync(stream)
+
+    # The subscriber has a type the database schema accepts
+    assert handler.added == [SUBSCRIBER_TYPE_WS]
+    assert handler.removed
+    assert NotificationConnection.connections == {}
+
+    assert handler.written[0] == 'id: %s:\n' % handler.id
+    data = json.loads(handler.written[1][len('data: '):])
+    assert data[SUBSCRIBER_TABLE_LOWER][WS_RESOURCE_URI].endswith(
+        '/notification_subscribers/' + handler.id)
+
+
+def test_transport():
+    assert SSENotificationsHandler.transport == 'sse'
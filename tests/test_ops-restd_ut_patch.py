@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import jsonpatch
+
+from opsrest import patch
+from opsrest.constants import (
+    OVSDB_SCHEMA_CHILD,
+    OVSDB_SCHEMA_CONFIG,
+    OVSDB_SCHEMA_PARENT,
+    OVSDB_SCHEMA_REFERENCE,
+    OVSDB_SCHEMA_STATUS
+)
+
+
+class Column(object):
+    def __init__(self, is_optional=False):
+        self.is_optional = is_optional
+
+
+class Reference(object):
+    def __init__(self, category, relation=OVSDB_SCHEMA_CHILD):
+        self.category = category
+        self.relation = relation
+
+
+class TableSchema(object):
+    def __init__(self):
+        self.config = {'name': Column(), 'description': Column(True)}
+
+
+class Schema(object):
+    def __init__(self):
+        self.ovs_tables = {'Port': TableSchema()}
+
+
+class Resource(object):
+    def __init__(self):
+        self.table = 'Port'
+        self.keys = {
+            OVSDB_SCHEMA_CONFIG: Schema().ovs_tables['Port'].config,
+            OVSDB_SCHEMA_REFERENCE: {
+                'interfaces': Reference(OVSDB_SCHEMA_CONFIG),
+                'vrf': Reference(OVSDB_SCHEMA_CONFIG, OVSDB_SCHEMA_PARENT),
+                'qos': Reference(OVSDB_SCHEMA_STATUS)
+            }
+        }
+
+
+def test_merge_patch():
+    target = {'a': 'b', 'c': {'d': 'e', 'f': 'g'}}
+    patched = patch.merge_patch(target, {'a': 'z', 'c': {'f': None}})
+
+    assert patched == {'a': 'z', 'c': {'d': 'e'}}
+    # The target is left as is
+    assert target == {'a': 'b', 'c': {'d': 'e', 'f': 'g'}}
+
+    assert patch.merge_patch({'a': ['b']}, {'a': ['c']}) == {'a': ['c']}
+    assert patch.merge_patch({'a': 'b'}, {'b': None}) == {'a': 'b'}
+    assert patch.merge_patch({'a': 'b'}, ['c']) == ['c']
+
+
+def test_merge_patch_columns():
+    resource = Resource()
+
+    assert patch.get_merge_patch_columns({'name': 'p1',
+                                          'interfaces': []},
+                                         resource) == \
+        set(['name', 'interfaces'])
+
+
+def test_merge_patch_non_patchable_columns_use_whole_row():
+    resource = Resource()
+
+    assert patch.get_merge_patch_columns({'name': 'p1', 'vrf': None},
+                                         resource) is None
+    assert patch.get_merge_patch_columns({'qos': 'q'}, resource) is None
+    assert patch.get_merge_patch_columns({'unknown': 1}, resource) is None
+
+
+def test_merge_removed_columns():
+    resource = Resource()
+
+    removed = patch.get_merge_removed_columns({'name': 'p1',
+                                               'description': None,
+                                               'unknown': None},
+                                              resource)
+    assert removed == ['description']
+
+
+def test_empty_optional_columns_removed_after_patching():
+    resource = Resource()
+    schema = Schema()
+    row_json = {'name': 'p1', 'description': 'd'}
+
+    patched = patch.apply_merge_patch({'description': []}, row_json,
+                                      resource, schema)
+    assert patched == {'name': 'p1'}
+
+    json_patch = jsonpatch.JsonPatch([{'op': 'replace',
+                                       'path': '/description',
+                                       'value': []}])
+    patched = patch.apply_patch(json_patch, row_json, resource, schema)
+    assert patched == {'name': 'p1'}
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import uuid
+
+from opsrest.resolver import UriResolver
+
+
+class TableSchema(object):
+    def __init__(self, index_columns):
+        self.index_columns = index_columns
+        self.references = {}
+
+
+class Schema(object):
+    def __init__(self):
+        self.ovs_tables = {'VLAN': TableSchema(['id'])}
+
+
+class Row(object):
+    def __init__(self, vlan_id):
+        self.uuid = uuid.uuid4()
+        self.id = vlan_id
+
+
+class Table(object):
+    def __init__(self):
+        self.rows = {}
+
+
+class Idl(object):
+    def __init__(self):
+        self.change_seqno = 1
+        self.tables = {'VLAN': Table()}
+        self.lookups = 0
+
+    def insert(self, vlan_id):
+        row = Row(vlan_id)
+        self.tables['VLAN'].rows[row.uuid] = row
+        return row
+
+    def delete(self, row):
+        del self.tables['VLAN'].rows[row.uuid]
+
+    def index_to_row_lookup(self, index_values, table):
+        self.lookups += 1
+        for row in self.tables[table].rows.itervalues():
+            if [str(row.id)] == index_values:
+                return row
+        return None
+
+
+def test_index_to_row_is_cached():
+    idl = Idl()
+    row = idl.insert(10)
+    resolver = UriResolver(Schema())
+
+    assert resolver.index_to_row('10', 'VLAN', idl) is row
+    assert resolver.index_to_row('10', 'VLAN', idl) is row
+    assert idl.lookups == 1
+
+
+def test_index_to_row_cache_reset_on_seqno_change():
+    idl = Idl()
+    row = idl.insert(10)
+    resolver = UriResolver(Schema())
+
+    assert resolver.index_to_row('10', 'VLAN', idl) is row
+    idl.change_seqno += 1
+    assert resolver.index_to_row('10', 'VLAN', idl) is row
+    assert idl.lookups == 2
+
+
+def test_index_to_row_deleted_in_transaction():
+    idl = Idl()
+    row = idl.insert(10)
+    resolver = UriResolver(Schema())
+
+    assert resolver.index_to_row('10', 'VLAN', idl) is row
+
+    # Rows deleted by the transaction in progress leave the seqno as is
+    idl.delete(row)
+    assert resolver.index_to_row('10', 'VLAN', idl) is None
+
+
+def test_index_to_row_recreated_in_transaction():
+    idl = Idl()
+    row = idl.insert(10)
+    resolver = UriResolver(Schema())
+
+    assert resolver.index_to_row('10', 'VLAN', idl) is row
+
+    idl.delete(row)
+    new_row = idl.insert(10)
+    assert resolver.index_to_row('10', 'VLAN', idl) is new_row
+    assert resolver.index_to_row('10', 'VLAN', idl) is new_row
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import json
+import uuid
+
+import pytest
+
+from ops import cfgd, _startup
+
+CONFIG = {'System': {'hostname': 'switch'}}
+
+
+class Row(object):
+    def __init__(self, row_type, config):
+        self.uuid = uuid.uuid4()
+        self._columns = {'type': row_type, 'config': config}
+
+    def __getattr__(self, column):
+        try:
+            return self.__dict__['_columns'][column]
+        except KeyError:
+            raise AttributeError(column)
+
+
+class Table(object):
+    def __init__(self, *rows):
+        self.rows = dict((row.uuid, row) for row in rows)
+
+
+class Idl(object):
+    def __init__(self, *rows):
+        self.tables = {'config': Table(*rows)}
+
+
+def corrupt(data):
+    # change the stored digest, the payload still decodes
+    fields = data.split(_startup.HEADER_SEPARATOR)
+    fields[4] = '0' * len(fields[4])
+    return _startup.HEADER_SEPARATOR.join(fields)
+
+
+def test_iter_config():
+    config = _startup.StoredConfig(_startup.encode(CONFIG,
+                                                   _startup.CODEC_ZLIB, 1))
+
+    assert json.loads(''.join(cfgd.iter_config(config, 8))) == CONFIG
+
+
+def test_corrupted_config_raises_before_streaming():
+    data = corrupt(_startup.encode(CONFIG, _startup.CODEC_ZLIB, 1))
+    config = _startup.StoredConfig(data)
+
+    with pytest.raises(ValueError):
+        cfgd.iter_config(config, 8)
+
+
+def test_unreadable_history_rows_skipped(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(cfgd.vlog, 'warn', warnings.append)
+
+    delta = _startup.encode([], _startup.CODEC_ZLIB_DELTA, 1)
+    idl = Idl(Row(cfgd.HISTORY_TYPE, delta),
+              Row(cfgd.HISTORY_TYPE, 'opscfg:1:zlib:1:0:'))
+
+    history = cfgd.get_history_rows(idl)
+    assert [entry[0].version for entry in history] == [1]
+    assert len(warnings) == 1
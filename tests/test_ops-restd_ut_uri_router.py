@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import uuid
+
+from opsrest import parse
+from opsrest.constants import (
+    OVSDB_SCHEMA_CHILD,
+    OVSDB_SCHEMA_TOP_LEVEL
+)
+
+
+class Reference(object):
+    def __init__(self, ref_table, n_max):
+        self.ref_table = ref_table
+        self.n_max = n_max
+        self.kv_type = False
+        self.relation = OVSDB_SCHEMA_CHILD
+
+
+class TableSchema(object):
+    def __init__(self, indexes, parent=None, references=None):
+        self.indexes = indexes
+        self.parent = parent
+        self.references = references or {}
+        self.children = self.references.keys()
+        self.columns = self.references.keys()
+        self.config = {}
+        self.status = {}
+        self.stats = {}
+
+
+class Schema(object):
+    def __init__(self):
+        self.ovs_tables = {
+            'System': TableSchema(['uuid'], references={
+                'vrfs': Reference('VRF', 1024)}),
+            'VRF': TableSchema(['name'], parent='System'),
+            'Interface': TableSchema(['name'])
+        }
+        self.plural_name_map = {'vrfs': 'VRF', 'interfaces': 'Interface'}
+
+
+class Row(object):
+    def __init__(self, **columns):
+        self.uuid = uuid.uuid4()
+        self._columns = columns
+
+    def __getattr__(self, column):
+        try:
+            return self.__dict__['_columns'][column]
+        except KeyError:
+            raise AttributeError(column)
+
+
+class Table(object):
+    def __init__(self, *rows):
+        self.rows = dict((row.uuid, row) for row in rows)
+
+
+class Idl(object):
+    def __init__(self):
+        self.change_seqno = 1
+        self.interface = Row(name='1')
+        self.vrf = Row(name='vrf_default')
+        self.system = Row(vrfs=[self.vrf])
+        self.tables = {
+            'System': Table(self.system),
+            'VRF': Table(self.vrf),
+            'Interface': Table(self.interface)
+        }
+
+
+def test_routes_compiled_from_schema():
+    router = parse.UriRouter(Schema())
+
+    route = router.routes['System']['vrfs']
+    assert route.table == 'VRF'
+    assert route.relation == OVSDB_SCHEMA_CHILD
+    assert route.column == 'vrfs'
+    assert route.n_max == 1024
+    assert route.indexes == ['name']
+
+    route = router.routes['System']['interfaces']
+    assert route.table == 'Interface'
+    assert route.relation == OVSDB_SCHEMA_TOP_LEVEL
+    assert route.indexes == ['name']
+
+    # Top level tables are only reachable from System
+    assert 'interfaces' not in router.routes['VRF']
+    assert router.routes['Interface'] == {}
+
+
+def test_parse_url_path():
+    schema = Schema()
+    idl = Idl()
+
+    resource = parse.parse_url_path('/rest/v1/system/interfaces/1', schema,
+                                    idl)
+    assert resource.table == 'System'
+    assert resource.row == idl.system.uuid
+    assert resource.relation == OVSDB_SCHEMA_TOP_LEVEL
+    assert resource.next.table == 'Interface'
+    assert resource.next.row == idl.interface.uuid
+    assert resource.next.index == ['1']
+
+    resource = parse.parse_url_path('/rest/v1/system/vrfs/vrf_default',
+                                    schema, idl)
+    assert resource.relation == OVSDB_SCHEMA_CHILD
+    assert resource.column == 'vrfs'
+    assert resource.next.row == idl.vrf.uuid
+
+    assert parse.parse_url_path('/rest/v1/system/interfaces/2', schema,
+                                idl) is None
+    assert parse.parse_url_path('/rest/v1/system/fans', schema,
+                                idl) is None
+
+
+def test_resolved_path_cached():
+    schema = Schema()
+    idl = Idl()
+    router = parse.get_router(schema)
+    path = '/rest/v1/system/interfaces/1'
+
+    first = parse.parse_url_path(path, schema, idl)
+    assert (router.hits, router.misses) == (0, 1)
+
+    second = parse.parse_url_path(path, schema, idl)
+    assert (router.hits, router.misses) == (1, 1)
+    assert second.next.row == first.next.row
+
+    # Callers get copies they can modify
+    assert second is not first and second.next is not first.next
+    second.next.row = None
+    assert parse.parse_url_path(path, schema, idl).next.row == \
+        idl.interface.uuid
+
+
+def test_cache_invalidated_on_seqno_change():
+    schema = Schema()
+    idl = Idl()
+    router = parse.get_router(schema)
+    path = '/rest/v1/system/interfaces/1'
+
+    assert parse.parse_url_path(path, schema, idl) is not None
+
+    del idl.tables['Interface'].rows[idl.interface.uuid]
+    idl.change_seqno += 1
+
+    assert parse.parse_url_path(path, schema, idl) is None
+    assert router.misses == 2
+
+
+def test_cache_evicts_least_recently_used():
+    schema = Schema()
+    idl = Idl()
+    router = parse.UriRouter(schema, cache_size=2)
+    resource = parse.parse_url_path('/rest/v1/system', schema, idl)
+
+    router.store('a', idl, resource)
+    router.store('b', idl, resource)
+    assert router.lookup('a', idl) is not None
+    router.store('c', idl, resource)
+
+    assert router.lookup('b', idl) is None
+    assert router.lookup('a', idl) is not None
+    assert router.lookup('c', idl) is not None
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import pytest
+
+from opsrest.constants import (
+    REQUEST_TYPE_CREATE,
+    REQUEST_TYPE_DELETE,
+    REQUEST_TYPE_UPDATE
+)
+from opsvalidator import validator
+from opsvalidator.base import BaseValidator
+from opsvalidator.error import ValidationError, VERIFICATION_FAILED
+from ops.validatoradapter import ValidatorAdapter
+
+
+class Schema(object):
+    def __init__(self):
+        self.ovs_tables = {'Port': None, 'VLAN': None}
+
+
+class Table(object):
+    def __init__(self):
+        self.rows = {}
+
+
+class Idl(object):
+    def __init__(self):
+        self.tables = {'Port': Table(), 'VLAN': Table()}
+
+
+class Row(object):
+    def __init__(self, name):
+        self.name = name
+        self.deleted = False
+
+    def delete(self):
+        self.deleted = True
+
+
+class RowValidator(BaseValidator):
+    # no resource, registered by the tests only
+    def __init__(self):
+        self.calls = []
+
+    def validate_modification(self, validation_args):
+        self.calls.append(([validation_args.resource_row.name],
+                           validation_args.is_new))
+        if validation_args.resource_row.name == 'invalid':
+            raise ValidationError(VERIFICATION_FAILED, 'invalid row')
+
+    def validate_deletion(self, validation_args):
+        self.calls.append(('delete', validation_args.resource_row.name))
+
+
+class BatchValidator(RowValidator):
+    def validate_modifications(self, batch):
+        self.calls.append(([args.resource_row.name for args in batch],
+                           batch[0].is_new))
+
+
+@pytest.fixture
+def validators(monkeypatch):
+    registered = {}
+    monkeypatch.setattr(validator, 'g_validators', registered)
+    monkeypatch.setattr(validator, 'g_dispatch', {})
+    monkeypatch.setattr(validator, 'g_stats', {})
+    return registered
+
+
+def rows(*names):
+    return [(Row(name), None, None) for name in names]
+
+
+def test_batch_validators_get_all_rows_at_once(validators):
+    batch_validator = BatchValidator()
+    row_validator = RowValidator()
+    validators['port'] = [batch_validator, row_validator]
+
+    validator.exec_validators_batch(Idl(), Schema(), 'Port',
+                                    REQUEST_TYPE_CREATE,
+                                    rows('1', '2', '3'))
+
+    assert batch_validator.calls == [(['1', '2', '3'], True)]
+    assert row_validator.calls == [(['1'], True), (['2'], True),
+                                   (['3'], True)]
+    assert validator.get_stats()['RowValidator']['rows'] == 3
+
+
+def test_batch_deletions_validated_one_row_at_a_time(validators):
+    batch_validator = BatchValidator()
+    validators['port'] = [batch_validator]
+
+    validator.exec_validators_batch(Idl(), Schema(), 'Port',
+                                    REQUEST_TYPE_DELETE, rows('1', '2'))
+
+    assert batch_validator.calls == [('delete', '1'), ('delete', '2')]
+
+
+def test_batch_errors_collected(validators):
+    row_validator = RowValidator()
+    validators['port'] = [row_validator]
+    errors = []
+
+    validator.exec_validators_batch(Idl(), Schema(), 'Port',
+                                    REQUEST_TYPE_UPDATE,
+                                    rows('invalid', '2'), errors)
+
+    # the remaining rows are still validated
+    assert len(row_validator.calls) == 2
+    assert [error['details'] for error in errors] == ['invalid row']
+
+    with pytest.raises(ValidationError):
+        validator.exec_validators_batch(Idl(), Schema(), 'Port',
+                                        REQUEST_TYPE_UPDATE,
+                                        rows('invalid', '2'))
+
+
+def test_tables_without_validators_skipped(validators):
+    validator.exec_validators_batch(Idl(), Schema(), 'VLAN',
+                                    REQUEST_TYPE_CREATE, rows('1'))
+
+    assert validator.get_stats() == {}
+
+
+def test_adapter_validates_modifications_by_table(validators, monkeypatch):
+    monkeypatch.setattr(validator, 'init_plugins', lambda plugin_dir: None)
+    port_validator = BatchValidator()
+    vlan_validator = RowValidator()
+    validators['port'] = [port_validator]
+    validators['vlan'] = [vlan_validator]
+
+    adapter = ValidatorAdapter(Schema(), Idl())
+    deleted = Row('3')
+    adapter.add_resource_op(REQUEST_TYPE_CREATE, Row('1'), 'Port')
+    adapter.add_resource_op(REQUEST_TYPE_CREATE, Row('10'), 'VLAN')
+    adapter.add_resource_op(REQUEST_TYPE_CREATE, Row('2'), 'Port')
+    adapter.add_resource_op(REQUEST_TYPE_UPDATE, Row('invalid'), 'VLAN')
+    adapter.add_resource_op(REQUEST_TYPE_DELETE, deleted, 'Port')
+    adapter.exec_validators_with_ops()
+
+    assert port_validator.calls == [('delete', '3'), (['1', '2'], True)]
+    assert vlan_validator.calls == [(['10'], True), (['invalid'], False)]
+    assert deleted.deleted
+    assert adapter.has_errors()
+    assert len(adapter.errors) == 1
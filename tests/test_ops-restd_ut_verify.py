@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2016 Hewlett Packard Enterprise Development LP
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import pytest
+from ovs.db import types
+
+from opslib.restparser import OVSColumn
+from opsrest.exceptions import DataValidationFailed
+from opsrest.verify import compile_column_validator
+
+# Error messages are those of verify_attribute_type and
+# verify_attribute_range, which clients parse
+
+SPEED = {"type": {"type": "integer", "minInteger": 10, "maxInteger": 100}}
+MODE = {"type": {"type": "string", "enum": ["set", ["fast", "slow"]]}}
+
+
+def get_validator(name, type_json, value_map=None, is_optional=True):
+    column = OVSColumn('Port', name, types.Type.from_json(type_json),
+                       is_optional=is_optional, valueMap=value_map or {})
+    return compile_column_validator(name, column)
+
+
+def assert_rejected(validator, data, message):
+    with pytest.raises(DataValidationFailed) as excinfo:
+        validator(data)
+    assert excinfo.value.detail == message
+
+
+def test_type():
+    validator = get_validator('mtu', {"key": "integer", "min": 0, "max": 1})
+
+    validator(1500)
+    # A single value list is accepted
+    validator([1500])
+    assert_rejected(validator, '1500',
+                    "Attribute type mismatch for column mtu")
+    assert_rejected(validator, [1, 2],
+                    "Attribute type mismatch for column mtu")
+
+    validator = get_validator('enabled', {"key": "boolean"})
+    validator(True)
+    assert_rejected(validator, 'true',
+                    "Attribute type mismatch for column enabled")
+
+
+def test_enum():
+    validator = get_validator('admin', {"key": {
+        "type": "string", "enum": ["set", ["up", "down"]]}})
+
+    validator('up')
+    assert_rejected(validator, 'sideways',
+                    "Attribute value is invalid for column 'admin'.")
+
+    validator = get_validator('tags', {"key": {
+        "type": "string", "enum": ["set", ["a", "b"]]},
+        "min": 0, "max": "unlimited"})
+    validator(['a', 'b'])
+    assert_rejected(validator, ['a', 'z'],
+                    "Attribute value is invalid for column 'tags'.")
+
+
+def test_range():
+    validator = get_validator('mtu', {"key": {
+        "type": "integer", "minInteger": 68, "maxInteger": 9000}})
+
+    validator(68)
+    assert_rejected(validator, 9001,
+                    "Attribute value is out of range for column mtu")
+
+    # Strings are checked by their length
+    validator = get_validator('name', {"key": {"type": "string",
+                                               "maxLength": 5}})
+    validator('abc')
+    assert_rejected(validator, 'abcdef',
+                    "Attribute value is out of range for column name")
+
+    validator = get_validator('vlans', {"key": {
+        "type": "integer", "minInteger": 1, "maxInteger": 4094},
+        "min": 1, "max": 3})
+    assert_rejected(validator, [4095],
+                    "List element 4095 is out of range for column vlans")
+
+
+def test_number_of_elements():
+    validator = get_validator('vlans', {"key": "integer",
+                                        "min": 1, "max": 3})
+
+    validator([1, 2])
+    for data in ([], [1, 2, 3, 4]):
+        assert_rejected(validator, data,
+                        "List number of elements is out of range for "
+                        "column vlans")
+    assert_rejected(validator, [1, 'a'],
+                    "Value type mismatch in column vlans")
+
+    validator = get_validator('counts', {"key": "string", "value": {
+        "type": "integer", "maxInteger": 10}, "min": 1, "max": 2})
+    validator({'a': 1})
+    assert_rejected(validator, {},
+                    "Dict number of elements is out of range for "
+                    "column counts")
+    assert_rejected(validator, {'a': 11},
+                    "Dictionary value 11 is out of range for key a in "
+                    "column counts")
+
+
+def test_key_value_types():
+    validator = get_validator('settings', {"key": "string",
+                                           "value": "string",
+                                           "min": 0, "max": "unlimited"},
+                              {"speed": SPEED, "mode": MODE})
+
+    validator({'speed': '50', 'mode': 'fast'})
+    assert_rejected(validator, {'speed': 'x'},
+                    "Value type mismatch for key speed in column settings")
+    assert_rejected(validator, {'speed': 50},
+                    "Value type mismatch for key speed in column settings")
+    assert_rejected(validator, {'speed': '500'},
+                    "Dictionary value 500 is out of range for key speed "
+                    "in column settings")
+    assert_rejected(validator, {'mode': 'medium'},
+                    "Attribute value is invalid for column 'settings'.: "
+                    "Invalid value for key 'mode'. ")
+    assert_rejected(validator, {'other': '1'},
+                    "Unknown key other for column settings")
+
+
+def test_required_keys():
+    validator = get_validator('settings', {"key": "string",
+                                           "value": "string",
+                                           "min": 0, "max": "unlimited"},
+                              {"speed": SPEED, "mode": MODE},
+                              is_optional=False)
+
+    validator({'speed': '50', 'mode': 'fast'})
+    assert_rejected(validator, {'speed': '50'},
+                    "Attribute value is invalid for column 'settings'.: "
+                    "Missing keys: '['mode']'. ")
+
+
+def test_common_columns_accept_any_key():
+    validator = get_validator('other_config', {"key": "string",
+                                               "value": "string",
+                                               "min": 0,
+                                               "max": "unlimited"},
+                              {"speed": SPEED})
+
+    validator({'other': '1'})
+    assert_rejected(validator, {'other': 1},
+                    "Value type mismatch for key other in column "
+                    "other_config")